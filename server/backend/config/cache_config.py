@@ -0,0 +1,60 @@
+import os
+import tempfile
+from pathlib import Path
+from utils.resultCache import MemoryCache, SqliteCache
+
+_cache = None
+
+def _web_workers() -> int:
+    """Web worker processes on this host, from WEB_CONCURRENCY (read by gunicorn too)."""
+    try:
+        return int(os.getenv("WEB_CONCURRENCY", "1"))
+    except ValueError:
+        return 1
+
+def get_cache():
+    """
+    Shared result cache. ANALYTICS_CACHE_BACKEND=memory (per process) or
+    sqlite (one file shared by all workers on the host). Version bumps (cache
+    invalidation) only reach the processes that share the backend, so with
+    more than one web worker (WEB_CONCURRENCY > 1) the default is sqlite.
+    """
+    global _cache
+    if _cache is not None:
+        return _cache
+
+    workers = _web_workers()
+    backend = (os.getenv("ANALYTICS_CACHE_BACKEND") or ("sqlite" if workers > 1 else "memory")).strip().lower()
+    if backend == "memory" and workers > 1:
+        print(f"ANALYTICS_CACHE_BACKEND=memory with {workers} workers: invalidations stay per process until TTL expiry")
+    if backend == "sqlite":
+        default_path = Path(__file__).resolve().parent.parent / "analytics_cache.sqlite3"
+        _cache = SqliteCache(os.getenv("ANALYTICS_CACHE_PATH") or default_path)
+    elif backend == "memory":
+        _cache = MemoryCache(max_entries=int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "256")))
+    else:
+        raise RuntimeError(f"Unknown ANALYTICS_CACHE_BACKEND: {backend}")
+    return _cache
+
+def lock_dir() -> str:
+    return os.getenv("ANALYTICS_CACHE_LOCK_DIR") or os.path.join(tempfile.gettempdir(), "analytics_cache_locks")
+
+def cache_ttl() -> int:
+    try:
+        return int(os.getenv("ANALYTICS_CACHE_TTL", "60"))
+    except ValueError:
+        return 60
+
+def token_cache_size() -> int:
+    """AUTH_TOKEN_CACHE_SIZE=0 disables the verified-token cache."""
+    try:
+        return int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+    except ValueError:
+        return 4096
+
+def employee_cache_ttl() -> int:
+    """Seconds an authenticated Employee is reused per process; 0 disables."""
+    try:
+        return int(os.getenv("AUTH_EMPLOYEE_CACHE_TTL", "30"))
+    except ValueError:
+        return 30
@@ -0,0 +1,42 @@
+import os
+from pathlib import Path
+from typing import Dict
+
+def results_dir() -> Path:
+    """Where finished job results are written; must be shared by the web and worker hosts."""
+    default_path = Path(__file__).resolve().parent.parent / "job_results"
+    path = Path(os.getenv("JOB_RESULTS_DIR") or default_path)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _per_type(name: str) -> Dict[str, int]:
+    """Parse "type=value,type=value" overrides, ignoring malformed entries."""
+    out: Dict[str, int] = {}
+    for part in (os.getenv(name) or "").split(","):
+        key, _, value = part.partition("=")
+        try:
+            out[key.strip()] = int(value)
+        except ValueError:
+            continue
+    return out
+
+def job_concurrency(job_type: str, default: int) -> int:
+    """Max running jobs of a type across all workers, e.g. JOB_CONCURRENCY=employee_reports=1,admin_analytics=2."""
+    return max(1, _per_type("JOB_CONCURRENCY").get(job_type, default))
+
+def job_timeout(job_type: str, default: int) -> int:
+    """Seconds before a running job is killed, e.g. JOB_TIMEOUTS=admin_attendance=600."""
+    return max(1, _per_type("JOB_TIMEOUTS").get(job_type, default))
+
+def worker_slots() -> int:
+    """Jobs one worker process runs at the same time."""
+    try:
+        return max(1, int(os.getenv("JOB_WORKER_SLOTS", "2")))
+    except ValueError:
+        return 2
+
+def result_retention_days() -> int:
+    try:
+        return int(os.getenv("JOB_RESULT_RETENTION_DAYS", "7"))
+    except ValueError:
+        return 7
@@ -0,0 +1,47 @@
+import json
+import os
+from pathlib import Path
+from utils.firebaseTokenVerifier import (
+    FileCertSource, FirebaseAdminVerifier, FirebaseTokenVerifier, GoogleCertSource, KeySet,
+)
+
+_verifier = None
+
+def firebase_project_id() -> str:
+    """FIREBASE_PROJECT_ID, falling back to the service account file."""
+    project_id = os.getenv("FIREBASE_PROJECT_ID")
+    if project_id:
+        return project_id
+    cred_path = Path(__file__).with_name("serviceAccountKey.json")
+    if cred_path.exists():
+        with open(cred_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("project_id") or ""
+    return ""
+
+def get_token_verifier():
+    """
+    Firebase ID token verifier. FIREBASE_TOKEN_VERIFIER selects the backend:
+      firebase_admin (default) - the SDK, which fetches Google certs itself
+      offline                  - local RS256 checks against a persisted, background-refreshed key set
+      local                    - same checks against FIREBASE_LOCAL_KEYSET ({kid: pem} file), no network
+    """
+    global _verifier
+    if _verifier is not None:
+        return _verifier
+
+    backend = (os.getenv("FIREBASE_TOKEN_VERIFIER") or "firebase_admin").strip().lower()
+    if backend == "firebase_admin":
+        _verifier = FirebaseAdminVerifier()
+    elif backend == "offline":
+        default_path = Path(__file__).resolve().parent.parent / "firebase_keyset.json"
+        keyset = KeySet(GoogleCertSource(), cache_path=os.getenv("FIREBASE_KEYSET_CACHE") or default_path)
+        keyset.start_background_refresh()
+        _verifier = FirebaseTokenVerifier(firebase_project_id(), keyset)
+    elif backend == "local":
+        path = os.getenv("FIREBASE_LOCAL_KEYSET")
+        if not path:
+            raise RuntimeError("FIREBASE_LOCAL_KEYSET is required when FIREBASE_TOKEN_VERIFIER=local")
+        _verifier = FirebaseTokenVerifier(firebase_project_id(), KeySet(FileCertSource(path)))
+    else:
+        raise RuntimeError(f"Unknown FIREBASE_TOKEN_VERIFIER: {backend}")
+    return _verifier
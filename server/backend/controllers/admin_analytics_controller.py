@@ -7,6 +7,14 @@ from rest_framework import status
 from database.models.employee_model import Employee
 from database.models.attendance_model import Attendance
 from database.models.leaveRequeast_model import LeaveRequeast
+from database.models.attendanceRollup_model import AttendanceDailyRollup
+from services.attendanceRollup_services import load_rollup
+from services.analyticsCache_services import get_or_compute
+from controllers.job_controller import submit_job_response
+from services.attendance_services import _to_hms_from_seconds, worked_seconds_expr
+from utils.leaveIntervals import LeaveIntervals, weekday_count
+
+MAX_MONTHS_BACK = 120
 
 def _month_range_endpoints(months_back: int = 12) -> List[Tuple[date, date, str]]:
     """Returns list of (month_start, month_end, label) for the last N months (inclusive of current)."""
@@ -28,236 +36,288 @@ def _month_range_endpoints(months_back: int = 12) -> List[Tuple[date, date, str]
     out.reverse()
     return out
 
-def _daterange(start: date, end: date):
-    cur = start
-    while cur <= end:
-        yield cur
-        cur += timedelta(days=1)
-
-def _weekday_count_in_range(start: date, end: date) -> int:
-    cnt = 0
-    for d in _daterange(start, end):
-        if d.weekday() < 5:
-            cnt += 1
-    return cnt
-
 def _safe_int(v, default=0):
     try:
         return int(v)
     except Exception:
         return default
 
-@api_view(["GET"])
-def admin_analytics(request):
-    emp = getattr(request, "employee", None)
-    if not emp or not getattr(emp, "isAdmin", False):
-        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+def _attendance_counts_by_employee(start: date, end: date) -> Dict[str, Dict[str, int]]:
+    """Present/Late counts and worked seconds per employee in [start, end] from one grouped pipeline."""
+    pipeline = [
+        {"$group": {
+            "_id": "$employee",
+            "present": {"$sum": {"$cond": [{"$eq": ["$status", "Present"]}, 1, 0]}},
+            "late": {"$sum": {"$cond": [{"$eq": ["$status", "Late"]}, 1, 0]}},
+            "workedSeconds": {"$sum": worked_seconds_expr()},
+        }},
+    ]
+    qs = Attendance.objects(status__in=["Present", "Late"], date__gte=start, date__lte=end)
+    return {
+        str(row["_id"]): {
+            "present": row.get("present", 0),
+            "late": row.get("late", 0),
+            "workedSeconds": row.get("workedSeconds", 0),
+        }
+        for row in qs.aggregate(pipeline)
+    }
 
-    try:
-        employees: List[Employee] = list(Employee.objects())
-        emp_ids = [str(e.id) for e in employees]
-        emp_map = {str(e.id): e for e in employees}
-        total_emps = len(employees)
+def _leave_weekdays_by_employee(start: date, end: date) -> Dict[str, int]:
+    """Approved leave weekdays per employee in [start, end]; overlapping leaves are counted once."""
+    qs = LeaveRequeast.objects(status__in=["Approved"], startDate__lte=end, endDate__gte=start)
+    return LeaveIntervals.from_queryset(qs).weekday_slots_by_employee(start, end)
 
-        # Windows
-        months = _month_range_endpoints(12)
-        last_90_start = date.today() - timedelta(days=90)
-        last_90_end = date.today()
+def _month_index(expr) -> Dict[str, Any]:
+    # year * 12 + (month - 1): consecutive integers across year boundaries
+    return {"$add": [{"$multiply": [{"$year": expr}, 12]}, {"$subtract": [{"$month": expr}, 1]}]}
 
-        # Attendance in last 12 months (one query)
-        min_month_start = months[0][0]
-        max_month_end = months[-1][1]
-        att_qs = Attendance.objects(date__gte=min_month_start, date__lte=max_month_end)
+def _monthly_buckets(start: date, end: date) -> Dict[str, Dict[str, int]]:
+    """
+    Per-month present/late totals, approved-leave weekday slots, approved
+    leave requests touching the month and worked seconds, for [start, end],
+    in a single pipeline (daily rollup rows unioned with leave requests and
+    attendances, grouped on month).
+    """
+    lo = start.year * 12 + start.month - 1
+    hi = end.year * 12 + end.month - 1
+    weekday = {"$and": [{"$gte": [{"$dayOfWeek": "$date"}, 2]}, {"$lte": [{"$dayOfWeek": "$date"}, 6]}]}
+    pipeline = [
+        {"$project": {
+            "_id": 0,
+            "m": _month_index("$date"),
+            "present": {"$ifNull": ["$present", 0]},
+            "late": {"$ifNull": ["$late", 0]},
+            "leaveSlots": {"$cond": [weekday, {"$ifNull": ["$onLeave", 0]}, 0]},
+        }},
+        {"$unionWith": {
+            "coll": LeaveRequeast._get_collection_name(),
+            "pipeline": [
+                {"$match": {
+                    "status": "Approved",
+                    "startDate": {"$lte": datetime(end.year, end.month, end.day)},
+                    "endDate": {"$gte": datetime(start.year, start.month, start.day)},
+                }},
+                # one row per month the leave touches, clipped to the window
+                {"$project": {"_id": 0, "m": {"$range": [
+                    {"$max": [_month_index("$startDate"), lo]},
+                    {"$add": [{"$min": [_month_index("$endDate"), hi]}, 1]},
+                ]}}},
+                {"$unwind": "$m"},
+                {"$project": {"m": 1, "leaves": {"$literal": 1}}},
+            ],
+        }},
+        {"$unionWith": {
+            "coll": Attendance._get_collection_name(),
+            "pipeline": [
+                {"$match": {
+                    "date": {"$gte": datetime(start.year, start.month, start.day), "$lte": datetime(end.year, end.month, end.day)},
+                    "workedSeconds": {"$gt": 0},
+                }},
+                {"$project": {"_id": 0, "m": _month_index("$date"), "workedSeconds": 1}},
+            ],
+        }},
+        {"$group": {
+            "_id": "$m",
+            "present": {"$sum": "$present"},
+            "late": {"$sum": "$late"},
+            "leaveSlots": {"$sum": "$leaveSlots"},
+            "leaves": {"$sum": "$leaves"},
+            "workedSeconds": {"$sum": "$workedSeconds"},
+        }},
+    ]
+    out: Dict[str, Dict[str, int]] = {}
+    for row in AttendanceDailyRollup.objects(date__gte=start, date__lte=end).aggregate(pipeline):
+        label = f"{row['_id'] // 12:04d}-{row['_id'] % 12 + 1:02d}"
+        out[label] = row
+    return out
 
-        # Index by month label
-        monthly_present = defaultdict(int)
-        monthly_late = defaultdict(int)
+def _compute_analytics(months_back: int = 12) -> Dict[str, Any]:
+    employees: List[Employee] = list(Employee.objects())
+    emp_map = {str(e.id): e for e in employees}
+    total_emps = len(employees)
 
-        for a in att_qs:
-            label = a.date.strftime("%Y-%m")
-            if a.status == "Present":
-                monthly_present[label] += 1
-            elif a.status == "Late":
-                monthly_late[label] += 1
+    # Windows
+    months = _month_range_endpoints(months_back)
+    last_90_start = date.today() - timedelta(days=90)
+    last_90_end = date.today()
 
-        # Compute monthly absent by checking missing weekdays per employee
-        # For each month window, absent = totalWeekdays * totalEmployees - (present+late) (approx; ignores approved leaves)
-        # Then subtract weekdays with approved leaves
-        monthly_absent = {}
-        # Map of (emp_id, day)->True for approved leave
-        leave_qs_12m = LeaveRequeast.objects(
-            status__in=["Approved", "Pending"],  # Pending still consumes future days sometimes; adjust if needed
-            startDate__lte=max_month_end,
-            endDate__gte=min_month_start,
-        )
-        leaves_days = set()
-        for lr in leave_qs_12m:
-            s = lr.startDate
-            e = lr.endDate
-            for d in _daterange(s, e):
-                if d.weekday() < 5:
-                    leaves_days.add((str(lr.employee.id), d))
+    # Monthly present/late/leave totals (one grouped pipeline, whatever the window length)
+    buckets = _monthly_buckets(months[0][0], months[-1][1])
+    monthly_present = {label: row.get("present", 0) for label, row in buckets.items()}
+    monthly_late = {label: row.get("late", 0) for label, row in buckets.items()}
+    monthly_leave_slots = {label: row.get("leaveSlots", 0) for label, row in buckets.items()}
 
-        for (start, end, label) in months:
-            weekdays = _weekday_count_in_range(start, end)
-            # total available working slots
-            total_slots = weekdays * total_emps
-            # present+late records in this month
-            recorded = monthly_present.get(label, 0) + monthly_late.get(label, 0)
-            # subtract leave weekdays (each employee-day)
-            leave_slots = 0
-            for emp_id in emp_ids:
-                for d in _daterange(start, end):
-                    if d.weekday() < 5 and (emp_id, d) in leaves_days:
-                        leave_slots += 1
-            absent = max(0, total_slots - recorded - leave_slots)
-            monthly_absent[label] = absent
+    # Compute monthly absent from working slots
+    # absent = totalWeekdays * totalEmployees - (present+late) - approved leave weekdays
+    monthly_absent = {}
+    for (start, end, label) in months:
+        weekdays = weekday_count(start, end)
+        # total available working slots
+        total_slots = weekdays * total_emps
+        # present+late records in this month
+        recorded = monthly_present.get(label, 0) + monthly_late.get(label, 0)
+        absent = max(0, total_slots - recorded - monthly_leave_slots.get(label, 0))
+        monthly_absent[label] = absent
 
-        monthlyTrend = [
-            {
-                "month": label,
-                "present": monthly_present.get(label, 0),
-                "late": monthly_late.get(label, 0),
-                "absent": monthly_absent.get(label, 0),
-            }
-            for (_, _, label) in months
-        ]
+    monthlyTrend = [
+        {
+            "month": label,
+            "present": monthly_present.get(label, 0),
+            "late": monthly_late.get(label, 0),
+            "absent": monthly_absent.get(label, 0),
+            "hoursWorked": _to_hms_from_seconds(buckets.get(label, {}).get("workedSeconds", 0)),
+        }
+        for (_, _, label) in months
+    ]
 
-        # Absenteeism Breakdown (last 90 days): Unexcused vs Leave Types
-        att_last_90 = Attendance.objects(date__gte=last_90_start, date__lte=last_90_end)
-        # days per employee in last 90
-        total_weekdays_90 = _weekday_count_in_range(last_90_start, last_90_end)
-        total_slots_90 = total_weekdays_90 * total_emps
-        recorded_90 = 0
-        late_count_90 = 0
-        present_count_90 = 0
-        for a in att_last_90:
-            recorded_90 += 1
-            if a.status == "Late":
-                late_count_90 += 1
-            elif a.status == "Present":
-                present_count_90 += 1
+    # Absenteeism Breakdown (last 90 days): Unexcused vs Leave Types
+    # days per employee in last 90
+    total_weekdays_90 = weekday_count(last_90_start, last_90_end)
+    total_slots_90 = total_weekdays_90 * total_emps
+    late_count_90 = 0
+    present_count_90 = 0
+    leave_slots_90 = 0
+    for d, row in load_rollup(last_90_start, last_90_end).items():
+        present_count_90 += row.get("present", 0)
+        late_count_90 += row.get("late", 0)
+        if d.weekday() < 5:
+            leave_slots_90 += row.get("onLeave", 0)
+    recorded_90 = present_count_90 + late_count_90
 
-        # Leave types in last 90
-        leaves_90 = LeaveRequeast.objects(status__in=["Approved"], startDate__lte=last_90_end, endDate__gte=last_90_start)
-        leave_type_count: Dict[str, int] = defaultdict(int)
-        leave_slots_90 = 0
-        for lr in leaves_90:
-            for d in _daterange(max(lr.startDate, last_90_start), min(lr.endDate, last_90_end)):
-                if d.weekday() < 5:
-                    leave_slots_90 += 1
-            lt = (lr.leaveType or "").capitalize()
-            leave_type_count[lt] += 1
+    # Leave types in last 90
+    leaves_90 = LeaveRequeast.objects(status__in=["Approved"], startDate__lte=last_90_end, endDate__gte=last_90_start)
+    leave_type_count: Dict[str, int] = defaultdict(int)
+    for row in leaves_90.aggregate([{"$group": {"_id": "$leaveType", "count": {"$sum": 1}}}]):
+        lt = (row["_id"] or "").capitalize()
+        leave_type_count[lt] += row["count"]
 
-        unexcused_absences_90 = max(0, total_slots_90 - recorded_90 - leave_slots_90)
-        absenteeismBreakdown = [{"label": "Unexcused Absence", "value": unexcused_absences_90}] + [
-            {"label": k or "Leave", "value": v} for k, v in leave_type_count.items()
-        ]
+    unexcused_absences_90 = max(0, total_slots_90 - recorded_90 - leave_slots_90)
+    absenteeismBreakdown = [{"label": "Unexcused Absence", "value": unexcused_absences_90}] + [
+        {"label": k or "Leave", "value": v} for k, v in leave_type_count.items()
+    ]
 
-        # Leave Usage Trend by month (last 12 months, count leave requests touching month)
-        leaveTrendMonthly = []
-        for (start, end, label) in months:
-            cnt = LeaveRequeast.objects(status__in=["Approved"], startDate__lte=end, endDate__gte=start).count()
-            leaveTrendMonthly.append({"month": label, "leaves": cnt})
+    # Leave Usage Trend by month (count leave requests touching month)
+    leaveTrendMonthly = [
+        {"month": label, "leaves": buckets.get(label, {}).get("leaves", 0)}
+        for (_, _, label) in months
+    ]
 
-        # Lateness Frequency per Employee (last 90 days)
-        late_by_emp: Dict[str, int] = defaultdict(int)
-        for a in Attendance.objects(status="Late", date__gte=last_90_start, date__lte=last_90_end):
-            emp_id = str(a.employee.id) if a.employee else None
-            if emp_id:
-                late_by_emp[emp_id] += 1
-        latenessByEmployee = [
-            {"name": f"{emp_map[eid].firstName} {emp_map[eid].lastName}".strip(), "lates": cnt}
-            for eid, cnt in late_by_emp.items()
-        ]
+    # Per-employee counts for the last 90 days (grouped pipelines)
+    att_by_emp = _attendance_counts_by_employee(last_90_start, last_90_end)
+    leave_days_by_emp = _leave_weekdays_by_employee(last_90_start, last_90_end)
 
-        # Radar metrics (0–100)
-        # presentRate vs total slots; lateRate; leaveUsage norm; absenceRate
-        present_rate = (present_count_90 := present_count_90) / total_slots_90 * 100 if total_slots_90 else 0
-        late_rate = late_count_90 / total_slots_90 * 100 if total_slots_90 else 0
-        absence_rate = unexcused_absences_90 / total_slots_90 * 100 if total_slots_90 else 0
-        leave_usage_norm = min(100, (leave_slots_90 / total_slots_90 * 100) if total_slots_90 else 0)
-        radar = [
-            {"metric": "Presence", "value": round(present_rate, 1)},
-            {"metric": "Lateness", "value": round(late_rate, 1)},
-            {"metric": "Absences", "value": round(absence_rate, 1)},
-            {"metric": "Leave Usage", "value": round(leave_usage_norm, 1)},
-        ]
+    # Lateness Frequency per Employee (last 90 days)
+    latenessByEmployee = [
+        {"name": f"{emp_map[eid].firstName} {emp_map[eid].lastName}".strip(), "lates": counts["late"]}
+        for eid, counts in att_by_emp.items()
+        if counts.get("late") and eid in emp_map
+    ]
 
-        # Ranking (last 90 days) — simple score
-        ranking_rows = []
-        for e in employees:
-            # count lates
-            lates = Attendance.objects(employee=e, status="Late", date__gte=last_90_start, date__lte=last_90_end).count()
-            # present days
-            present_days = Attendance.objects(employee=e, status="Present", date__gte=last_90_start, date__lte=last_90_end).count()
-            # compute absences approx
-            # weekdays last 90 - (present+late) - leave weekdays
-            leave_days = 0
-            for lr in LeaveRequeast.objects(employee=e, status__in=["Approved"], startDate__lte=last_90_end, endDate__gte=last_90_start):
-                for d in _daterange(max(lr.startDate, last_90_start), min(lr.endDate, last_90_end)):
-                    if d.weekday() < 5:
-                        leave_days += 1
-            absences = max(0, total_weekdays_90 - (present_days + lates) - leave_days)
-            score = max(0, min(100, 100 - (lates * 2) - (absences * 5)))
-            ranking_rows.append({
-                "id": str(e.id),
-                "name": f"{e.firstName} {e.lastName}".strip(),
-                "score": score,
-                "absences": absences,
-                "lates": lates,
-            })
-        ranking_rows.sort(key=lambda x: (-_safe_int(x["score"]), _safe_int(x["absences"]), _safe_int(x["lates"])))
-        for idx, r in enumerate(ranking_rows, start=1):
-            r["rank"] = idx
+    # Radar metrics (0–100)
+    # presentRate vs total slots; lateRate; leaveUsage norm; absenceRate
+    present_rate = (present_count_90 := present_count_90) / total_slots_90 * 100 if total_slots_90 else 0
+    late_rate = late_count_90 / total_slots_90 * 100 if total_slots_90 else 0
+    absence_rate = unexcused_absences_90 / total_slots_90 * 100 if total_slots_90 else 0
+    leave_usage_norm = min(100, (leave_slots_90 / total_slots_90 * 100) if total_slots_90 else 0)
+    radar = [
+        {"metric": "Presence", "value": round(present_rate, 1)},
+        {"metric": "Lateness", "value": round(late_rate, 1)},
+        {"metric": "Absences", "value": round(absence_rate, 1)},
+        {"metric": "Leave Usage", "value": round(leave_usage_norm, 1)},
+    ]
 
-        # Health score
-        overall_score = 0
-        if total_slots_90:
-            penalty = (late_count_90 * 2) + (unexcused_absences_90 * 5)
-            overall_score = max(0, min(100, 100 - (penalty / max(1, total_emps)) ))
+    # Ranking (last 90 days) — simple score
+    ranking_rows = []
+    for e in employees:
+        counts = att_by_emp.get(str(e.id), {})
+        lates = counts.get("late", 0)
+        present_days = counts.get("present", 0)
+        # compute absences approx
+        # weekdays last 90 - (present+late) - leave weekdays
+        leave_days = leave_days_by_emp.get(str(e.id), 0)
+        absences = max(0, total_weekdays_90 - (present_days + lates) - leave_days)
+        score = max(0, min(100, 100 - (lates * 2) - (absences * 5)))
+        ranking_rows.append({
+            "id": str(e.id),
+            "name": f"{e.firstName} {e.lastName}".strip(),
+            "score": score,
+            "absences": absences,
+            "lates": lates,
+            "hoursWorked": _to_hms_from_seconds(counts.get("workedSeconds", 0)),
+        })
+    ranking_rows.sort(key=lambda x: (-_safe_int(x["score"]), _safe_int(x["absences"]), _safe_int(x["lates"])))
+    for idx, r in enumerate(ranking_rows, start=1):
+        r["rank"] = idx
 
-        # Insights (simple prescriptive)
-        insights = []
-        if unexcused_absences_90 > 0:
-            insights.append({
-                "title": "Reduce Absenteeism",
-                "detail": f"{unexcused_absences_90} unexcused absence slots detected in the last 90 days.",
-                "recommendation": "Set clear attendance expectations and follow-up on trends.",
-                "severity": "red",
-            })
-        if late_count_90 > total_emps:
-            insights.append({
-                "title": "Lateness Increasing",
-                "detail": f"{late_count_90} late entries across employees in the last 90 days.",
-                "recommendation": "Introduce grace periods and reminders; review shift start times.",
-                "severity": "orange",
-            })
-        if leave_slots_90 > 0:
-            insights.append({
-                "title": "Leave Usage Healthy",
-                "detail": "Employees are utilizing approved leaves.",
-                "recommendation": "Ensure coverage planning and balance workloads.",
-                "severity": "green",
-            })
-        if not insights:
-            insights.append({
-                "title": "Stable Attendance",
-                "detail": "No significant risks detected recently.",
-                "recommendation": "Maintain current policies and recognition.",
-                "severity": "green",
-            })
+    # Health score
+    overall_score = 0
+    if total_slots_90:
+        penalty = (late_count_90 * 2) + (unexcused_absences_90 * 5)
+        overall_score = max(0, min(100, 100 - (penalty / max(1, total_emps)) ))
 
-        payload = {
-            "score": round(overall_score, 1),
-            "insights": insights,
-            "monthlyTrend": monthlyTrend,
-            "absenteeismBreakdown": absenteeismBreakdown,
-            "leaveUsageTrend": leaveTrendMonthly,
-            "latenessByEmployee": latenessByEmployee,
-            "radar": radar,
-            "ranking": ranking_rows,
-        }
+    # Insights (simple prescriptive)
+    insights = []
+    if unexcused_absences_90 > 0:
+        insights.append({
+            "title": "Reduce Absenteeism",
+            "detail": f"{unexcused_absences_90} unexcused absence slots detected in the last 90 days.",
+            "recommendation": "Set clear attendance expectations and follow-up on trends.",
+            "severity": "red",
+        })
+    if late_count_90 > total_emps:
+        insights.append({
+            "title": "Lateness Increasing",
+            "detail": f"{late_count_90} late entries across employees in the last 90 days.",
+            "recommendation": "Introduce grace periods and reminders; review shift start times.",
+            "severity": "orange",
+        })
+    if leave_slots_90 > 0:
+        insights.append({
+            "title": "Leave Usage Healthy",
+            "detail": "Employees are utilizing approved leaves.",
+            "recommendation": "Ensure coverage planning and balance workloads.",
+            "severity": "green",
+        })
+    if not insights:
+        insights.append({
+            "title": "Stable Attendance",
+            "detail": "No significant risks detected recently.",
+            "recommendation": "Maintain current policies and recognition.",
+            "severity": "green",
+        })
+
+    payload = {
+        "score": round(overall_score, 1),
+        "insights": insights,
+        "monthlyTrend": monthlyTrend,
+        "absenteeismBreakdown": absenteeismBreakdown,
+        "leaveUsageTrend": leaveTrendMonthly,
+        "latenessByEmployee": latenessByEmployee,
+        "radar": radar,
+        "ranking": ranking_rows,
+    }
+    return payload
+
+@api_view(["GET"])
+def admin_analytics(request):
+    emp = getattr(request, "employee", None)
+    if not emp or not getattr(emp, "isAdmin", False):
+        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        months_back = int(request.query_params.get("monthsBack") or 12)
+    except ValueError:
+        return Response({"detail": "Invalid monthsBack"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= months_back <= MAX_MONTHS_BACK:
+        return Response({"detail": f"monthsBack must be between 1 and {MAX_MONTHS_BACK}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.query_params.get("async") in ("1", "true", "True"):
+        return submit_job_response(request, "admin_analytics", {"monthsBack": months_back})
+
+    try:
+        payload = get_or_compute(
+            "admin_analytics", lambda: _compute_analytics(months_back), date.today().isoformat(), months_back
+        )
         return Response(payload, status=status.HTTP_200_OK)
     except Exception as ex:
         return Response({"detail": f"Failed to compute analytics: {ex}"}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -1,13 +1,50 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from datetime import datetime, timedelta
-from database.models.attendance_model import Attendance
-from database.models.employee_model import Employee
+from django.http import FileResponse, StreamingHttpResponse
+from datetime import datetime
+from itertools import islice
+from bson import ObjectId
+import json
+import tempfile
+from services.admin_attendance_services import (
+    STATUSES, decode_cursor, encode_cursor, iter_attendance_rows,
+)
+from services.attendanceExport_services import (
+    CONTENT_TYPES as EXPORT_CONTENT_TYPES, DEFAULT_OVERTIME_AFTER, FORMATS as EXPORT_FORMATS,
+    stream_csv, write_xlsx,
+)
+from controllers.job_controller import submit_job_response
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
 
 def _parse_date(s: str):
     return datetime.strptime(s, "%Y-%m-%d").date()
 
+def _filters(qp):
+    """(start, end, status, employeeId, includeAbsent) from the query string; ValueError when invalid."""
+    start_str = qp.get("startDate")
+    end_str = qp.get("endDate")
+    if not start_str or not end_str:
+        raise ValueError("Missing startDate/endDate")
+    try:
+        start = _parse_date(start_str)
+        end = _parse_date(end_str)
+    except Exception:
+        raise ValueError("Invalid date format")
+    if end < start:
+        raise ValueError("endDate before startDate")
+
+    status_filter = qp.get("status") or None
+    if status_filter and status_filter not in STATUSES:
+        raise ValueError("Invalid status")
+    employee_id = qp.get("employeeId") or None
+    if employee_id and not ObjectId.is_valid(employee_id):
+        raise ValueError("Invalid employeeId")
+    include_absent = qp.get("includeAbsent") in ("1", "true", "True")
+    return start, end, status_filter, employee_id, include_absent
+
 @api_view(["GET"])
 def admin_attendance(request):
     emp = getattr(request, "employee", None)
@@ -15,56 +52,97 @@ def admin_attendance(request):
         return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
     qp = request.query_params
-    start_str = qp.get("startDate")
-    end_str = qp.get("endDate")
-    include_absent = qp.get("includeAbsent") in ("1", "true", "True")
+    try:
+        start, end, status_filter, employee_id, include_absent = _filters(qp)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    if not start_str or not end_str:
-        return Response({"detail": "Missing startDate/endDate"}, status=status.HTTP_400_BAD_REQUEST)
+    if qp.get("async") in ("1", "true", "True"):
+        # Large ranges: export to an NDJSON result file instead of holding the worker
+        return submit_job_response(request, "admin_attendance", {
+            "startDate": start.isoformat(),
+            "endDate": end.isoformat(),
+            "status": status_filter,
+            "employeeId": employee_id,
+            "includeAbsent": include_absent,
+        })
 
+    stream = qp.get("stream")
+    paged = "limit" in qp or "cursor" in qp
+    if stream or paged:
+        try:
+            after = decode_cursor(qp["cursor"]) if qp.get("cursor") else None
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rows = iter_attendance_rows(start, end, status_filter, employee_id, after, include_absent)
+
+        if stream:
+            if stream != "ndjson":
+                return Response({"detail": "Unsupported stream format"}, status=status.HTTP_400_BAD_REQUEST)
+            lines = (json.dumps(r, separators=(",", ":")) + "\n" for r in rows)
+            return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+        try:
+            limit = int(qp.get("limit") or DEFAULT_LIMIT)
+        except ValueError:
+            return Response({"detail": "Invalid limit"}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or limit > MAX_LIMIT:
+            return Response({"detail": f"limit must be between 1 and {MAX_LIMIT}"}, status=status.HTTP_400_BAD_REQUEST)
+        # One extra row tells us whether another page exists
+        page = list(islice(rows, limit + 1))
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1]["date"], page[-1]["employeeId"])
+        return Response({"items": page, "nextCursor": next_cursor}, status=status.HTTP_200_OK)
+
+    items = list(iter_attendance_rows(start, end, status_filter, employee_id, include_absent=include_absent))
+    return Response(items, status=status.HTTP_200_OK)
+
+@api_view(["GET"])
+def admin_attendance_export(request):
+    """Attendance/timesheet spreadsheet for a date range, streamed from the cursor (fileType=csv|xlsx)."""
+    emp = getattr(request, "employee", None)
+    if not emp or not getattr(emp, "isAdmin", False):
+        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+    qp = request.query_params
     try:
-        start = _parse_date(start_str)
-        end = _parse_date(end_str)
-    except Exception:
-        return Response({"detail": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
-    if end < start:
-        return Response({"detail": "endDate before startDate"}, status=status.HTTP_400_BAD_REQUEST)
-
-    qs = Attendance.objects(date__gte=start, date__lte=end).order_by("date")
-    items = []
-    for a in qs:
-        emp_doc: Employee = a.employee
-        full_name = f"{emp_doc.firstName} {emp_doc.lastName}".strip()
-        items.append({
-            "id": str(a.id),
-            "employeeId": str(emp_doc.id),
-            "employeeName": full_name,
-            "date": a.date.isoformat(),
-            "timeIn": a.timeIn.isoformat() if a.timeIn else None,
-            "timeOut": a.timeOut.isoformat() if a.timeOut else None,
-            "status": a.status or None,
-            "hoursWorked": a.hoursWorked,
+        start, end, status_filter, employee_id, include_absent = _filters(qp)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    # not "format": DRF reserves that query parameter for renderer selection
+    fmt = qp.get("fileType") or "csv"
+    if fmt not in EXPORT_FORMATS:
+        return Response({"detail": f"fileType must be one of {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        overtime_after = float(qp.get("overtimeAfter") or DEFAULT_OVERTIME_AFTER)
+    except ValueError:
+        overtime_after = -1
+    if not 0 <= overtime_after <= 24:
+        return Response({"detail": "overtimeAfter must be between 0 and 24 hours"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if qp.get("async") in ("1", "true", "True"):
+        return submit_job_response(request, "attendance_export", {
+            "startDate": start.isoformat(),
+            "endDate": end.isoformat(),
+            "status": status_filter,
+            "employeeId": employee_id,
+            "includeAbsent": include_absent,
+            "format": fmt,
+            "overtimeAfter": overtime_after,
         })
 
-    if include_absent:
-        existing = {(i["employeeId"], i["date"]) for i in items}
-        employees = list(Employee.objects())
-        cur = start
-        while cur <= end:
-            if cur.weekday() < 5:
-                for e in employees:
-                    key = (str(e.id), cur.isoformat())
-                    if key not in existing:
-                        items.append({
-                            "id": f"absent-{e.id}-{cur.isoformat()}",
-                            "employeeId": str(e.id),
-                            "employeeName": f"{e.firstName} {e.lastName}".strip(),
-                            "date": cur.isoformat(),
-                            "timeIn": None,
-                            "timeOut": None,
-                            "status": "Absent",
-                            "hoursWorked": "00:00:00",
-                        })
-            cur += timedelta(days=1)
-
-    return Response(items, status=status.HTTP_200_OK)
\ No newline at end of file
+    rows = iter_attendance_rows(start, end, status_filter, employee_id, include_absent=include_absent)
+    threshold = int(overtime_after * 3600)
+    filename = f"attendance_{start.isoformat()}_{end.isoformat()}.{fmt}"
+    if fmt == "csv":
+        resp = StreamingHttpResponse(stream_csv(rows, threshold), content_type=EXPORT_CONTENT_TYPES["csv"])
+        resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return resp
+
+    # A zip container can't be emitted incrementally; spool to disk, then stream the file
+    out = tempfile.TemporaryFile()
+    write_xlsx(rows, out, threshold)
+    out.seek(0)
+    return FileResponse(out, as_attachment=True, filename=filename, content_type=EXPORT_CONTENT_TYPES["xlsx"])
@@ -1,7 +1,9 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from datetime import date
 from services.admin_dashboard_services import build_dashboard_summary
+from services.analyticsCache_services import get_or_compute
 
 @api_view(["GET"])
 def admin_dashboard_summary(request):
@@ -9,7 +11,7 @@ def admin_dashboard_summary(request):
     if not emp or not getattr(emp, "isAdmin", False):
         return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
     try:
-        payload = build_dashboard_summary()
+        payload = get_or_compute("dashboard_summary", build_dashboard_summary, date.today().isoformat())
         return Response(payload, status=status.HTTP_200_OK)
     except Exception as ex:
         return Response({"detail": f"Failed to compute dashboard summary: {ex}"}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -0,0 +1,15 @@
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from services.analyticsCache_services import cache_metrics
+from services.auth_services import token_cache_metrics
+
+@api_view(["GET"])
+def admin_metrics(request):
+    emp = getattr(request, "employee", None)
+    if not emp or not getattr(emp, "isAdmin", False):
+        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+    return Response({
+        "analyticsCache": cache_metrics(),
+        "authTokenCache": token_cache_metrics(),
+    }, status=status.HTTP_200_OK)
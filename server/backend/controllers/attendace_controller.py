@@ -1,8 +1,12 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from services.attendance_services import get_today_attendance, time_in, time_out, serialize_attendance, list_attendance
+from services.attendance_services import get_today_attendance, time_in, time_out, serialize_attendance, list_attendance_rows, serialize_attendance_raw, history_version
+from services.clockEvent_services import ingest_clock_events, summarize
 from datetime import date
+from calendar import timegm
+import hashlib
+from django.utils.http import http_date, parse_http_date_safe
 
 @api_view(["GET"])
 def today(request):
@@ -45,13 +49,54 @@ def history(request):
     limit_str = qp.get("limit")
     start_str = qp.get("start")
     end_str = qp.get("end")
+    before_str = qp.get("before")
+    after_str = qp.get("after")
 
     try:
         limit = int(limit_str) if limit_str else 50
         start = date.fromisoformat(start_str) if start_str else None
         end = date.fromisoformat(end_str) if end_str else None
+        before = date.fromisoformat(before_str) if before_str else None
+        after = date.fromisoformat(after_str) if after_str else None
     except Exception:
         return Response({"detail": "Invalid query params"}, status=status.HTTP_400_BAD_REQUEST)
+    if before and after:
+        return Response({"detail": "Use either before or after, not both"}, status=status.HTTP_400_BAD_REQUEST)
 
-    items = list_attendance(emp, start=start, end=end, limit=limit)
-    return Response({"items": [serialize_attendance(a) for a in items]}, status=status.HTTP_200_OK)
\ No newline at end of file
+    # Validators from one grouped query; unchanged history costs no row reads or serialization
+    last_modified, count = history_version(emp)
+    version = f"{emp.id}|{last_modified.isoformat() if last_modified else ''}|{count}|{request.get_full_path()}"
+    etag = f'W/"{hashlib.sha1(version.encode("utf-8")).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    last_ts = timegm(last_modified.utctimetuple()) if last_modified else None
+    if last_ts is not None:
+        headers["Last-Modified"] = http_date(last_ts)
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    elif last_ts is not None:
+        since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+        if since is not None and last_ts <= since:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    rows = list_attendance_rows(emp, start=start, end=end, limit=limit, before=before, after=after)
+    items = [serialize_attendance_raw(r) for r in rows]
+    next_before = items[-1]["date"] if limit > 0 and len(items) == limit else None
+    return Response({"items": items, "nextBefore": next_before}, status=status.HTTP_200_OK, headers=headers)
+
+@api_view(["POST"])
+def clock_events_view(request):
+    """Bulk punches from kiosks/badge readers: {"events": [{employeeId, timestamp, direction, idempotencyKey}, ...]}."""
+    emp = getattr(request, "employee", None)
+    if not emp or not getattr(emp, "isAdmin", False):
+        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+    data = request.data
+    events = data.get("events") if isinstance(data, dict) else data
+    try:
+        results = ingest_clock_events(events)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"results": results, "summary": summarize(results)}, status=status.HTTP_200_OK)
@@ -1,16 +1,24 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from services.employeeReport_services import compute_employee_report
+from services.employeeReport_services import get_employee_report, compute_employee_report_range
 
 @api_view(["GET"])
 def employee_report(request):
     emp = getattr(request, "employee", None)
     if not emp:
         return Response({"detail": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
-    month = request.query_params.get("month")  # YYYY-MM
+    qp = request.query_params
+    if "from" in qp or "to" in qp:
+        try:
+            data = compute_employee_report_range(emp, qp.get("from"), qp.get("to"))
+        except ValueError as ex:
+            return Response({"detail": str(ex)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data, status=status.HTTP_200_OK)
+
+    month = qp.get("month")  # YYYY-MM
     try:
-        data = compute_employee_report(emp, month)  # month may be None
+        data = get_employee_report(emp, month)  # month may be None
     except Exception as ex:
         return Response({"detail": f"Failed to compute report: {ex}"}, status=status.HTTP_400_BAD_REQUEST)
     return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -4,6 +4,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from mongoengine.errors import ValidationError  
 from services.employee_services import _to_bool, _parse_birth_date, create_employee_service  # added
+from services.analyticsCache_services import bump_analytics_version
+from services.auth_services import invalidate_cached_employee, revoke_cached_tokens
 from config.cloudinary_config import upload_profile_image
 from database.models.employee_model import Employee
 from firebase_admin import auth as fb_auth  
@@ -129,6 +131,11 @@ def employee_detail(request, emp_id: str):
 
     try:
         emp.save()
+        bump_analytics_version()
+        invalidate_cached_employee(emp.firebaseUid)
+        # Restricted accounts and changed credentials must re-verify their tokens
+        if emp.isRestricted or firebase_updates:
+            revoke_cached_tokens(emp.firebaseUid)
         return Response(serialize_employee_full(emp), status=status.HTTP_200_OK)
     except ValidationError as e:
         return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
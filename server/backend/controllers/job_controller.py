@@ -0,0 +1,81 @@
+from django.http import FileResponse
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from services.job_services import cancel_job, get_job, list_jobs, result_file, serialize_job, submit_job
+
+MAX_LIST = 200
+
+def _forbidden(request):
+    emp = getattr(request, "employee", None)
+    if not emp or not getattr(emp, "isAdmin", False):
+        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+    return None
+
+def submit_job_response(request, job_type: str, params) -> Response:
+    """202 with the queued job; shared by /api/jobs and the ?async=1 variants of heavy endpoints."""
+    try:
+        job = submit_job(getattr(request, "employee", None), job_type, params)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(serialize_job(job), status=status.HTTP_202_ACCEPTED, headers={"Location": f"/api/jobs/{job.id}"})
+
+@api_view(["GET", "POST"])
+def jobs(request):
+    denied = _forbidden(request)
+    if denied:
+        return denied
+
+    if request.method == "POST":
+        data = request.data or {}
+        if not isinstance(data, dict):
+            return Response({"detail": "Body must be a JSON object"}, status=status.HTTP_400_BAD_REQUEST)
+        return submit_job_response(request, data.get("type"), data.get("params"))
+
+    qp = request.query_params
+    try:
+        limit = min(MAX_LIST, max(1, int(qp.get("limit") or 50)))
+    except ValueError:
+        return Response({"detail": "Invalid limit"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        docs = list_jobs(qp.get("status") or None, qp.get("type") or None, limit)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response([serialize_job(j) for j in docs], status=status.HTTP_200_OK)
+
+@api_view(["GET"])
+def job_detail(request, job_id: str):
+    denied = _forbidden(request)
+    if denied:
+        return denied
+    try:
+        job = get_job(job_id)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    return Response(serialize_job(job), status=status.HTTP_200_OK)
+
+@api_view(["POST"])
+def job_cancel(request, job_id: str):
+    denied = _forbidden(request)
+    if denied:
+        return denied
+    try:
+        job = cancel_job(job_id)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    return Response(serialize_job(job), status=status.HTTP_200_OK)
+
+@api_view(["GET"])
+def job_result(request, job_id: str):
+    denied = _forbidden(request)
+    if denied:
+        return denied
+    try:
+        job = get_job(job_id)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        path, content_type, filename = result_file(job)
+    except ValueError as e:
+        return Response({"detail": str(e), "status": job.status}, status=status.HTTP_409_CONFLICT)
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=filename, content_type=content_type)
@@ -2,9 +2,11 @@ from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework import status
+from datetime import datetime, timedelta
+from services.leaveCalendar_services import leave_coverage
 from services.leaveRequeast_services import (
-    create_leave_request, list_my_leave_requests, serialize_leave,
-    admin_list_pending_leaves, set_leave_status
+    create_leave_request, list_my_leave_requests, serialize_leave, serialize_leaves,
+    admin_list_pending_leaves, set_leave_status, set_leave_status_many, summarize_bulk, MAX_BULK_IDS
 )
 
 @api_view(["GET", "POST"])
@@ -16,7 +18,7 @@ def leave_requests(request):
 
     if request.method == "GET":
         docs = list_my_leave_requests(emp)
-        return Response([serialize_leave(d) for d in docs], status=status.HTTP_200_OK)
+        return Response(serialize_leaves(docs), status=status.HTTP_200_OK)
 
     data = request.data or {}
     try:
@@ -31,7 +33,7 @@ def admin_pending_leaves(request):
     if not emp or not getattr(emp, "isAdmin", False):
         return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
     docs = admin_list_pending_leaves()
-    return Response([serialize_leave(d) for d in docs], status=status.HTTP_200_OK)
+    return Response(serialize_leaves(docs), status=status.HTTP_200_OK)
 
 @api_view(["PATCH"])
 def admin_approve_leave(request, id: str):
@@ -53,4 +55,41 @@ def admin_deny_leave(request, id: str):
         lr = set_leave_status(id, "Rejected")
         return Response(serialize_leave(lr), status=status.HTTP_200_OK)
     except ValueError as e:
-        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(["GET"])
+def admin_leave_coverage(request):
+    """Per-day out-of-office counts for ?from=YYYY-MM-DD&to=YYYY-MM-DD (default: the next 30 days)."""
+    emp = getattr(request, "employee", None)
+    if not emp or not getattr(emp, "isAdmin", False):
+        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+    qp = request.query_params
+    try:
+        start = datetime.strptime(qp["from"], "%Y-%m-%d").date() if qp.get("from") else datetime.now().date()
+        end = datetime.strptime(qp["to"], "%Y-%m-%d").date() if qp.get("to") else start + timedelta(days=30)
+    except ValueError:
+        return Response({"detail": "Invalid date format (expected YYYY-MM-DD)"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return Response(leave_coverage(start, end), status=status.HTTP_200_OK)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(["PATCH"])
+def admin_bulk_leave_status(request):
+    """Body: {"ids": [...], "status": "Approved" | "Rejected"}; only Pending requests change."""
+    emp = getattr(request, "employee", None)
+    if not emp or not getattr(emp, "isAdmin", False):
+        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+    data = request.data
+    if not isinstance(data, dict):
+        return Response({"detail": "Body must be a JSON object"}, status=status.HTTP_400_BAD_REQUEST)
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not ids:
+        return Response({"detail": "ids must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > MAX_BULK_IDS:
+        return Response({"detail": f"At most {MAX_BULK_IDS} ids per request"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        results = set_leave_status_many(ids, data.get("status"))
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"results": results, "summary": summarize_bulk(results)}, status=status.HTTP_200_OK)
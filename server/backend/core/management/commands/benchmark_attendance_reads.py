@@ -0,0 +1,78 @@
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from bson import ObjectId
+from django.core.management.base import BaseCommand
+from database.models.attendance_model import Attendance
+from services.attendance_services import serialize_attendance, serialize_attendance_raw
+
+def _raw_rows(n: int, employees: int = 2000):
+    """Dicts shaped like pymongo's output for the attendances collection."""
+    emp_ids = [ObjectId() for _ in range(employees)]
+    day0 = datetime(2024, 1, 1)
+    for i in range(n):
+        d = day0 + timedelta(days=i // employees)
+        t_in = d.replace(hour=8, minute=i % 60)
+        yield {
+            "_id": ObjectId(),
+            "employee": emp_ids[i % employees],
+            "date": d,
+            "timeIn": t_in,
+            "timeOut": t_in + timedelta(hours=8, minutes=30),
+            "status": "Present" if i % 5 else "Late",
+            "hoursWorked": "08:30:00",
+            "created_at": t_in,
+            "updated_at": t_in,
+        }
+
+def _document_path(n: int):
+    # What list(Attendance.objects(...)) + serialize_attendance does per row
+    docs = [Attendance._from_son(row) for row in _raw_rows(n)]
+    return [serialize_attendance(a) for a in docs]
+
+def _raw_path(n: int):
+    rows = list(_raw_rows(n))
+    return [serialize_attendance_raw(r) for r in rows]
+
+class Command(BaseCommand):
+    help = "Compare per-row CPU and peak memory of Document vs raw-dict attendance serialization (no DB needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+
+    def _measure(self, fn, n):
+        # Timing and memory are separate runs: tracemalloc slows allocation-heavy code a lot
+        gc.collect()
+        t0 = time.perf_counter()
+        out = fn(n)
+        elapsed = time.perf_counter() - t0
+        assert len(out) == n
+        del out
+        gc.collect()
+        tracemalloc.start()
+        fn(n)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak
+
+    def handle(self, *args, **options):
+        n = options["rows"]
+        # Baseline: generating the input rows alone
+        base_t, base_mem = self._measure(lambda k: list(_raw_rows(k)), n)
+        base_us = base_t / n * 1e6
+        results = {
+            "document": self._measure(_document_path, n),
+            "raw": self._measure(_raw_path, n),
+        }
+        self.stdout.write(f"rows: {n} (row generation alone: {base_t:.2f}s, {base_mem / n:.0f} B/row)")
+        for name, (elapsed, peak) in results.items():
+            self.stdout.write(
+                f"{name:>9}: {elapsed:.2f}s total, {elapsed / n * 1e6 - base_us:.1f} us/row over generation, "
+                f"peak {peak / n:.0f} B/row"
+            )
+        doc_t, doc_mem = results["document"]
+        raw_t, raw_mem = results["raw"]
+        self.stdout.write(self.style.SUCCESS(
+            f"raw path: {doc_t / raw_t:.1f}x faster, {doc_mem / raw_mem:.1f}x less peak memory"
+        ))
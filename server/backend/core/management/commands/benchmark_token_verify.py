@@ -0,0 +1,52 @@
+import time
+from django.core.management.base import BaseCommand
+from utils.firebaseTokenVerifier import FirebaseTokenVerifier, KeySet
+from utils.localKeySet import LocalKeySet
+from utils.tokenCache import VerifiedTokenCache
+
+PROJECT_ID = "benchmark-project"
+
+class _StaticSource:
+    def __init__(self, pems):
+        self.pems = pems
+
+    def fetch(self):
+        return self.pems, 3600
+
+class Command(BaseCommand):
+    help = "Single-thread Firebase ID token verifications per second with a local key set (no network or DB)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tokens", type=int, default=200, help="Distinct tokens to cycle through.")
+        parser.add_argument("--seconds", type=float, default=2.0, help="Time budget per scenario.")
+
+    def _rate(self, fn, tokens, seconds):
+        n = 0
+        t0 = time.perf_counter()
+        deadline = t0 + seconds
+        while time.perf_counter() < deadline:
+            for tok in tokens:
+                fn(tok)
+            n += len(tokens)
+        return n / (time.perf_counter() - t0)
+
+    def handle(self, *args, **options):
+        local = LocalKeySet.generate()
+        tokens = [local.mint(PROJECT_ID, f"user-{i}") for i in range(options["tokens"])]
+        verifier = FirebaseTokenVerifier(PROJECT_ID, KeySet(_StaticSource(local.public_pems())))
+        verifier.verify(tokens[0])  # load keys outside the timed loop
+
+        cache = VerifiedTokenCache(max_entries=len(tokens))
+
+        def cached(tok):
+            claims = cache.get(tok)
+            if claims is None:
+                cache.set(tok, verifier.verify(tok))
+
+        results = {
+            "rs256 verify": self._rate(verifier.verify, tokens, options["seconds"]),
+            "cached": self._rate(cached, tokens, options["seconds"]),
+        }
+        for name, rate in results.items():
+            self.stdout.write(f"{name:>13}: {rate:,.0f} verifications/s/core ({1e6 / rate:.1f} us each)")
+        self.stdout.write(self.style.SUCCESS(f"cache hit path: {results['cached'] / results['rs256 verify']:.0f}x faster"))
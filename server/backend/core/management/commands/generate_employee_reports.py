@@ -0,0 +1,52 @@
+from datetime import datetime
+from bson import ObjectId
+from django.core.management.base import BaseCommand, CommandError
+from config.db_config import connect_mongo
+from services.reportBatch_services import FORMATS, run_report_batch
+
+class Command(BaseCommand):
+    help = (
+        "Build the monthly employee report for the whole workforce (or --employees) "
+        "across a process pool and stream it to one JSONL or CSV file. "
+        "Re-run with --resume to continue an interrupted file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", default=datetime.today().strftime("%Y-%m"), help="YYYY-MM (default: current month)")
+        parser.add_argument("--employees", default="", help="Comma-separated employee ids (default: everyone)")
+        parser.add_argument("--format", choices=FORMATS, default="jsonl")
+        parser.add_argument("--output", help="Output file (default: employee_reports_<month>.<format>)")
+        parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = inline)")
+        parser.add_argument("--chunk-size", type=int, default=50, help="Employees fetched and built per task")
+        parser.add_argument("--resume", action="store_true", help="Skip employees already in the output file and append")
+
+    def handle(self, *args, **options):
+        employee_ids = [e.strip() for e in options["employees"].split(",") if e.strip()]
+        bad = [e for e in employee_ids if not ObjectId.is_valid(e)]
+        if bad:
+            raise CommandError(f"Invalid employee id(s): {', '.join(bad)}")
+        fmt = options["format"]
+        output = options["output"] or f"employee_reports_{options['month']}.{fmt}"
+
+        connect_mongo()
+
+        def progress(done, total):
+            self.stdout.write(f"{done}/{total} report(s) written")
+
+        try:
+            summary = run_report_batch(
+                options["month"],
+                output,
+                fmt=fmt,
+                employee_ids=employee_ids or None,
+                workers=options["workers"],
+                chunk_size=options["chunk_size"],
+                resume=options["resume"],
+                progress=progress,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {summary['written']} report(s) to {summary['output']} "
+            f"({summary['skipped']} already present, {summary['total']} total)."
+        ))
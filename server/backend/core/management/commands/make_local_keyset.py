@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from config.tokenVerifier_config import firebase_project_id
+from utils.localKeySet import LocalKeySet
+
+class Command(BaseCommand):
+    help = "Create a local signing key set for FIREBASE_TOKEN_VERIFIER=local and optionally mint ID tokens with it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--private", default="local_keyset_private.json", help="Where to write/read the signing key.")
+        parser.add_argument("--public", default="local_keyset.json", help="Public {kid: pem} file (FIREBASE_LOCAL_KEYSET).")
+        parser.add_argument("--reuse", action="store_true", help="Load the existing private key instead of generating one.")
+        parser.add_argument("--mint", metavar="UID", help="Print an ID token for this Firebase uid.")
+        parser.add_argument("--email", help="email claim for the minted token.")
+        parser.add_argument("--ttl", type=int, default=3600)
+
+    def handle(self, *args, **options):
+        if options["reuse"]:
+            keyset = LocalKeySet.load(options["private"])
+        else:
+            keyset = LocalKeySet.generate()
+            keyset.save(options["private"], options["public"])
+            self.stdout.write(f"Wrote {options['private']} and {options['public']} (kid {keyset.kid}).")
+
+        if options["mint"]:
+            project_id = firebase_project_id()
+            if not project_id:
+                raise CommandError("Set FIREBASE_PROJECT_ID to mint tokens")
+            extra = {"email": options["email"]} if options["email"] else {}
+            self.stdout.write(keyset.mint(project_id, options["mint"], ttl=options["ttl"], **extra))
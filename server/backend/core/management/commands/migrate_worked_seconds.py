@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+from config.db_config import connect_mongo
+from database.models.attendance_model import Attendance
+from services.attendance_services import _seconds_from_hours_worked
+from services.employeeReport_services import clear_report_snapshots
+
+def _worked_seconds(row) -> int:
+    seconds = _seconds_from_hours_worked(row.get("hoursWorked"))
+    if seconds is not None:
+        return seconds
+    if row.get("timeIn") and row.get("timeOut"):
+        return max(0, int((row["timeOut"] - row["timeIn"]).total_seconds()))
+    return 0
+
+class Command(BaseCommand):
+    help = (
+        "Backfill Attendance.workedSeconds from hoursWorked in _id-ordered batches. "
+        "Safe to interrupt and re-run: only documents still missing the field are touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Count pending documents without writing.")
+
+    def handle(self, *args, **options):
+        connect_mongo()
+        coll = Attendance._get_collection()
+        pending = {"workedSeconds": {"$exists": False}}
+        total = coll.count_documents(pending)
+        self.stdout.write(f"{total} attendance document(s) without workedSeconds.")
+        if options["dry_run"] or not total:
+            return
+
+        batch_size = max(1, options["batch_size"])
+        done = 0
+        last_id = None
+        while True:
+            query = dict(pending)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            rows = list(
+                coll.find(query, {"hoursWorked": 1, "timeIn": 1, "timeOut": 1}).sort("_id", 1).limit(batch_size)
+            )
+            if not rows:
+                break
+            ops = [
+                # $exists guard: a concurrent time_out may have set the field already
+                UpdateOne({"_id": r["_id"], "workedSeconds": {"$exists": False}}, {"$set": {"workedSeconds": _worked_seconds(r)}})
+                for r in rows
+            ]
+            done += coll.bulk_write(ops, ordered=False).modified_count
+            last_id = rows[-1]["_id"]
+            self.stdout.write(f"Migrated {done}/{total} (last _id {last_id})")
+
+        if done:
+            # Stored month reports were built with the old (missing) hour totals
+            clear_report_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Backfilled workedSeconds on {done} document(s)."))
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from config.db_config import connect_mongo
+from services.attendanceRollup_services import rebuild_rollup, default_rebuild_window
+
+class Command(BaseCommand):
+    help = "Backfill the attendance_daily_rollup collection from raw attendances and leave requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to rebuild (YYYY-MM-DD). Defaults to the earliest record.")
+        parser.add_argument("--end", help="Last date to rebuild (YYYY-MM-DD). Defaults to today or the last approved leave day.")
+        parser.add_argument("--chunk-days", type=int, default=31, help="Days rebuilt per batch.")
+
+    def handle(self, *args, **options):
+        connect_mongo()
+        default_start, default_end = default_rebuild_window()
+        try:
+            start = datetime.strptime(options["start"], "%Y-%m-%d").date() if options["start"] else default_start
+            end = datetime.strptime(options["end"], "%Y-%m-%d").date() if options["end"] else default_end
+        except ValueError:
+            raise CommandError("Invalid date format (expected YYYY-MM-DD)")
+        if end < start:
+            raise CommandError("--end is before --start")
+        chunk = max(1, options["chunk_days"])
+
+        total = 0
+        cur = start
+        while cur <= end:
+            chunk_end = min(end, cur + timedelta(days=chunk - 1))
+            total += rebuild_rollup(cur, chunk_end)
+            self.stdout.write(f"Rebuilt {cur.isoformat()}..{chunk_end.isoformat()}")
+            cur = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} rollup day(s) from {start.isoformat()} to {end.isoformat()}."))
@@ -0,0 +1,29 @@
+import signal
+from django.core.management.base import BaseCommand
+from config.db_config import connect_mongo
+from services.jobWorker_services import JobWorker
+
+class Command(BaseCommand):
+    help = (
+        "Run queued jobs (exports, analytics, report batches) from the jobs collection, "
+        "each in its own process. Run one or more per host alongside the web workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--slots", type=int, default=None, help="Concurrent jobs (default: JOB_WORKER_SLOTS or 2)")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between scheduling passes")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is drained")
+
+    def handle(self, *args, **options):
+        connect_mongo()
+        worker = JobWorker(slots=options["slots"], poll_interval=max(0.1, options["poll_interval"]))
+
+        def _stop(signum, frame):
+            raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, _stop)
+        self.stdout.write(f"Job worker {worker.worker_id} running with {worker.slots} slot(s)")
+        try:
+            worker.run(once=options["once"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping; running jobs marked failed.")
@@ -18,4 +18,6 @@ urlpatterns += [
     path('', include('routes.admin_attendance_routes')),
     path('', include('routes.admin_analytics_routes')),
     path('', include('routes.admin_dashboard_routes')),  # added
+    path('', include('routes.admin_metrics_routes')),
+    path('', include('routes.job_routes')),
 ]
@@ -0,0 +1,37 @@
+from mongoengine import (
+    Document, DateField, DateTimeField, IntField, ListField, ObjectIdField, BooleanField
+)
+import datetime
+
+class AttendanceDailyRollup(Document):
+    """
+    One document per calendar date with precomputed attendance counts.
+    Maintained incrementally by the attendance/leave services and backfilled
+    with `manage.py rebuild_attendance_rollup`.
+    """
+    meta = {
+        "collection": "attendance_daily_rollup",
+        "indexes": [
+            {"fields": ["date"], "unique": True},
+        ],
+    }
+
+    date = DateField(required=True)
+    present = IntField(default=0)
+    late = IntField(default=0)
+    onLeave = IntField(default=0)
+    absent = IntField(default=0)
+
+    presentIds = ListField(ObjectIdField())
+    lateIds = ListField(ObjectIdField())
+    leaveIds = ListField(ObjectIdField())
+    absentIds = ListField(ObjectIdField())
+
+    # True once absentIds were derived from the employee roster (past days only)
+    closed = BooleanField(default=False)
+
+    updated_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    def save(self, *args, **kwargs):
+        self.updated_at = datetime.datetime.utcnow()
+        return super().save(*args, **kwargs)
@@ -1,5 +1,5 @@
 from mongoengine import (
-    Document, ReferenceField, DateField, DateTimeField, StringField
+    Document, ReferenceField, DateField, DateTimeField, StringField, IntField
 )
 import datetime
 from .employee_model import Employee
@@ -9,6 +9,7 @@ class Attendance(Document):
         "collection": "attendances",
         "indexes": [
             {"fields": ["employee", "date"], "unique": True},
+            {"fields": ["date", "employee"]},
         ],
     }
 
@@ -18,6 +19,8 @@ class Attendance(Document):
     timeOut = DateTimeField(null=True)
     status = StringField(choices=["Present", "Late"], required=False, default=None)
     hoursWorked = StringField(default="00:00:00")
+    # Same duration as hoursWorked, as an integer so Mongo can $sum it
+    workedSeconds = IntField(default=0)
 
     created_at = DateTimeField(default=datetime.datetime.utcnow)
     updated_at = DateTimeField(default=datetime.datetime.utcnow)
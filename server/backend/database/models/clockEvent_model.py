@@ -0,0 +1,24 @@
+from mongoengine import Document, ObjectIdField, StringField, DateTimeField
+import datetime
+
+class ClockEvent(Document):
+    """
+    Idempotency log for punches ingested in bulk from kiosks and badge readers.
+    A key seen once is reported as a duplicate on every later delivery.
+    """
+    meta = {
+        "collection": "clock_events",
+        "indexes": [
+            {"fields": ["idempotencyKey"], "unique": True},
+            # Buffered devices retry within days; keep keys for 90
+            {"fields": ["created_at"], "expireAfterSeconds": 90 * 24 * 3600},
+        ],
+    }
+
+    idempotencyKey = StringField(required=True, max_length=200)
+    employee = ObjectIdField(required=True)
+    timestamp = DateTimeField(required=True)
+    direction = StringField(required=True, choices=["in", "out"])
+    result = StringField(required=True)
+
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
@@ -0,0 +1,26 @@
+from mongoengine import Document, ObjectIdField, StringField, IntField, DictField, DateTimeField
+import datetime
+
+class EmployeeReportSnapshot(Document):
+    """
+    Stored employee report for a closed month (YYYY-MM). Written on first view
+    and retired whenever an attendance or leave write touches that employee
+    and month (or the month before, which the report compares against): the
+    payload is dropped and the generation bumped, so a report computed before
+    the write is not stored over it.
+    """
+    meta = {
+        "collection": "employee_report_snapshots",
+        "indexes": [
+            {"fields": ["employee", "month"], "unique": True},
+        ],
+    }
+
+    employee = ObjectIdField(required=True)
+    month = StringField(required=True, max_length=7)
+    # Bumped when the report payload changes shape; older snapshots are recomputed
+    version = IntField(required=True)
+    payload = DictField()
+    generation = IntField(default=0)
+
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
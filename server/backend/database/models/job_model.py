@@ -0,0 +1,40 @@
+from mongoengine import (
+    Document, ObjectIdField, StringField, IntField, BooleanField, DictField, DateTimeField,
+)
+import datetime
+
+JOB_STATUSES = ["queued", "running", "succeeded", "failed", "cancelled"]
+
+class Job(Document):
+    """
+    A long-running export or analytics computation. Submitted by the API,
+    claimed and run by `manage.py run_job_worker`; the result is a file under
+    JOB_RESULTS_DIR.
+    """
+    meta = {
+        "collection": "jobs",
+        "indexes": [
+            {"fields": ["status", "type", "created_at"]},
+            {"fields": ["createdBy", "-created_at"]},
+            {"fields": ["finished_at"]},
+        ],
+    }
+
+    type = StringField(required=True)
+    params = DictField()
+    status = StringField(required=True, choices=JOB_STATUSES, default="queued")
+    createdBy = ObjectIdField()
+
+    progress = DictField()   # {"done": int, "total": int | None}
+    error = StringField()
+    resultPath = StringField()
+    resultSize = IntField()
+
+    cancelRequested = BooleanField(default=False)
+    timeoutSeconds = IntField(required=True)
+    workerId = StringField()
+    heartbeat_at = DateTimeField()
+
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+    started_at = DateTimeField()
+    finished_at = DateTimeField()
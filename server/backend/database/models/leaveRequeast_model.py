@@ -7,6 +7,8 @@ class LeaveRequeast(Document):
         "collection": "leave_requests",
         "indexes": [
             {"fields": ["employee", "startDate", "endDate"]},
+            # Leave coverage: every tracked leave starting by the end of a window
+            {"fields": ["status", "startDate", "endDate"]},
         ],
     }
 
@@ -1,7 +1,8 @@
 from django.urls import path
-from controllers.admin_attendance_controller import admin_attendance
+from controllers.admin_attendance_controller import admin_attendance, admin_attendance_export
 from middlewares.auth_middlewares import require_firebase_auth
 
 urlpatterns = [
     path("api/admin/attendance", require_firebase_auth(admin_attendance)),
+    path("api/admin/attendance/export", require_firebase_auth(admin_attendance_export)),
 ]
\ No newline at end of file
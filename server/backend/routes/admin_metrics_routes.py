@@ -0,0 +1,7 @@
+from django.urls import path
+from controllers.admin_metrics_controller import admin_metrics
+from middlewares.auth_middlewares import require_firebase_auth
+
+urlpatterns = [
+    path("api/admin/metrics", require_firebase_auth(admin_metrics), name="admin_metrics"),
+]
@@ -1,5 +1,5 @@
 from django.urls import path
-from controllers.attendace_controller import today, time_in_view, time_out_view, history
+from controllers.attendace_controller import today, time_in_view, time_out_view, history, clock_events_view
 from middlewares.auth_middlewares import require_firebase_auth
 
 urlpatterns = [
@@ -7,4 +7,5 @@ urlpatterns = [
     path("attendance/time-in", require_firebase_auth(time_in_view), name="attendance_time_in"),
     path("attendance/time-out", require_firebase_auth(time_out_view), name="attendance_time_out"),
     path("attendance/history", require_firebase_auth(history), name="attendance_history"),
+    path("attendance/events", require_firebase_auth(clock_events_view), name="attendance_events"),
 ]
\ No newline at end of file
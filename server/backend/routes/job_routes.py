@@ -0,0 +1,10 @@
+from django.urls import path
+from controllers.job_controller import jobs, job_detail, job_cancel, job_result
+from middlewares.auth_middlewares import require_firebase_auth
+
+urlpatterns = [
+    path("api/jobs", require_firebase_auth(jobs), name="jobs"),
+    path("api/jobs/<str:job_id>", require_firebase_auth(job_detail), name="job_detail"),
+    path("api/jobs/<str:job_id>/cancel", require_firebase_auth(job_cancel), name="job_cancel"),
+    path("api/jobs/<str:job_id>/result", require_firebase_auth(job_result), name="job_result"),
+]
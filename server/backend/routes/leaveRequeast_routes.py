@@ -1,10 +1,15 @@
 from django.urls import path
-from controllers.leaveRequeast_controller import leave_requests, admin_pending_leaves, admin_approve_leave, admin_deny_leave
+from controllers.leaveRequeast_controller import (
+    leave_requests, admin_pending_leaves, admin_approve_leave, admin_deny_leave,
+    admin_leave_coverage, admin_bulk_leave_status,
+)
 from middlewares.auth_middlewares import require_firebase_auth
 
 urlpatterns = [
     path("leave-requests", require_firebase_auth(leave_requests), name="leave_requests"),
     path("api/leaves/pending", require_firebase_auth(admin_pending_leaves), name="admin_pending_leaves"),
+    path("api/leaves/coverage", require_firebase_auth(admin_leave_coverage), name="admin_leave_coverage"),
+    path("api/leaves/bulk-status", require_firebase_auth(admin_bulk_leave_status), name="admin_bulk_leave_status"),
     path("api/leaves/<str:id>/approve", require_firebase_auth(admin_approve_leave), name="admin_approve_leave"),
     path("api/leaves/<str:id>/deny", require_firebase_auth(admin_deny_leave), name="admin_deny_leave"),
 ]
\ No newline at end of file
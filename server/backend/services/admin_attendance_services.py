@@ -0,0 +1,149 @@
+import base64
+import heapq
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Tuple
+from bson import ObjectId
+from database.models.attendance_model import Attendance
+from database.models.employee_model import Employee
+from database.models.leaveRequeast_model import LeaveRequeast
+from services.attendance_services import LIST_FIELDS
+from utils.batchDereference import employee_names
+from utils.dayBitmap import EmployeeDayBitmap
+from utils.leaveIntervals import daterange
+
+BATCH_SIZE = 1000
+STATUSES = {"Present", "Late", "Absent"}
+# Days of absence bitmap built per step; bounds the work a single page does
+ABSENT_WINDOW_DAYS = 31
+
+def encode_cursor(day: str, employee_id: str) -> str:
+    """Opaque keyset cursor for the (date, employeeId) sort order."""
+    return base64.urlsafe_b64encode(f"{day}|{employee_id}".encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[date, ObjectId]:
+    try:
+        day, emp_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.strptime(day, "%Y-%m-%d").date(), ObjectId(emp_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _serialize_row(r: Dict[str, Any], names: Dict[str, str]) -> Dict[str, Any]:
+    emp_id = str(r["employee"])
+    return {
+        "id": str(r["_id"]),
+        "employeeId": emp_id,
+        "employeeName": names.get(emp_id, ""),
+        "date": r["date"].date().isoformat(),
+        "timeIn": r["timeIn"].isoformat() if r.get("timeIn") else None,
+        "timeOut": r["timeOut"].isoformat() if r.get("timeOut") else None,
+        "status": r.get("status") or None,
+        "hoursWorked": r.get("hoursWorked", "00:00:00"),
+        # None on rows not migrated to workedSeconds yet
+        "workedSeconds": r.get("workedSeconds"),
+    }
+
+def iter_attendance_rows(
+    start: date,
+    end: date,
+    status: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    after: Optional[Tuple[date, ObjectId]] = None,
+    include_absent: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Serialized attendance rows for [start, end] ordered by (date, employeeId),
+    read from the cursor in batches so memory stays bounded by BATCH_SIZE.
+    `after` resumes strictly after a (date, employee ObjectId) keyset position.
+    With include_absent, synthetic Absent rows are merged in the same order.
+    """
+    recorded = _recorded_rows(start, end, status, employee_id, after) if status != "Absent" else iter(())
+    if not include_absent or status not in (None, "Absent"):
+        return recorded
+    absent = _absent_rows(start, end, employee_id, after)
+    return heapq.merge(recorded, absent, key=lambda r: (r["date"], r["employeeId"]))
+
+def _employee_filter(qs, employee_id: Optional[str]):
+    return qs.filter(__raw__={"employee": ObjectId(employee_id)}) if employee_id else qs
+
+def _recorded_rows(start, end, status, employee_id, after) -> Iterator[Dict[str, Any]]:
+    qs = _employee_filter(Attendance.objects(date__gte=start, date__lte=end), employee_id)
+    if status:
+        qs = qs.filter(status=status)
+    if after:
+        after_day = datetime(after[0].year, after[0].month, after[0].day)
+        qs = qs.filter(__raw__={"$or": [
+            {"date": {"$gt": after_day}},
+            {"date": after_day, "employee": {"$gt": after[1]}},
+        ]})
+    cursor = qs.order_by("date", "employee").only(*LIST_FIELDS, "workedSeconds").as_pymongo().batch_size(BATCH_SIZE)
+
+    names: Dict[str, str] = {}
+    batch = []
+    for row in cursor:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield from _flush(batch, names)
+            batch = []
+    if batch:
+        yield from _flush(batch, names)
+
+def _absent_rows(start, end, employee_id, after) -> Iterator[Dict[str, Any]]:
+    """
+    Weekday employee-days with neither an attendance record nor approved
+    leave, generated one day at a time from an employee x day bitmap. Scanning
+    starts at the cursor's day and proceeds in ABSENT_WINDOW_DAYS windows, so
+    a page only reads attendance and leaves for the days it actually emits.
+    """
+    roster_qs = Employee.objects(id=employee_id) if employee_id else Employee.objects()
+    # Hex ObjectId order matches Mongo's ObjectId sort, so rows merge cleanly
+    roster = sorted(roster_qs.only("firstName", "lastName").as_pymongo(), key=lambda r: str(r["_id"]))
+    names = {
+        str(r["_id"]): f"{r.get('firstName') or ''} {r.get('lastName') or ''}".strip()
+        for r in roster
+    }
+    after_day, after_emp = (after[0], str(after[1])) if after else (None, None)
+
+    window_start = max(start, after_day) if after_day else start
+    while window_start <= end:
+        window_end = min(end, window_start + timedelta(days=ABSENT_WINDOW_DAYS - 1))
+        bitmap = _absence_bitmap(names, window_start, window_end, employee_id)
+        for day in daterange(window_start, window_end):
+            if day.weekday() >= 5:
+                continue
+            iso = day.isoformat()
+            for emp_id in bitmap.unmarked_on(day):
+                if day == after_day and emp_id <= after_emp:
+                    continue
+                yield {
+                    "id": f"absent-{emp_id}-{iso}",
+                    "employeeId": emp_id,
+                    "employeeName": names[emp_id],
+                    "date": iso,
+                    "timeIn": None,
+                    "timeOut": None,
+                    "status": "Absent",
+                    "hoursWorked": "00:00:00",
+                    "workedSeconds": 0,
+                }
+        window_start = window_end + timedelta(days=1)
+
+def _absence_bitmap(names: Dict[str, str], start: date, end: date, employee_id) -> EmployeeDayBitmap:
+    """Roster x [start, end] bitmap with attendance days and approved leave days marked."""
+    bitmap = EmployeeDayBitmap(names, start, end)
+    att_qs = _employee_filter(Attendance.objects(date__gte=start, date__lte=end), employee_id)
+    for r in att_qs.only("employee", "date").as_pymongo():
+        bitmap.mark(r["employee"], r["date"].date())
+    leave_qs = _employee_filter(
+        LeaveRequeast.objects(status="Approved", startDate__lte=end, endDate__gte=start), employee_id
+    )
+    for r in leave_qs.only("employee", "startDate", "endDate").as_pymongo():
+        bitmap.mark_range(r["employee"], r["startDate"].date(), r["endDate"].date())
+    return bitmap
+
+def _flush(batch, names: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+    # names is bounded by headcount; only look up employees not seen yet
+    missing = {str(r["employee"]) for r in batch} - names.keys()
+    if missing:
+        names.update(employee_names(missing))
+    for r in batch:
+        yield _serialize_row(r, names)
@@ -2,25 +2,24 @@ from datetime import date, timedelta
 from collections import defaultdict
 from typing import Dict, Any, List
 from database.models.employee_model import Employee
-from database.models.attendance_model import Attendance
 from database.models.leaveRequeast_model import LeaveRequeast
-
-def _daterange(d0: date, d1: date):
-    cur = d0
-    while cur <= d1:
-        yield cur
-        cur += timedelta(days=1)
+from services.attendanceRollup_services import load_rollup, day_absent
+from utils.leaveIntervals import daterange
+from utils.batchDereference import ref_id, employee_names, employee_names_for
 
 def build_dashboard_summary() -> Dict[str, Any]:
     today = date.today()
     employees_count = Employee.objects.count()
 
-    present_today = Attendance.objects(date=today, status="Present").count()
-    late_today = Attendance.objects(date=today, status="Late").count()
+    # One rollup document per day instead of scanning attendances/leave_requests
+    start7 = today - timedelta(days=6)
+    start30 = today - timedelta(days=30)
+    rollup = load_rollup(start30, today, "lateIds")
 
-    leaves_today = LeaveRequeast.objects(status="Approved", startDate__lte=today, endDate__gte=today)
-    leave_emp_ids_today = {str(lr.employee.id) for lr in leaves_today if lr.employee}
-    approved_leaves_today = len(leave_emp_ids_today)
+    today_row = rollup.get(today, {})
+    present_today = today_row.get("present", 0)
+    late_today = today_row.get("late", 0)
+    approved_leaves_today = today_row.get("onLeave", 0)
 
     recorded_today = present_today + late_today
     absent_today = max(0, employees_count - recorded_today - approved_leaves_today)
@@ -28,56 +27,33 @@ def build_dashboard_summary() -> Dict[str, Any]:
     pending_leaves = LeaveRequeast.objects(status="Pending").count()
 
     # 7-day trend
-    start7 = today - timedelta(days=6)
-    trend7_map: Dict[str, Dict[str, int]] = defaultdict(lambda: {"present": 0, "late": 0})
-    att7 = Attendance.objects(date__gte=start7, date__lte=today)
-    for a in att7:
-        label = a.date.isoformat()
-        if a.status == "Present":
-            trend7_map[label]["present"] += 1
-        elif a.status == "Late":
-            trend7_map[label]["late"] += 1
-
-    leaves7 = LeaveRequeast.objects(status="Approved", startDate__lte=today, endDate__gte=start7)
-    leaves7_days = set()
-    for lr in leaves7:
-        s = max(lr.startDate, start7)
-        e = min(lr.endDate, today)
-        for d in _daterange(s, e):
-            if d.weekday() < 5 and lr.employee:
-                leaves7_days.add((str(lr.employee.id), d))
-
     trend7 = []
-    for d in _daterange(start7, today):
-        label = d.isoformat()
-        present = trend7_map[label]["present"]
-        late = trend7_map[label]["late"]
-        leave_emps_day = {eid for (eid, dd) in leaves7_days if dd == d}
-        leave_slots = len(leave_emps_day)
-        if d.weekday() < 5:
-            absent = max(0, employees_count - (present + late) - leave_slots)
-        else:
-            absent = 0
-        trend7.append({"date": label, "present": present, "late": late, "absent": absent})
+    for d in daterange(start7, today):
+        row = rollup.get(d, {})
+        trend7.append({
+            "date": d.isoformat(),
+            "present": row.get("present", 0),
+            "late": row.get("late", 0),
+            "absent": day_absent(row, d, employees_count),
+        })
 
     # Top lates 30 days
-    start30 = today - timedelta(days=30)
-    late30 = Attendance.objects(status="Late", date__gte=start30, date__lte=today)
     late_by_emp: Dict[str, int] = defaultdict(int)
-    for a in late30:
-        if a.employee:
-            late_by_emp[str(a.employee.id)] += 1
-    emp_map = {str(e.id): e for e in Employee.objects()}
+    for row in rollup.values():
+        for eid in row.get("lateIds", []):
+            late_by_emp[str(eid)] += 1
+    late_names = employee_names(late_by_emp.keys())
     top_lates_30 = sorted(
-        [{"name": f"{emp_map[eid].firstName} {emp_map[eid].lastName}".strip(), "lates": cnt}
-         for eid, cnt in late_by_emp.items()],
+        [{"name": late_names[eid], "lates": cnt}
+         for eid, cnt in late_by_emp.items() if eid in late_names],
         key=lambda x: -x["lates"]
     )[:8]
 
-    recent_leaves = LeaveRequeast.objects().order_by("-created_at")[:8]
+    recent_leaves = list(LeaveRequeast.objects().order_by("-created_at").no_dereference()[:8])
+    recent_names = employee_names_for(recent_leaves)
     recent = [{
         "id": str(lr.id),
-        "employeeName": f"{lr.employee.firstName} {lr.employee.lastName}".strip() if lr.employee else None,
+        "employeeName": recent_names.get(str(ref_id(lr))),
         "leaveType": lr.leaveType,
         "startDate": lr.startDate.isoformat() if lr.startDate else None,
         "endDate": lr.endDate.isoformat() if lr.endDate else None,
@@ -0,0 +1,75 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+from config.cache_config import get_cache, cache_ttl, lock_dir
+from utils.singleFlight import SingleFlight, file_lock
+
+VERSION_KEY = "analytics:version"
+
+_flight = SingleFlight()
+_metrics_lock = threading.Lock()
+_metrics = {
+    "hits": 0,                 # served straight from the cache
+    "computed": 0,             # ran the full computation
+    "coalescedProcesses": 0,   # waited on another worker and read its cached result
+}
+
+def _count(name: str) -> None:
+    with _metrics_lock:
+        _metrics[name] += 1
+
+def cache_metrics() -> Dict[str, Any]:
+    with _metrics_lock:
+        data = dict(_metrics)
+    # waited on another thread's in-flight computation
+    data["coalescedThreads"] = _flight.stats["coalesced"]
+    data["pid"] = os.getpid()
+    return data
+
+def current_version() -> int:
+    return int(get_cache().get(VERSION_KEY) or 0)
+
+def bump_analytics_version() -> None:
+    """
+    Invalidate every cached analytics payload. Called after attendance, leave
+    and employee writes; entries keyed by older versions simply age out.
+    """
+    try:
+        get_cache().incr(VERSION_KEY)
+    except Exception as ex:
+        print("Analytics cache invalidation failed:", ex)
+
+def get_or_compute(name: str, compute: Callable[[], Any], *key_parts: Any, ttl: Optional[int] = None) -> Any:
+    """
+    Cached payload for `name`. Concurrent misses for the same key run `compute`
+    once: threads coalesce in-process, and with a shared cache backend worker
+    processes coalesce through a host-wide file lock.
+    """
+    ttl = ttl if ttl is not None else cache_ttl()
+    cache = get_cache()
+    key = ":".join([name, f"v{current_version()}", *[str(p) for p in key_parts]])
+    if ttl > 0:
+        cached = cache.get(key)
+        if cached is not None:
+            _count("hits")
+            return cached
+
+    def _fill():
+        if not cache.shared or ttl <= 0:
+            _count("computed")
+            value = compute()
+            if ttl > 0:
+                cache.set(key, value, ttl)
+            return value
+        with file_lock(lock_dir(), key):
+            # Another worker may have filled the entry while we waited for the lock
+            cached = cache.get(key)
+            if cached is not None:
+                _count("coalescedProcesses")
+                return cached
+            _count("computed")
+            value = compute()
+            cache.set(key, value, ttl)
+            return value
+
+    return _flight.do(key, _fill)
@@ -0,0 +1,78 @@
+import csv
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+from services.attendance_services import _seconds_from_hours_worked, _to_hms_from_seconds
+
+FORMATS = ("csv", "xlsx")
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+HEADER = ["Employee", "Employee ID", "Date", "Time In", "Time Out", "Status", "Hours Worked", "Overtime"]
+DEFAULT_OVERTIME_AFTER = 8.0
+CSV_CHUNK_ROWS = 500
+# Excel's hard limit per sheet, header included
+XLSX_MAX_ROWS = 1_048_576
+
+def _clock(value: Optional[str]) -> str:
+    return datetime.fromisoformat(value).strftime("%H:%M:%S") if value else ""
+
+def export_row(r: Dict[str, Any], overtime_after: int) -> List[Any]:
+    """One spreadsheet row for an iter_attendance_rows row; overtime is time worked past `overtime_after` seconds."""
+    worked = r.get("workedSeconds")
+    if worked is None:
+        # Row predates workedSeconds; fall back to parsing the display string
+        worked = _seconds_from_hours_worked(r.get("hoursWorked")) or 0
+    return [
+        r["employeeName"],
+        r["employeeId"],
+        r["date"],
+        _clock(r.get("timeIn")),
+        _clock(r.get("timeOut")),
+        r.get("status") or "",
+        _to_hms_from_seconds(worked),
+        _to_hms_from_seconds(max(0, worked - overtime_after)),
+    ]
+
+class _Line:
+    """File-like sink for csv.writer that hands each formatted line back."""
+    def write(self, value: str) -> str:
+        return value
+
+def stream_csv(rows: Iterable[Dict[str, Any]], overtime_after: int) -> Iterator[bytes]:
+    """CSV bytes in chunks of CSV_CHUNK_ROWS lines; only one chunk is held at a time."""
+    writer = csv.writer(_Line())
+    # BOM so Excel opens the file as UTF-8
+    yield ("\ufeff" + writer.writerow(HEADER)).encode("utf-8")
+    chunk = []
+    for r in rows:
+        chunk.append(writer.writerow(export_row(r, overtime_after)))
+        if len(chunk) >= CSV_CHUNK_ROWS:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode("utf-8")
+
+def write_xlsx(rows: Iterable[Dict[str, Any]], out: BinaryIO, overtime_after: int) -> int:
+    """
+    Write an XLSX workbook to `out` with openpyxl's write-only mode, which
+    streams rows to temporary files instead of building the sheet in memory.
+    Continues on a new sheet when one fills up. Returns the row count.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    sheet, sheet_rows, sheets, total = None, XLSX_MAX_ROWS, 0, 0
+    for r in rows:
+        if sheet_rows >= XLSX_MAX_ROWS:
+            sheets += 1
+            sheet = wb.create_sheet("Attendance" if sheets == 1 else f"Attendance ({sheets})")
+            sheet.append(HEADER)
+            sheet_rows = 1
+        sheet.append(export_row(r, overtime_after))
+        sheet_rows += 1
+        total += 1
+    if sheet is None:
+        wb.create_sheet("Attendance").append(HEADER)
+    wb.save(out)
+    return total
@@ -0,0 +1,250 @@
+from datetime import datetime, date
+from typing import Dict, Any, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+from database.models.attendanceRollup_model import AttendanceDailyRollup
+from database.models.attendance_model import Attendance
+from database.models.leaveRequeast_model import LeaveRequeast
+from database.models.employee_model import Employee
+from utils.leaveIntervals import daterange
+
+# attendance status -> (count field, id list field)
+_STATUS_FIELDS = {
+    "Present": ("present", "presentIds"),
+    "Late": ("late", "lateIds"),
+}
+_LEAVE_FIELDS = ("onLeave", "leaveIds")
+_ABSENT_FIELDS = ("absent", "absentIds")
+_ID_FIELDS = ("presentIds", "lateIds", "leaveIds", "absentIds")
+
+def _today() -> date:
+    return datetime.now().date()
+
+def _mongo_date(d: date) -> datetime:
+    # DateField values are stored as midnight datetimes
+    return datetime(d.year, d.month, d.day)
+
+def _as_date(v) -> date:
+    return v.date() if isinstance(v, datetime) else v
+
+def _add_member(d: date, eid: ObjectId, fields: Tuple[str, str]) -> UpdateOne:
+    count_key, ids_key = fields
+    # The $ne guard keeps the counter exact; when the id is already listed the
+    # upsert collides with the unique date index (11000, see _apply).
+    return UpdateOne(
+        {"date": _mongo_date(d), ids_key: {"$ne": eid}},
+        {"$addToSet": {ids_key: eid}, "$inc": {count_key: 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+def _remove_member(d: date, eid: ObjectId, fields: Tuple[str, str]) -> UpdateOne:
+    count_key, ids_key = fields
+    return UpdateOne(
+        {"date": _mongo_date(d), ids_key: eid},
+        {"$pull": {ids_key: eid}, "$inc": {count_key: -1}, "$set": {"updated_at": datetime.utcnow()}},
+    )
+
+def _apply(ops: List[UpdateOne]) -> None:
+    """
+    Run rollup ops unordered. An _add_member upsert fails with 11000 either
+    because the member is already listed (nothing to do) or because it lost
+    the race to create that date's document; the server does not retry
+    non-equality upserts itself, so those ops are retried once, when the
+    document exists and a real collision is the only remaining 11000.
+    """
+    if not ops:
+        return
+    coll = AttendanceDailyRollup._get_collection()
+    for attempt in range(2):
+        try:
+            coll.bulk_write(ops, ordered=False)
+            return
+        except BulkWriteError as ex:
+            errors = ex.details.get("writeErrors", [])
+            if any(e.get("code") != 11000 for e in errors):
+                raise
+            ops = [ops[e["index"]] for e in errors]
+
+def record_attendance(employee_id, day: date, status: Optional[str]) -> None:
+    """Add an employee to the Present/Late bucket of `day`. Idempotent."""
+    fields = _STATUS_FIELDS.get(status)
+    if not fields or not day:
+        return
+    eid = ObjectId(str(employee_id))
+    ops = [_add_member(day, eid, fields)]
+    if day < _today():
+        ops.append(_remove_member(day, eid, _ABSENT_FIELDS))
+    _apply(ops)
+
+def record_attendance_many(entries: List[Tuple[Any, date, Optional[str]]]) -> None:
+    """record_attendance for many (employee_id, day, status) entries in one bulk write."""
+    today = _today()
+    ops: List[UpdateOne] = []
+    for employee_id, day, status in entries:
+        fields = _STATUS_FIELDS.get(status)
+        if not fields or not day:
+            continue
+        eid = ObjectId(str(employee_id))
+        ops.append(_add_member(day, eid, fields))
+        if day < today:
+            ops.append(_remove_member(day, eid, _ABSENT_FIELDS))
+    _apply(ops)
+
+def _covered_days(entries: List[Tuple[Any, date, date]]) -> set:
+    """
+    (employee ObjectId, day) pairs inside the given leaves that an Approved
+    leave still covers, in one query; revoking one of two overlapping or
+    adjacent approved leaves must not take those days off the rollup.
+    """
+    if not entries:
+        return set()
+    rows = LeaveRequeast.objects(
+        __raw__={"employee": {"$in": list({ObjectId(str(e)) for e, _, _ in entries})}},
+        status="Approved",
+        startDate__lte=max(_as_date(end) for _, _, end in entries),
+        endDate__gte=min(_as_date(start) for _, start, _ in entries),
+    ).only("employee", "startDate", "endDate").as_pymongo()
+    covered = set()
+    for row in rows:
+        for d in daterange(_as_date(row["startDate"]), _as_date(row["endDate"])):
+            covered.add((row["employee"], d))
+    return covered
+
+def _leave_ops(employee_id, start: date, end: date, approved: bool, today: date, covered: set) -> List[UpdateOne]:
+    eid = ObjectId(str(employee_id))
+    ops: List[UpdateOne] = []
+    for d in daterange(_as_date(start), _as_date(end)):
+        if approved:
+            ops.append(_add_member(d, eid, _LEAVE_FIELDS))
+            if d < today:
+                ops.append(_remove_member(d, eid, _ABSENT_FIELDS))
+            continue
+        if (eid, d) in covered:
+            continue
+        ops.append(_remove_member(d, eid, _LEAVE_FIELDS))
+        # Only days closed by rebuild_rollup store absentIds; on open days
+        # day_absent derives absences from the counts, so dropping the leave
+        # is enough there.
+        if d < today and d.weekday() < 5:
+            # A revoked past leave day becomes an absence unless the employee clocked in
+            ops.append(UpdateOne(
+                {
+                    "date": _mongo_date(d),
+                    "closed": True,
+                    "presentIds": {"$ne": eid},
+                    "lateIds": {"$ne": eid},
+                    "absentIds": {"$ne": eid},
+                },
+                {"$addToSet": {"absentIds": eid}, "$inc": {"absent": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            ))
+    return ops
+
+def record_leave(employee_id, start: date, end: date, approved: bool) -> None:
+    """
+    Add (approved=True) or remove an employee's leave days from the rollup.
+    Idempotent. Call after the leave's status is saved: on removal, days that
+    another Approved leave still covers are kept.
+    """
+    record_leave_many([(employee_id, start, end)], approved)
+
+def record_leave_many(entries: List[Tuple[Any, date, date]], approved: bool) -> None:
+    """record_leave for many (employee_id, start, end) leaves in one bulk write."""
+    today = _today()
+    covered = set() if approved else _covered_days(entries)
+    ops: List[UpdateOne] = []
+    for employee_id, start, end in entries:
+        ops.extend(_leave_ops(employee_id, start, end, approved, today, covered))
+    _apply(ops)
+
+def rebuild_rollup(start: date, end: date) -> int:
+    """
+    Recompute rollup documents for every date in [start, end] from the raw
+    attendances/leave_requests collections. Returns the number of days written.
+    """
+    today = _today()
+    buckets: Dict[date, Dict[str, set]] = {
+        d: {"presentIds": set(), "lateIds": set(), "leaveIds": set()} for d in daterange(start, end)
+    }
+
+    att_rows = Attendance.objects(
+        date__gte=start, date__lte=end, status__in=list(_STATUS_FIELDS)
+    ).only("employee", "date", "status").as_pymongo()
+    for row in att_rows:
+        b = buckets.get(_as_date(row["date"]))
+        if b is not None:
+            b[_STATUS_FIELDS[row["status"]][1]].add(row["employee"])
+
+    leave_rows = LeaveRequeast.objects(
+        status="Approved", startDate__lte=end, endDate__gte=start
+    ).only("employee", "startDate", "endDate").as_pymongo()
+    for row in leave_rows:
+        s = max(_as_date(row["startDate"]), start)
+        e = min(_as_date(row["endDate"]), end)
+        for d in daterange(s, e):
+            buckets[d]["leaveIds"].add(row["employee"])
+
+    roster = [row["_id"] for row in Employee.objects.only("id").as_pymongo()]
+
+    now = datetime.utcnow()
+    ops = []
+    for d, b in buckets.items():
+        closed = d < today
+        absent_ids = []
+        if closed and d.weekday() < 5:
+            taken = b["presentIds"] | b["lateIds"] | b["leaveIds"]
+            absent_ids = [eid for eid in roster if eid not in taken]
+        doc = {
+            "date": _mongo_date(d),
+            "present": len(b["presentIds"]),
+            "late": len(b["lateIds"]),
+            "onLeave": len(b["leaveIds"]),
+            "absent": len(absent_ids),
+            "presentIds": list(b["presentIds"]),
+            "lateIds": list(b["lateIds"]),
+            "leaveIds": list(b["leaveIds"]),
+            "absentIds": absent_ids,
+            "closed": closed,
+            "updated_at": now,
+        }
+        ops.append(ReplaceOne({"date": doc["date"]}, doc, upsert=True))
+    if ops:
+        AttendanceDailyRollup._get_collection().bulk_write(ops, ordered=False)
+    return len(ops)
+
+def default_rebuild_window() -> Tuple[date, date]:
+    """Earliest attendance/leave date through today (or the last approved leave day)."""
+    today = _today()
+    candidates_start = [today]
+    candidates_end = [today]
+    first_att = Attendance.objects.order_by("date").only("date").first()
+    if first_att:
+        candidates_start.append(first_att.date)
+    first_leave = LeaveRequeast.objects(status="Approved").order_by("startDate").only("startDate").first()
+    if first_leave:
+        candidates_start.append(first_leave.startDate)
+    last_leave = LeaveRequeast.objects(status="Approved").order_by("-endDate").only("endDate").first()
+    if last_leave:
+        candidates_end.append(last_leave.endDate)
+    return min(candidates_start), max(candidates_end)
+
+def load_rollup(start: date, end: date, *id_fields: str) -> Dict[date, Dict[str, Any]]:
+    """
+    Rollup rows for [start, end] keyed by date. Employee id lists are left out
+    unless requested via `id_fields` (e.g. "lateIds").
+    """
+    qs = AttendanceDailyRollup.objects(date__gte=start, date__lte=end)
+    excluded = [f for f in _ID_FIELDS if f not in id_fields]
+    if excluded:
+        qs = qs.exclude(*excluded)
+    return {_as_date(row["date"]): row for row in qs.as_pymongo()}
+
+def day_absent(row: Optional[Dict[str, Any]], d: date, headcount: int) -> int:
+    """Absent count for one day: the stored value once closed, else headcount minus recorded/leave."""
+    row = row or {}
+    if row.get("closed"):
+        return row.get("absent", 0)
+    if d.weekday() >= 5:
+        return 0
+    recorded = row.get("present", 0) + row.get("late", 0) + row.get("onLeave", 0)
+    return max(0, headcount - recorded)
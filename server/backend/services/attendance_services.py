@@ -1,7 +1,12 @@
 from datetime import datetime, date, time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from database.models.attendance_model import Attendance
 from database.models.employee_model import Employee
+from services.attendanceRollup_services import record_attendance
+from services.analyticsCache_services import bump_analytics_version
+from utils.batchDereference import ref_id
 
 def _today() -> date:
     return datetime.now().date()
@@ -22,6 +27,20 @@ def _to_hms_from_seconds(total_seconds: int) -> str:
     s = total_seconds % 60
     return f"{h:02d}:{m:02d}:{s:02d}"
 
+def _seconds_from_hours_worked(value: Any) -> Optional[int]:
+    """Inverse of _normalize_hours_worked: "HH:MM:SS" strings or float hours to seconds."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return max(0, int(round(float(value) * 3600)))
+    if isinstance(value, str) and value:
+        try:
+            h, m, sec = (int(part) for part in value.split(":"))
+        except ValueError:
+            return None
+        return max(0, h * 3600 + m * 60 + sec)
+    return None
+
 def _normalize_hours_worked(value: Any) -> str:
     if isinstance(value, (int, float)):
         return _to_hms_from_seconds(int(round(float(value) * 3600)))
@@ -32,7 +51,7 @@ def _normalize_hours_worked(value: Any) -> str:
 def serialize_attendance(a: Attendance) -> Dict[str, Any]:
     return {
         "id": str(a.id),
-        "employeeId": str(a.employee.id) if a.employee else None,
+        "employeeId": str(ref_id(a)) if ref_id(a) else None,
         "date": a.date.isoformat() if a.date else None,
         "timeIn": a.timeIn.isoformat() if a.timeIn else None,
         "timeOut": a.timeOut.isoformat() if a.timeOut else None,
@@ -42,37 +61,118 @@ def serialize_attendance(a: Attendance) -> Dict[str, Any]:
         "updated_at": a.updated_at.isoformat() if a.updated_at else None,
     }
 
+def worked_seconds_expr() -> Dict[str, Any]:
+    """Aggregation expression for a row's worked seconds (0 until clock-out or migration)."""
+    return {"$ifNull": ["$workedSeconds", 0]}
+
+# Fields read by list endpoints; everything else stays in Mongo
+LIST_FIELDS = ("employee", "date", "timeIn", "timeOut", "status", "hoursWorked", "created_at", "updated_at")
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def _iso_date(value) -> Optional[str]:
+    # DateField values come back from as_pymongo() as midnight datetimes
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat() if value else None
+
+def serialize_attendance_raw(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Same shape as serialize_attendance, built from a raw as_pymongo() dict."""
+    emp_id = row.get("employee")
+    return {
+        "id": str(row["_id"]),
+        "employeeId": str(emp_id) if emp_id else None,
+        "date": _iso_date(row.get("date")),
+        "timeIn": _iso(row.get("timeIn")),
+        "timeOut": _iso(row.get("timeOut")),
+        "status": row.get("status"),
+        "hoursWorked": _normalize_hours_worked(row.get("hoursWorked", "00:00:00")),
+        "created_at": _iso(row.get("created_at")),
+        "updated_at": _iso(row.get("updated_at")),
+    }
+
+def _sync_rollup(att: Attendance) -> None:
+    # The rollup is derived data (rebuild_attendance_rollup repairs drift), so never fail the clock event
+    try:
+        record_attendance(ref_id(att), att.date, att.status)
+    except Exception as ex:
+        print("Attendance rollup update failed:", ex)
+    bump_analytics_version()
+
 def get_today_attendance(employee: Employee) -> Optional[Attendance]:
     return Attendance.objects(employee=employee, date=_today()).first()
 
+def _day_key(employee: Employee, day: date) -> Dict[str, Any]:
+    # Raw filter on the (employee, date) unique index; DateField is stored as midnight
+    return {"employee": employee.pk, "date": datetime.combine(day, time.min)}
+
+def _pad2(expr: Any) -> Dict[str, Any]:
+    return {"$cond": [{"$lt": [expr, 10]}, {"$concat": ["0", {"$toString": expr}]}, {"$toString": expr}]}
+
+def _hms_expr(seconds: Any) -> Dict[str, Any]:
+    """Aggregation expression equivalent of _to_hms_from_seconds."""
+    return {"$let": {
+        "vars": {"s": {"$max": [seconds, 0]}},
+        "in": {"$concat": [
+            _pad2({"$toInt": {"$floor": {"$divide": ["$$s", 3600]}}}),
+            ":",
+            _pad2({"$toInt": {"$floor": {"$divide": [{"$mod": ["$$s", 3600]}, 60]}}}),
+            ":",
+            _pad2({"$toInt": {"$mod": ["$$s", 60]}}),
+        ]},
+    }}
+
 def time_in(employee: Employee) -> Attendance:
+    """
+    Clock in with one conditional upsert: matches today's row only while it has
+    no timeIn, so a second or concurrent clock-in hits the unique index instead
+    of overwriting the first.
+    """
     now = datetime.now()
-    today = _today()
+    status = _classify_status(now)
+    stamp = datetime.utcnow()
+    update: Dict[str, Any] = {
+        "$set": {"timeIn": now, "updated_at": stamp},
+        "$setOnInsert": {"timeOut": None, "hoursWorked": "00:00:00", "workedSeconds": 0, "created_at": stamp},
+    }
+    if status:
+        update["$set"]["status"] = status
 
-    att = Attendance.objects(employee=employee, date=today).first()
-    if att and att.timeIn:
+    try:
+        doc = Attendance._get_collection().find_one_and_update(
+            {**_day_key(employee, _today()), "timeIn": None},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
         raise ValueError("Already timed in for today.")
-
-    if not att:
-        att = Attendance(employee=employee, date=today)
-
-    att.timeIn = now
-    att.status = _classify_status(now)  
-    att.save()
+    att = Attendance._from_son(doc)
+    _sync_rollup(att)
     return att
 
 def time_out(employee: Employee) -> Attendance:
-    att = get_today_attendance(employee)
-    if not att or not att.timeIn:
-        raise ValueError("No time-in recorded for today.")
-    if att.timeOut:
-        raise ValueError("Already timed out for today.")
-
+    """Clock out in one round trip; hoursWorked is computed server-side from the stored timeIn."""
     now = datetime.now()
-    att.timeOut = now
-    delta = att.timeOut - att.timeIn
-    att.hoursWorked = _to_hms_from_seconds(int(delta.total_seconds()))
-    att.save()
+    key = _day_key(employee, _today())
+    seconds = {"$max": [{"$toInt": {"$floor": {"$divide": [{"$subtract": [now, "$timeIn"]}, 1000]}}}, 0]}
+    doc = Attendance._get_collection().find_one_and_update(
+        {**key, "timeIn": {"$ne": None}, "timeOut": None},
+        [
+            {"$set": {"timeOut": now, "workedSeconds": seconds, "updated_at": datetime.utcnow()}},
+            {"$set": {"hoursWorked": _hms_expr("$workedSeconds")}},
+        ],
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        # Only the failure path pays for a read, to pick the right message
+        existing = Attendance._get_collection().find_one(key, {"timeIn": 1})
+        if not existing or not existing.get("timeIn"):
+            raise ValueError("No time-in recorded for today.")
+        raise ValueError("Already timed out for today.")
+    att = Attendance._from_son(doc)
+    _sync_rollup(att)
     return att
 
 def list_attendance(employee: Employee, start: Optional[date] = None, end: Optional[date] = None, limit: int = 50) -> List[Attendance]:
@@ -84,4 +184,40 @@ def list_attendance(employee: Employee, start: Optional[date] = None, end: Optio
     q = q.order_by("-date")
     if limit and limit > 0:
         q = q[:limit]
-    return list(q)
\ No newline at end of file
+    return list(q)
+
+def list_attendance_rows(
+    employee: Employee,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = 50,
+    before: Optional[date] = None,
+    after: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    list_attendance without building Documents: projected raw dicts for serialize_attendance_raw,
+    newest first. `before`/`after` are exclusive date cursors (one row per employee per date);
+    an `after` page holds the rows closest to that date.
+    """
+    q = Attendance.objects(employee=employee)
+    if start:
+        q = q.filter(date__gte=start)
+    if end:
+        q = q.filter(date__lte=end)
+    if before:
+        q = q.filter(date__lt=before)
+    if after:
+        q = q.filter(date__gt=after)
+    q = q.order_by("date" if after else "-date").only(*LIST_FIELDS)
+    if limit and limit > 0:
+        q = q[:limit]
+    rows = list(q.as_pymongo())
+    if after:
+        rows.reverse()
+    return rows
+
+def history_version(employee: Employee) -> Tuple[Optional[datetime], int]:
+    """(latest updated_at, row count) of an employee's attendance, for ETag/Last-Modified."""
+    pipeline = [{"$group": {"_id": None, "last": {"$max": "$updated_at"}, "n": {"$sum": 1}}}]
+    row = next(Attendance.objects(employee=employee).aggregate(pipeline), None) or {}
+    return row.get("last"), row.get("n", 0)
@@ -1,18 +1,70 @@
+import datetime
 from typing import Any, Dict, Optional
-from firebase_admin import auth as fb_auth
 from database.models.employee_model import Employee
+from services.analyticsCache_services import bump_analytics_version
+from config.cache_config import employee_cache_ttl, token_cache_size
+from config.tokenVerifier_config import get_token_verifier
+from utils.resultCache import MemoryCache
+from utils.tokenCache import VerifiedTokenCache
+
+_token_cache = VerifiedTokenCache(max_entries=token_cache_size())
+# Per-process, short-lived: other workers see admin edits once the TTL lapses
+_employee_cache = MemoryCache(max_entries=2048)
 
 
 def verify_firebase_id_token(id_token: str) -> Dict[str, Any]:
     """
     Verify Firebase ID token and return decoded claims. Raises on invalid/expired token.
+    Tokens verified earlier are served from an in-process cache until they expire.
     """
-    return fb_auth.verify_id_token(id_token)
+    verifier = get_token_verifier()
+    if _token_cache.max_entries <= 0:
+        return verifier.verify(id_token)
+    claims = _token_cache.get(id_token)
+    if claims is not None:
+        return claims
+    claims = verifier.verify(id_token)
+    _token_cache.set(id_token, claims)
+    return claims
+
+
+def revoke_cached_tokens(uid: Optional[str]) -> None:
+    """Drop cached verifications for a Firebase uid (e.g. after restricting the account)."""
+    if uid:
+        _token_cache.revoke_uid(uid)
+
+
+def token_cache_metrics() -> Dict[str, Any]:
+    return _token_cache.snapshot()
+
+
+def invalidate_cached_employee(uid: Optional[str]) -> None:
+    if uid:
+        _employee_cache.delete(uid)
+
+
+def _profile_changes(emp: Employee, email: Optional[str], name: Optional[str], picture: Optional[str]) -> Dict[str, Any]:
+    """Fields whose token value differs from the stored profile."""
+    changes: Dict[str, Any] = {}
+    if email and emp.email != email:
+        changes["email"] = email
+    if picture and emp.profileImage != picture:
+        changes["profileImage"] = picture
+    if name:
+        parts = name.split()
+        first = parts[0] if parts else emp.firstName
+        last = parts[-1] if parts else emp.lastName
+        if first and emp.firstName != first:
+            changes["firstName"] = first
+        if last and emp.lastName != last:
+            changes["lastName"] = last
+    return changes
 
 
 def get_or_create_employee_from_firebase(decoded: Dict[str, Any]) -> Employee:
     """
-    Ensure we have an Employee document for this Firebase user. Syncs basic profile fields.
+    Ensure we have an Employee document for this Firebase user. Syncs basic profile fields,
+    writing only when the token carries a changed email, picture or name.
     """
     uid = decoded.get("uid") or decoded.get("user_id")
     email: Optional[str] = decoded.get("email")
@@ -22,21 +74,21 @@ def get_or_create_employee_from_firebase(decoded: Dict[str, Any]) -> Employee:
     if not uid:
         raise ValueError("Missing uid in Firebase token")
 
-    emp = Employee.objects(firebaseUid=uid).first()
+    ttl = employee_cache_ttl()
+    cached = _employee_cache.get(uid) if ttl > 0 else None
+    # The cache holds the stored fields, not a Document: each request gets its own instance
+    emp = Employee._from_son(cached) if cached is not None else Employee.objects(firebaseUid=uid).first()
     if emp:
-        if email and emp.email != email:
-            emp.email = email
-        if picture and emp.profileImage != picture:
-            emp.profileImage = picture
-        if name:
-            parts = name.split()
-            first = parts[0] if parts else emp.firstName
-            last = parts[-1] if parts else emp.lastName
-            if first and emp.firstName != first:
-                emp.firstName = first
-            if last and emp.lastName != last:
-                emp.lastName = last
-        emp.save()
+        changes = _profile_changes(emp, email, name, picture)
+        if changes:
+            changes["updated_at"] = datetime.datetime.utcnow()
+            Employee.objects(id=emp.id).update_one(**{f"set__{k}": v for k, v in changes.items()})
+            for field, value in changes.items():
+                setattr(emp, field, value)
+            if "firstName" in changes or "lastName" in changes:
+                bump_analytics_version()
+        if ttl > 0:
+            _employee_cache.set(uid, emp.to_mongo().to_dict(), ttl=ttl)
         return emp
 
     parts = (name or "User").split()
@@ -58,6 +110,7 @@ def get_or_create_employee_from_firebase(decoded: Dict[str, Any]) -> Employee:
         isAdmin=False,
     )
     emp.save()
+    bump_analytics_version()
     return emp
 
 
@@ -0,0 +1,293 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database.models.attendance_model import Attendance
+from database.models.clockEvent_model import ClockEvent
+from database.models.employee_model import Employee
+from services.attendance_services import _classify_status, _to_hms_from_seconds
+from services.attendanceRollup_services import record_attendance_many
+from services.analyticsCache_services import bump_analytics_version
+from services.employeeReport_services import invalidate_report_snapshots
+
+MAX_EVENTS = 5000
+DIRECTIONS = ("in", "out")
+# Device clocks drift; punches further ahead of the server clock are refused
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+# ClockEvent.result while the request that reserved the key is still applying it
+PENDING = "pending"
+
+class _Event:
+    __slots__ = ("index", "key", "employee", "timestamp", "direction")
+
+    def __init__(self, index: int, key: str, employee: ObjectId, timestamp: datetime, direction: str):
+        self.index = index
+        self.key = key
+        self.employee = employee
+        self.timestamp = timestamp
+        self.direction = direction
+
+def _result(index: int, key: Optional[str], status: str, detail: Optional[str] = None) -> Dict[str, Any]:
+    out = {"index": index, "idempotencyKey": key, "status": status}
+    if detail:
+        out["detail"] = detail
+    return out
+
+def _parse_timestamp(value: Any) -> datetime:
+    dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        # Stored clock times are server-local naive datetimes, like datetime.now()
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+def _parse_event(index: int, raw: Any) -> Tuple[Optional[_Event], Optional[Dict[str, Any]]]:
+    if not isinstance(raw, dict):
+        return None, _result(index, None, "invalid", "Event must be an object")
+    key = raw.get("idempotencyKey")
+    if not isinstance(key, str) or not key.strip() or len(key) > 200:
+        return None, _result(index, None, "invalid", "Missing or invalid idempotencyKey")
+    emp_id = raw.get("employeeId")
+    if not isinstance(emp_id, str) or not ObjectId.is_valid(emp_id):
+        return None, _result(index, key, "invalid", "Invalid employeeId")
+    direction = raw.get("direction")
+    if direction not in DIRECTIONS:
+        return None, _result(index, key, "invalid", "direction must be 'in' or 'out'")
+    try:
+        ts = _parse_timestamp(raw.get("timestamp"))
+    except (TypeError, ValueError):
+        return None, _result(index, key, "invalid", "Invalid timestamp")
+    if ts > datetime.now() + MAX_CLOCK_SKEW:
+        return None, _result(index, key, "invalid", "Timestamp is in the future")
+    return _Event(index, key, ObjectId(emp_id), ts, direction), None
+
+def _existing_days(events: List[_Event]) -> Dict[Tuple[ObjectId, Any], Dict[str, Any]]:
+    """Current attendance rows for every (employee, day) touched, in one query."""
+    days = [e.timestamp.date() for e in events]
+    rows = Attendance._get_collection().find(
+        {
+            "employee": {"$in": list({e.employee for e in events})},
+            "date": {"$gte": datetime.combine(min(days), time.min), "$lte": datetime.combine(max(days), time.min)},
+        },
+        {"employee": 1, "date": 1, "timeIn": 1, "timeOut": 1},
+    )
+    return {(r["employee"], r["date"].date()): r for r in rows}
+
+def _ms(dt: datetime) -> datetime:
+    # Mongo keeps milliseconds
+    return dt.replace(microsecond=dt.microsecond // 1000 * 1000)
+
+def _write_attendance(ops: List[UpdateOne], clock_outs: Dict[int, Tuple[Dict[str, Any], datetime]]) -> Dict[int, str]:
+    """
+    Run the attendance ops as one unordered bulk_write. Returns the ops that
+    changed nothing, by index, with the reason. `clock_outs` maps the
+    indexes of the non-upsert (clock-out only) ops to their (day key,
+    timeOut); those only count as written when they matched a row, which is
+    checked with a re-read only when the matched count comes up short.
+    """
+    try:
+        details = Attendance._get_collection().bulk_write(ops, ordered=False).bulk_api_result
+    except BulkWriteError as ex:
+        details = ex.details
+        if any(e.get("code") != 11000 for e in details.get("writeErrors", [])):
+            raise
+    # 11000: a live clock-in landed between our read and the write
+    failed = {e["index"]: "Already timed in for that day." for e in details.get("writeErrors", [])}
+    upserted = {u["index"] for u in details.get("upserted", [])}
+    matched_upserts = sum(1 for i in range(len(ops)) if i not in clock_outs and i not in failed and i not in upserted)
+    if details.get("nMatched", 0) - matched_upserts >= len(clock_outs):
+        return failed
+
+    # A live clock-out got there first for some day: find which of ours landed
+    rows = Attendance._get_collection().find(
+        {"$or": [key for key, _ in clock_outs.values()]},
+        {"employee": 1, "date": 1, "timeOut": 1},
+    )
+    stored = {(r["employee"], r["date"]): r.get("timeOut") for r in rows}
+    for i, (key, time_out) in clock_outs.items():
+        current = stored.get((key["employee"], key["date"]))
+        if current != _ms(time_out):
+            failed[i] = "Already timed out for that day." if current else "No time-in recorded for that day."
+    return failed
+
+def ingest_clock_events(raw_events: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Apply buffered in/out punches in bulk. Events are deduplicated on
+    idempotencyKey within the batch, then by reserving each key in the
+    clock_events log before anything is applied, so a batch retried
+    concurrently is applied once and reported as duplicate by the other
+    request. Reserved events follow the same rules as time_in/time_out: the
+    first clock-in of a day wins, a clock-out needs a clock-in and happens
+    once. All attendance changes go out as one unordered bulk_write. Returns
+    one result per event, in request order.
+    """
+    if not isinstance(raw_events, list):
+        raise ValueError("events must be a list")
+    if len(raw_events) > MAX_EVENTS:
+        raise ValueError(f"At most {MAX_EVENTS} events per request")
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(raw_events)
+    parsed: List[_Event] = []
+    seen = set()
+    for i, raw in enumerate(raw_events):
+        ev, error = _parse_event(i, raw)
+        if error:
+            results[i] = error
+        elif ev.key in seen:
+            results[i] = _result(i, ev.key, "duplicate")
+        else:
+            seen.add(ev.key)
+            parsed.append(ev)
+
+    if not parsed:
+        return results
+
+    roster = {r["_id"] for r in Employee.objects(id__in=list({e.employee for e in parsed})).only("id").as_pymongo()}
+    known: List[_Event] = []
+    for ev in parsed:
+        if ev.employee not in roster:
+            results[ev.index] = _result(ev.index, ev.key, "rejected", "Unknown employee")
+        else:
+            known.append(ev)
+    fresh = _reserve(known, results)
+    if not fresh:
+        return results
+
+    try:
+        rollup, days = _apply_events(fresh, results)
+    except Exception:
+        # Let a retry apply them
+        _release(fresh)
+        raise
+    if days:
+        try:
+            record_attendance_many(rollup)
+        except Exception as ex:
+            print("Attendance rollup update failed:", ex)
+        bump_analytics_version()
+        # Backlogged punches can land in closed months
+        invalidate_report_snapshots((emp_id, day, day) for emp_id, day in days)
+    by_status: Dict[str, List[str]] = {}
+    for ev in fresh:
+        by_status.setdefault(results[ev.index]["status"], []).append(ev.key)
+    coll = ClockEvent._get_collection()
+    for status, keys in by_status.items():
+        coll.update_many({"idempotencyKey": {"$in": keys}}, {"$set": {"result": status}})
+    return results
+
+def _reserve(events: List[_Event], results: List[Optional[Dict[str, Any]]]) -> List[_Event]:
+    """
+    Claim the events' idempotency keys before anything is applied, by
+    inserting their log entries as PENDING. The unique index fails a key that
+    an earlier batch, or a concurrent request, already holds with 11000; those
+    events are duplicates. Returns the events this call now owns.
+    """
+    if not events:
+        return []
+    log = [
+        ClockEvent(
+            idempotencyKey=ev.key, employee=ev.employee, timestamp=ev.timestamp, direction=ev.direction, result=PENDING
+        ).to_mongo()
+        for ev in events
+    ]
+    taken = set()
+    try:
+        ClockEvent._get_collection().insert_many(log, ordered=False)
+    except BulkWriteError as ex:
+        errors = ex.details.get("writeErrors", [])
+        taken = {e["index"] for e in errors}
+        if any(e.get("code") != 11000 for e in errors):
+            _release([ev for i, ev in enumerate(events) if i not in taken])
+            raise
+    owned: List[_Event] = []
+    for i, ev in enumerate(events):
+        if i in taken:
+            results[ev.index] = _result(ev.index, ev.key, "duplicate")
+        else:
+            owned.append(ev)
+    return owned
+
+def _release(events: List[_Event]) -> None:
+    """Drop reservations that were never applied."""
+    ClockEvent._get_collection().delete_many({"idempotencyKey": {"$in": [ev.key for ev in events]}, "result": PENDING})
+
+def _apply_events(
+    fresh: List[_Event], results: List[Optional[Dict[str, Any]]]
+) -> Tuple[List[Tuple[ObjectId, Any, Optional[str]]], set]:
+    """
+    Apply reserved events to attendance, filling in their results. Returns
+    the rollup entries and the (employee, day) pairs that were written.
+    """
+    rollup: List[Tuple[ObjectId, Any, Optional[str]]] = []
+    days = set()
+    groups: Dict[Tuple[ObjectId, Any], List[_Event]] = {}
+    for ev in sorted(fresh, key=lambda e: (e.timestamp, e.index)):
+        groups.setdefault((ev.employee, ev.timestamp.date()), []).append(ev)
+    existing = _existing_days(fresh)
+
+    ops: List[UpdateOne] = []
+    op_events: List[List[_Event]] = []
+    # Per op: the (employee, day, status) rollup entry for clock-ins, None for clock-out only
+    op_rollup: List[Optional[Tuple[ObjectId, Any, Optional[str]]]] = []
+    clock_outs: Dict[int, Tuple[Dict[str, Any], datetime]] = {}
+    for (emp_id, day), events in groups.items():
+        row = existing.get((emp_id, day)) or {}
+        time_in, time_out = row.get("timeIn"), row.get("timeOut")
+        new_in = new_out = None
+        applied: List[_Event] = []
+        for ev in events:
+            if ev.direction == "in":
+                if time_in:
+                    results[ev.index] = _result(ev.index, ev.key, "rejected", "Already timed in for that day.")
+                    continue
+                time_in = new_in = ev.timestamp
+            else:
+                if not time_in:
+                    results[ev.index] = _result(ev.index, ev.key, "rejected", "No time-in recorded for that day.")
+                    continue
+                if time_out:
+                    results[ev.index] = _result(ev.index, ev.key, "rejected", "Already timed out for that day.")
+                    continue
+                time_out = new_out = ev.timestamp
+            applied.append(ev)
+            results[ev.index] = _result(ev.index, ev.key, "applied")
+        if not applied:
+            continue
+
+        key = {"employee": emp_id, "date": datetime.combine(day, time.min)}
+        stamp = datetime.utcnow()
+        fields: Dict[str, Any] = {"updated_at": stamp}
+        if new_out:
+            seconds = max(0, int((new_out - time_in).total_seconds()))
+            fields["timeOut"] = new_out
+            fields["workedSeconds"] = seconds
+            fields["hoursWorked"] = _to_hms_from_seconds(seconds)
+        if new_in:
+            status = _classify_status(new_in)
+            fields["timeIn"] = new_in
+            if status:
+                fields["status"] = status
+            on_insert = {"created_at": stamp}
+            if not new_out:
+                on_insert.update({"timeOut": None, "hoursWorked": "00:00:00", "workedSeconds": 0})
+            ops.append(UpdateOne({**key, "timeIn": None}, {"$set": fields, "$setOnInsert": on_insert}, upsert=True))
+            op_rollup.append((emp_id, day, status))
+        else:
+            clock_outs[len(ops)] = (key, new_out)
+            ops.append(UpdateOne({**key, "timeIn": time_in, "timeOut": None}, {"$set": fields}))
+            op_rollup.append(None)
+        op_events.append(applied)
+
+    if ops:
+        failed = _write_attendance(ops, clock_outs)
+        for i, detail in failed.items():
+            for ev in op_events[i]:
+                results[ev.index] = _result(ev.index, ev.key, "rejected", detail)
+        written = [i for i in range(len(ops)) if i not in failed]
+        rollup = [op_rollup[i] for i in written if op_rollup[i]]
+        days = {(op_events[i][0].employee, op_events[i][0].timestamp.date()) for i in written}
+    return rollup, days
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    return dict(Counter(r["status"] for r in results))
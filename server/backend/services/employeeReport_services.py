@@ -1,8 +1,17 @@
+import logging
 from datetime import datetime, date, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from database.models.attendance_model import Attendance
 from database.models.leaveRequeast_model import LeaveRequeast
 from database.models.employee_model import Employee
+from database.models.employeeReportSnapshot_model import EmployeeReportSnapshot
+from services.attendance_services import _to_hms_from_seconds, worked_seconds_expr
+from utils.leaveIntervals import LeaveIntervals, daterange
+
+logger = logging.getLogger(__name__)
 
 def _parse_month(month: str) -> (date, date):
     # month format YYYY-MM
@@ -14,38 +23,136 @@ def _parse_month(month: str) -> (date, date):
         end = date(dt.year, dt.month + 1, 1) - timedelta(days=1)
     return start, end
 
-def _daterange(start: date, end: date) -> List[date]:
-    days = []
-    cur = start
-    while cur <= end:
-        days.append(cur)
-        cur += timedelta(days=1)
-    return days
+def _next_month(d: date) -> date:
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
 
 def _fmt_time(dt) -> str:
     return dt.isoformat() if dt else None
 
+def _as_date(v) -> date:
+    return v.date() if isinstance(v, datetime) else v
+
+def _to_datetime(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day)
+
+REPORT_FIELDS = ("date", "status", "timeIn", "timeOut", "hoursWorked")
+
+def _report_pipeline(month_start: date) -> List[Dict[str, Any]]:
+    """
+    $facet over one employee's attendance rows: the projected rows plus
+    worked-seconds totals per month from month_start on.
+    """
+    return [
+        {"$facet": {
+            "rows": [{"$project": {f: 1 for f in REPORT_FIELDS}}],
+            "worked": [
+                {"$match": {"date": {"$gte": _to_datetime(month_start)}}},
+                {"$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m", "date": "$date"}},
+                    "seconds": {"$sum": worked_seconds_expr()},
+                    "days": {"$sum": {"$cond": [{"$gt": [worked_seconds_expr(), 0]}, 1, 0]}},
+                }},
+            ],
+        }},
+    ]
+
+def _clip(r: Dict[str, Any], window_start: date, window_end: date) -> Tuple[date, date]:
+    return max(_as_date(r["startDate"]), window_start), min(_as_date(r["endDate"]), window_end)
+
+def _fetch_report_data(employee, window_start: date, month_start: date, month_end: date):
+    """
+    Both report queries: attendance for [window_start, month_end] (rows plus
+    worked-seconds totals per month from month_start on, in one $facet
+    aggregation) and the employee's leaves overlapping the window, clipped to it.
+    """
+    attendance_qs = Attendance.objects(employee=employee, date__gte=window_start, date__lte=month_end)
+    facets = next(attendance_qs.aggregate(_report_pipeline(month_start)), {})
+    rows = facets.get("rows", [])
+    worked = {row["_id"]: row for row in facets.get("worked", [])}
+
+    leave_rows = LeaveRequeast.objects(
+        employee=employee, startDate__lte=month_end, endDate__gte=window_start
+    ).only("startDate", "endDate").as_pymongo()
+    leave_spans = [_clip(r, window_start, month_end) for r in leave_rows]
+    return rows, worked, leave_spans
+
+def fetch_report_data_many(employee_ids: List[ObjectId], window_start: date, month_start: date, month_end: date):
+    """
+    _fetch_report_data for many employees in the same two queries, keyed by
+    str(employee id). Attendance comes back through a plain projected find
+    and the monthly totals are summed here: a $facet returns a single
+    document, which a large chunk could push past Mongo's 16 MB limit.
+    """
+    rows_by_emp: Dict[str, List[Dict[str, Any]]] = {str(e): [] for e in employee_ids}
+    worked_by_emp: Dict[str, Dict[str, Any]] = {str(e): {} for e in employee_ids}
+    leaves_by_emp: Dict[str, List[Tuple[date, date]]] = {str(e): [] for e in employee_ids}
+
+    attendance_rows = Attendance.objects(
+        __raw__={"employee": {"$in": list(employee_ids)}}, date__gte=window_start, date__lte=month_end
+    ).only("employee", "workedSeconds", *REPORT_FIELDS).as_pymongo()
+    for row in attendance_rows:
+        emp_key = str(row.pop("employee"))
+        seconds = row.pop("workedSeconds", None) or 0
+        rows_by_emp[emp_key].append(row)
+        d = _as_date(row["date"])
+        if d >= month_start:
+            worked = worked_by_emp[emp_key].setdefault(d.strftime("%Y-%m"), {"seconds": 0, "days": 0})
+            worked["seconds"] += seconds
+            worked["days"] += 1 if seconds > 0 else 0
+
+    leave_rows = LeaveRequeast.objects(
+        __raw__={"employee": {"$in": list(employee_ids)}}, startDate__lte=month_end, endDate__gte=window_start
+    ).only("employee", "startDate", "endDate").as_pymongo()
+    for r in leave_rows:
+        leaves_by_emp[str(r["employee"])].append(_clip(r, window_start, month_end))
+    return rows_by_emp, worked_by_emp, leaves_by_emp
+
+def _day_status(d: date, att: Optional[Dict[str, Any]], leaves: LeaveIntervals, emp_key: str, today_local: date) -> str:
+    if att:
+        if att.get("status") == "Late":
+            return "Late"
+        # If a record exists but status not set, treat as Present fallback
+        return "Present"
+    if d <= today_local and d.weekday() < 5 and not leaves.covers(emp_key, d):
+        return "Absent"
+    # future day or weekend or on leave
+    return "—"
+
+def _report_window(month: Optional[str], today_local: date) -> Tuple[date, date, date]:
+    """(previous month start, month start, month end); month defaults to the current one."""
+    month_start, month_end = _parse_month(month or today_local.strftime("%Y-%m"))
+    prev_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    return prev_month_start, month_start, month_end
+
 def compute_employee_report(employee, month: str) -> Dict[str, Any]:
     today_local = datetime.today().date()  # use local date instead of utc to avoid off-by-one
-    month_start, month_end = _parse_month(month) if month else (date(today_local.year, today_local.month, 1), date(today_local.year, today_local.month, 1))
-    # If month omitted, default current month proper end
-    if not month:
-        if today_local.month == 12:
-            month_end = date(today_local.year + 1, 1, 1) - timedelta(days=1)
-        else:
-            month_end = date(today_local.year, today_local.month + 1, 1) - timedelta(days=1)
-
-    attendance_qs = Attendance.objects(employee=employee, date__gte=month_start, date__lte=month_end)
-    leave_qs = LeaveRequeast.objects(employee=employee, startDate__lte=month_end, endDate__gte=month_start)
+    # Previous month window (for comparisons), fetched together with the current month
+    prev_month_start, month_start, month_end = _report_window(month, today_local)
+    rows, worked_by_month, leave_spans = _fetch_report_data(employee, prev_month_start, month_start, month_end)
+    return build_employee_report(str(employee.id), month_start, month_end, rows, worked_by_month, leave_spans, today_local)
 
-    att_map: Dict[date, Attendance] = {a.date: a for a in attendance_qs}
+def build_employee_report(
+    emp_key: str,
+    month_start: date,
+    month_end: date,
+    rows: List[Dict[str, Any]],
+    worked_by_month: Dict[str, Dict[str, Any]],
+    leave_spans: List[Tuple[date, date]],
+    today_local: date,
+) -> Dict[str, Any]:
+    """The report payload from already-fetched data. No DB access, so it can run in worker processes."""
+    prev_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    prev_month_end = month_start - timedelta(days=1)
+    worked = worked_by_month.get(month_start.strftime("%Y-%m"), {})
 
-    leave_dates = set()
-    for lr in leave_qs:
-        for d in _daterange(lr.startDate, lr.endDate):
-            leave_dates.add(d)
+    att_map: Dict[date, Dict[str, Any]] = {}
+    prev_map: Dict[date, Dict[str, Any]] = {}
+    for r in rows:
+        d = _as_date(r["date"])
+        (att_map if d >= month_start else prev_map)[d] = r
 
-    days = _daterange(month_start, month_end)
+    leaves = LeaveIntervals((emp_key, s, e) for s, e in leave_spans)
+    total_leave_requests = sum(1 for s, e in leave_spans if e >= month_start)
 
     heatmap = []
     present_count = 0
@@ -54,47 +161,34 @@ def compute_employee_report(employee, month: str) -> Dict[str, Any]:
     time_in_accumulator_seconds = 0
     time_in_count = 0
 
-    for d in days:
+    for d in daterange(month_start, month_end):
         att = att_map.get(d)
-        if att:
-            if att.status == "Present":
-                status = "Present"
-                present_count += 1
-            elif att.status == "Late":
-                status = "Late"
-                late_count += 1
-            else:
-                # If a record exists but status not set, treat as Present fallback
-                status = "Present"
-                present_count += 1
-        else:
-            is_past = d < today_local or d == today_local
-            is_weekday = d.weekday() < 5
-            if is_past and is_weekday and d not in leave_dates:
-                status = "Absent"
-                absent_count += 1
-            else:
-                # future day or weekend or on leave
-                status = "—"
-
-        if att and att.timeIn:
-            time_in_accumulator_seconds += int(att.timeIn.timestamp())
+        status = _day_status(d, att, leaves, emp_key, today_local)
+        if status == "Present":
+            present_count += 1
+        elif status == "Late":
+            late_count += 1
+        elif status == "Absent":
+            absent_count += 1
+
+        if att and att.get("timeIn"):
+            time_in_accumulator_seconds += int(att["timeIn"].timestamp())
             time_in_count += 1
 
         heatmap.append({"date": d.isoformat(), "status": status})
 
-    total_leave_requests = leave_qs.count()
+    worked_seconds = worked.get("seconds", 0)
+    worked_days = worked.get("days", 0)
 
     # Recent attendance (last 14 records)
-    recent = attendance_qs.order_by("-date")[:14]
     recent_serialized = [{
-        "id": str(a.id),
-        "date": a.date.isoformat(),
-        "status": a.status,
-        "timeIn": _fmt_time(a.timeIn),
-        "timeOut": _fmt_time(a.timeOut),
-        "hoursWorked": a.hoursWorked,
-    } for a in recent]
+        "id": str(a["_id"]),
+        "date": d.isoformat(),
+        "status": a.get("status"),
+        "timeIn": _fmt_time(a.get("timeIn")),
+        "timeOut": _fmt_time(a.get("timeOut")),
+        "hoursWorked": a.get("hoursWorked", "00:00:00"),
+    } for d, a in sorted(att_map.items(), reverse=True)[:14]]
 
     # Average time-in (approx)
     avg_time_in_iso = None
@@ -104,28 +198,17 @@ def compute_employee_report(employee, month: str) -> Dict[str, Any]:
         avg_time_in_iso = avg_dt.strftime("%H:%M")
 
     # Last month comparison
-    prev_month_start = (month_start.replace(day=1) - timedelta(days=1)).replace(day=1)
-    if prev_month_start.month == 12:
-        prev_month_end = date(prev_month_start.year, 12, 31)
-    else:
-        # compute end of prev month
-        nxt = date(prev_month_start.year, prev_month_start.month + 1, 1)
-        prev_month_end = nxt - timedelta(days=1)
-
-    prev_att_qs = Attendance.objects(employee=employee, date__gte=prev_month_start, date__lte=prev_month_end)
-    prev_map = {a.date: a for a in prev_att_qs}
-    prev_days = _daterange(prev_month_start, prev_month_end)
     prev_present = 0
     prev_late = 0
     prev_absent = 0
-    for d in prev_days:
+    for d in daterange(prev_month_start, prev_month_end):
         a = prev_map.get(d)
-        if a and a.status == "Present":
+        if a and a.get("status") == "Present":
             prev_present += 1
-        elif a and a.status == "Late":
+        elif a and a.get("status") == "Late":
             prev_late += 1
         else:
-            if d.weekday() < 5 and d not in leave_dates and d <= today_local:
+            if d.weekday() < 5 and not leaves.covers(emp_key, d) and d <= today_local:
                 prev_absent += 1
 
     comparisons = {
@@ -154,6 +237,7 @@ def compute_employee_report(employee, month: str) -> Dict[str, Any]:
             "totalLate": late_count,
             "totalAbsent": absent_count,
             "totalLeaveRequests": total_leave_requests,
+            "totalHoursWorked": _to_hms_from_seconds(worked_seconds),
         },
         "monthSummary": {
             "month": month_start.strftime("%Y-%m"),
@@ -161,9 +245,180 @@ def compute_employee_report(employee, month: str) -> Dict[str, Any]:
             "late": late_count,
             "absent": absent_count,
             "averageTimeIn": avg_time_in_iso,
+            "hoursWorked": _to_hms_from_seconds(worked_seconds),
+            "averageHoursWorked": _to_hms_from_seconds(worked_seconds // worked_days) if worked_days else None,
         },
         "recentAttendance": recent_serialized,
         "heatmap": heatmap,
         "comparisons": comparisons,
         "insights": insights,
-    }
\ No newline at end of file
+    }
+
+MAX_RANGE_MONTHS = 24
+
+def _avg_time_in(epoch_total: int, count: int) -> Optional[str]:
+    # Same approximation as compute_employee_report's averageTimeIn
+    return datetime.utcfromtimestamp(epoch_total / count).strftime("%H:%M") if count else None
+
+def compute_employee_report_range(employee, from_month: str, to_month: str) -> Dict[str, Any]:
+    """
+    Per-month summaries and one heatmap for every month in [from_month, to_month],
+    from a single pass over the same two queries a one-month report uses.
+    """
+    try:
+        range_start, _ = _parse_month(from_month)
+        to_start, range_end = _parse_month(to_month)
+    except (TypeError, ValueError):
+        raise ValueError("from/to must be YYYY-MM")
+    if to_start < range_start:
+        raise ValueError("to is before from")
+    month_count = (to_start.year - range_start.year) * 12 + to_start.month - range_start.month + 1
+    if month_count > MAX_RANGE_MONTHS:
+        raise ValueError(f"At most {MAX_RANGE_MONTHS} months per request")
+
+    today_local = datetime.today().date()
+    rows, worked_by_month, leave_spans = _fetch_report_data(employee, range_start, range_start, range_end)
+    att_map = {_as_date(r["date"]): r for r in rows}
+    emp_key = str(employee.id)
+    leaves = LeaveIntervals((emp_key, s, e) for s, e in leave_spans)
+
+    months: Dict[str, Dict[str, Any]] = {}
+    cur = range_start
+    while cur <= range_end:
+        months[cur.strftime("%Y-%m")] = {"present": 0, "late": 0, "absent": 0, "leaveRequests": 0, "_in": 0, "_n": 0}
+        cur = _next_month(cur)
+    for s, e in leave_spans:
+        cur = date(s.year, s.month, 1)
+        while cur <= e:
+            months[cur.strftime("%Y-%m")]["leaveRequests"] += 1
+            cur = _next_month(cur)
+
+    heatmap = []
+    for d in daterange(range_start, range_end):
+        att = att_map.get(d)
+        status = _day_status(d, att, leaves, emp_key, today_local)
+        bucket = months[d.strftime("%Y-%m")]
+        if status in ("Present", "Late", "Absent"):
+            bucket[status.lower()] += 1
+        if att and att.get("timeIn"):
+            bucket["_in"] += int(att["timeIn"].timestamp())
+            bucket["_n"] += 1
+        heatmap.append({"date": d.isoformat(), "status": status})
+
+    summaries = []
+    totals = {"present": 0, "late": 0, "absent": 0, "leaveRequests": len(leave_spans), "workedSeconds": 0}
+    for label, bucket in months.items():
+        worked = worked_by_month.get(label, {})
+        seconds, days = worked.get("seconds", 0), worked.get("days", 0)
+        summaries.append({
+            "month": label,
+            "present": bucket["present"],
+            "late": bucket["late"],
+            "absent": bucket["absent"],
+            "leaveRequests": bucket["leaveRequests"],
+            "averageTimeIn": _avg_time_in(bucket["_in"], bucket["_n"]),
+            "hoursWorked": _to_hms_from_seconds(seconds),
+            "averageHoursWorked": _to_hms_from_seconds(seconds // days) if days else None,
+        })
+        for key in ("present", "late", "absent"):
+            totals[key] += bucket[key]
+        totals["workedSeconds"] += seconds
+
+    return {
+        "from": range_start.strftime("%Y-%m"),
+        "to": to_start.strftime("%Y-%m"),
+        "months": summaries,
+        "totals": {
+            "present": totals["present"],
+            "late": totals["late"],
+            "absent": totals["absent"],
+            "leaveRequests": totals["leaveRequests"],
+            "hoursWorked": _to_hms_from_seconds(totals["workedSeconds"]),
+        },
+        "heatmap": heatmap,
+    }
+
+SNAPSHOT_VERSION = 2
+
+def _snapshot_months(start: date, end: date) -> List[str]:
+    """Months touched by [start, end] plus the month after, whose report compares against it."""
+    labels = []
+    cur = date(start.year, start.month, 1)
+    stop = _next_month(end)
+    while cur <= stop:
+        labels.append(cur.strftime("%Y-%m"))
+        cur = _next_month(cur)
+    return labels
+
+def invalidate_report_snapshots(touched: Iterable[Tuple[Any, date, date]]) -> None:
+    """
+    Retire stored reports affected by writes to (employee_id, start, end)
+    ranges, in one bulk write. Each (employee, month) gets its generation
+    bumped and its payload dropped; the row is created if missing, so a report
+    being computed concurrently sees the change and is not stored.
+    """
+    months_by_emp: Dict[ObjectId, set] = {}
+    for employee_id, start, end in touched:
+        if employee_id and start and end:
+            months_by_emp.setdefault(ObjectId(str(employee_id)), set()).update(_snapshot_months(start, end))
+    if not months_by_emp:
+        return
+    ops = [
+        UpdateOne(
+            {"employee": eid, "month": month},
+            {"$inc": {"generation": 1}, "$unset": {"payload": "", "version": ""}},
+            upsert=True,
+        )
+        for eid, months in months_by_emp.items()
+        for month in sorted(months)
+    ]
+    try:
+        EmployeeReportSnapshot._get_collection().bulk_write(ops, ordered=False)
+    except Exception:
+        logger.exception("Report snapshot invalidation failed")
+
+def clear_report_snapshots() -> None:
+    EmployeeReportSnapshot._get_collection().update_many(
+        {}, {"$inc": {"generation": 1}, "$unset": {"payload": "", "version": ""}}
+    )
+
+def get_employee_report(employee, month: Optional[str]) -> Dict[str, Any]:
+    """
+    compute_employee_report, served from a stored snapshot once the month has
+    ended. The current (or a future) month is always computed live. The
+    snapshot is only stored if its generation did not move while computing,
+    so an invalidation that races the computation is never overwritten.
+    """
+    if not month:
+        return compute_employee_report(employee, month)
+    month_start, month_end = _parse_month(month)
+    if month_end >= datetime.today().date():
+        return compute_employee_report(employee, month)
+
+    label = month_start.strftime("%Y-%m")
+    coll = EmployeeReportSnapshot._get_collection()
+    key = {"employee": employee.pk, "month": label}
+    row = coll.find_one(key, {"payload": 1, "version": 1, "generation": 1}) or {}
+    if row.get("version") == SNAPSHOT_VERSION and "payload" in row:
+        return row["payload"]
+
+    generation = row.get("generation")
+    payload = compute_employee_report(employee, month)
+    try:
+        coll.update_one(
+            # No row yet: only insert if no invalidation created one meanwhile (the unique index fails it)
+            {**key, "generation": generation if generation is not None else {"$exists": False}},
+            {"$set": {
+                "version": SNAPSHOT_VERSION,
+                "payload": payload,
+                "generation": generation or 0,
+                "created_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Invalidated while computing: serve this payload once, but don't keep it
+        pass
+    except Exception:
+        logger.exception("Report snapshot write failed")
+    return payload
@@ -2,6 +2,7 @@ from typing import Any, Dict, Optional
 from datetime import datetime
 from mongoengine.errors import NotUniqueError, ValidationError
 from database.models.employee_model import Employee
+from services.analyticsCache_services import bump_analytics_version
 
 def _parse_birth_date(value: Optional[str]) -> Optional[datetime]:
     if not value:
@@ -63,6 +64,7 @@ def create_employee_service(payload: Dict[str, Any]) -> Employee:
     )
     try:
         emp.save()
+        bump_analytics_version()
         return emp
     except NotUniqueError:
         raise ValueError("Employee with same email or firebaseUid already exists.")
@@ -0,0 +1,159 @@
+import multiprocessing
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from bson import ObjectId
+from config.jobs_config import result_retention_days, worker_slots
+from database.models.job_model import Job
+from services.job_services import claim_job, execute_job, finish_job, purge_finished_jobs, result_path
+
+PURGE_INTERVAL = 3600
+KILL_GRACE = 5
+
+def _child_main(job_id: str) -> None:
+    # Spawned interpreter: load settings (and .env) before touching services
+    import django
+    django.setup()
+    execute_job(job_id)
+
+def _remove_partial(job: Dict) -> None:
+    """Delete a job's temporary and final result files; for jobs that did not succeed."""
+    for path in (result_path(job) + ".part", result_path(job)):
+        if os.path.exists(path):
+            os.remove(path)
+
+class _Running:
+    __slots__ = ("job", "process", "deadline")
+
+    def __init__(self, job: Dict, process, deadline: float):
+        self.job = job
+        self.process = process
+        self.deadline = deadline
+
+class JobWorker:
+    """
+    Polls the jobs collection and runs each claimed job in its own process,
+    up to `slots` at a time. A separate process per job is what makes
+    cancellation and timeouts enforceable: the worker kills it. Running jobs
+    are heartbeated so another worker can fail them if this one dies.
+    """
+
+    def __init__(self, slots: Optional[int] = None, poll_interval: float = 2.0, worker_id: Optional[str] = None):
+        self.slots = slots or worker_slots()
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        # spawn, not fork: a forked MongoClient is not safe to use in the child
+        self._ctx = multiprocessing.get_context("spawn")
+        self._running: Dict[ObjectId, _Running] = {}
+        self._last_purge = 0.0
+
+    @property
+    def stale_after(self) -> timedelta:
+        return timedelta(seconds=max(60, self.poll_interval * 10))
+
+    def tick(self) -> int:
+        """One scheduling pass; returns how many jobs are running here afterwards."""
+        self._reap()
+        self._enforce_limits()
+        self._heartbeat()
+        self._fail_stale()
+        self._fill()
+        if time.monotonic() - self._last_purge > PURGE_INTERVAL:
+            self._last_purge = time.monotonic()
+            purged = purge_finished_jobs(result_retention_days())
+            if purged:
+                print(f"Purged {purged} finished job(s)")
+        return len(self._running)
+
+    def run(self, once: bool = False) -> None:
+        """Loop until interrupted; with `once`, until the queue is drained."""
+        try:
+            while True:
+                busy = self.tick()
+                if once and not busy:
+                    return
+                time.sleep(self.poll_interval)
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        for job_id, entry in list(self._running.items()):
+            self._stop(entry)
+            finish_job(job_id, "failed", "Worker shut down")
+        self._running.clear()
+
+    def _fill(self) -> None:
+        while len(self._running) < self.slots:
+            job = claim_job(self.worker_id)
+            if not job:
+                return
+            process = self._ctx.Process(target=_child_main, args=(str(job["_id"]),), name=f"job-{job['_id']}")
+            process.start()
+            self._running[job["_id"]] = _Running(job, process, time.monotonic() + job["timeoutSeconds"])
+            print(f"Started job {job['_id']} ({job['type']}) in pid {process.pid}")
+
+    def _reap(self) -> None:
+        for job_id, entry in list(self._running.items()):
+            if entry.process.is_alive():
+                continue
+            entry.process.join()
+            # No-op when the child recorded its own outcome
+            if finish_job(job_id, "failed", f"Job process exited with code {entry.process.exitcode}"):
+                _remove_partial(entry.job)
+            del self._running[job_id]
+
+    def _enforce_limits(self) -> None:
+        if not self._running:
+            return
+        cancelled = {
+            r["_id"] for r in Job._get_collection().find(
+                {"_id": {"$in": list(self._running)}, "cancelRequested": True}, {"_id": 1}
+            )
+        }
+        now = time.monotonic()
+        for job_id, entry in list(self._running.items()):
+            if job_id in cancelled:
+                outcome = ("cancelled", None)
+            elif now > entry.deadline:
+                outcome = ("failed", f"Timed out after {entry.job['timeoutSeconds']}s")
+            else:
+                continue
+            self._stop(entry)
+            finish_job(job_id, *outcome)
+            _remove_partial(entry.job)
+            del self._running[job_id]
+            print(f"Stopped job {job_id}: {outcome[1] or outcome[0]}")
+
+    def _heartbeat(self) -> None:
+        if self._running:
+            Job._get_collection().update_many(
+                {"_id": {"$in": list(self._running)}, "status": "running"},
+                {"$set": {"heartbeat_at": datetime.utcnow()}},
+            )
+
+    def _fail_stale(self) -> None:
+        """
+        Fail jobs whose worker stopped heartbeating (crashed host, killed
+        process) and delete what they left in the results directory.
+        """
+        now = datetime.utcnow()
+        coll = Job._get_collection()
+        stale = {"status": "running", "heartbeat_at": {"$lt": now - self.stale_after}}
+        for job in coll.find(stale, {"type": 1, "params": 1}):
+            # Conditional per job: another worker may fail it first, or it may heartbeat again
+            res = coll.update_one(
+                {"_id": job["_id"], **stale},
+                {"$set": {"status": "failed", "error": "Worker lost", "finished_at": now}},
+            )
+            if res.modified_count:
+                _remove_partial(job)
+                print(f"Failed job {job['_id']}: Worker lost")
+
+    def _stop(self, entry: _Running) -> None:
+        entry.process.terminate()
+        entry.process.join(KILL_GRACE)
+        if entry.process.is_alive():
+            entry.process.kill()
+            entry.process.join()
@@ -0,0 +1,340 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from config.db_config import connect_mongo
+from config.jobs_config import job_concurrency, job_timeout, results_dir
+from database.models.job_model import Job, JOB_STATUSES
+
+Progress = Callable[[int, Optional[int]], None]
+FINISHED = ("succeeded", "failed", "cancelled")
+PROGRESS_INTERVAL = 1.0
+
+class JobType:
+    """
+    A kind of job: how to validate its params, how to run it, its limits, and
+    `result_format(params) -> (file extension, content type)` of its result.
+    """
+    __slots__ = ("name", "validate", "run", "result_format", "concurrency", "timeout")
+
+    def __init__(self, name: str, validate, run, result_format, concurrency: int, timeout: int):
+        self.name = name
+        self.validate = validate
+        self.run = run
+        self.result_format = result_format
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def max_running(self) -> int:
+        return job_concurrency(self.name, self.concurrency)
+
+    def timeout_seconds(self) -> int:
+        return job_timeout(self.name, self.timeout)
+
+# ---------- job types ----------
+
+def _validate_analytics(params: Dict[str, Any]) -> Dict[str, Any]:
+    from controllers.admin_analytics_controller import MAX_MONTHS_BACK
+    try:
+        months_back = int(params.get("monthsBack") or 12)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid monthsBack")
+    if not 1 <= months_back <= MAX_MONTHS_BACK:
+        raise ValueError(f"monthsBack must be between 1 and {MAX_MONTHS_BACK}")
+    return {"monthsBack": months_back}
+
+def _run_analytics(params: Dict[str, Any], path: str, progress: Progress) -> None:
+    from controllers.admin_analytics_controller import _compute_analytics
+    payload = _compute_analytics(params["monthsBack"])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, default=str)
+
+def _validate_attendance(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Same filters as GET /api/admin/attendance."""
+    from services.admin_attendance_services import STATUSES
+    try:
+        start = datetime.strptime(str(params.get("startDate")), "%Y-%m-%d").date()
+        end = datetime.strptime(str(params.get("endDate")), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Invalid or missing startDate/endDate")
+    if end < start:
+        raise ValueError("endDate before startDate")
+    status_filter = params.get("status") or None
+    if status_filter and status_filter not in STATUSES:
+        raise ValueError("Invalid status")
+    employee_id = params.get("employeeId") or None
+    if employee_id and not ObjectId.is_valid(employee_id):
+        raise ValueError("Invalid employeeId")
+    return {
+        "startDate": start.isoformat(),
+        "endDate": end.isoformat(),
+        "status": status_filter,
+        "employeeId": employee_id,
+        "includeAbsent": params.get("includeAbsent") in (True, "1", "true", "True"),
+    }
+
+def _run_attendance(params: Dict[str, Any], path: str, progress: Progress) -> None:
+    from services.admin_attendance_services import iter_attendance_rows
+    rows = iter_attendance_rows(
+        datetime.strptime(params["startDate"], "%Y-%m-%d").date(),
+        datetime.strptime(params["endDate"], "%Y-%m-%d").date(),
+        params["status"],
+        params["employeeId"],
+        include_absent=params["includeAbsent"],
+    )
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for n, r in enumerate(rows, start=1):
+            f.write(json.dumps(r, separators=(",", ":")) + "\n")
+            if n % 1000 == 0:
+                progress(n, None)
+    progress(n, n)
+
+def _validate_reports(params: Dict[str, Any]) -> Dict[str, Any]:
+    from services.reportBatch_services import FORMATS
+    month = params.get("month") or datetime.today().strftime("%Y-%m")
+    try:
+        datetime.strptime(str(month), "%Y-%m")
+    except ValueError:
+        raise ValueError("month must be YYYY-MM")
+    fmt = params.get("format") or "jsonl"
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    employee_ids = params.get("employeeIds") or []
+    if not isinstance(employee_ids, list) or not all(isinstance(e, str) and ObjectId.is_valid(e) for e in employee_ids):
+        raise ValueError("employeeIds must be a list of employee ids")
+    return {"month": month, "format": fmt, "employeeIds": employee_ids}
+
+def _run_reports(params: Dict[str, Any], path: str, progress: Progress) -> None:
+    from services.reportBatch_services import run_report_batch
+    run_report_batch(
+        params["month"], path, fmt=params["format"], employee_ids=params["employeeIds"] or None, progress=progress
+    )
+
+def _reports_format(params: Dict[str, Any]):
+    return ("csv", "text/csv") if params.get("format") == "csv" else ("jsonl", "application/x-ndjson")
+
+def _validate_export(params: Dict[str, Any]) -> Dict[str, Any]:
+    from services.attendanceExport_services import DEFAULT_OVERTIME_AFTER, FORMATS
+    out = _validate_attendance(params)
+    fmt = params.get("format") or "csv"
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    try:
+        overtime_after = float(params.get("overtimeAfter") or DEFAULT_OVERTIME_AFTER)
+    except (TypeError, ValueError):
+        overtime_after = -1
+    if not 0 <= overtime_after <= 24:
+        raise ValueError("overtimeAfter must be between 0 and 24 hours")
+    return {**out, "format": fmt, "overtimeAfter": overtime_after}
+
+def _run_export(params: Dict[str, Any], path: str, progress: Progress) -> None:
+    from services.admin_attendance_services import iter_attendance_rows
+    from services.attendanceExport_services import stream_csv, write_xlsx
+    rows = iter_attendance_rows(
+        datetime.strptime(params["startDate"], "%Y-%m-%d").date(),
+        datetime.strptime(params["endDate"], "%Y-%m-%d").date(),
+        params["status"],
+        params["employeeId"],
+        include_absent=params["includeAbsent"],
+    )
+    threshold = int(params["overtimeAfter"] * 3600)
+    with open(path, "wb") as f:
+        if params["format"] == "xlsx":
+            write_xlsx(rows, f, threshold)
+        else:
+            for chunk in stream_csv(rows, threshold):
+                f.write(chunk)
+
+def _export_format(params: Dict[str, Any]):
+    from services.attendanceExport_services import CONTENT_TYPES
+    fmt = params.get("format") or "csv"
+    return fmt, CONTENT_TYPES[fmt]
+
+JOB_TYPES: Dict[str, JobType] = {
+    t.name: t for t in (
+        JobType("admin_analytics", _validate_analytics, _run_analytics, lambda p: ("json", "application/json"), 2, 300),
+        JobType("admin_attendance", _validate_attendance, _run_attendance, lambda p: ("ndjson", "application/x-ndjson"), 2, 900),
+        JobType("attendance_export", _validate_export, _run_export, _export_format, 2, 1800),
+        # The batch already fans out over a process pool; one at a time
+        JobType("employee_reports", _validate_reports, _run_reports, _reports_format, 1, 3600),
+    )
+}
+
+# ---------- API side ----------
+
+def submit_job(employee, job_type: str, params: Optional[Dict[str, Any]]) -> Job:
+    jt = JOB_TYPES.get(job_type)
+    if not jt:
+        raise ValueError(f"type must be one of {', '.join(sorted(JOB_TYPES))}")
+    if params is not None and not isinstance(params, dict):
+        raise ValueError("params must be an object")
+    job = Job(
+        type=job_type,
+        params=jt.validate(params or {}),
+        createdBy=employee.id if employee else None,
+        timeoutSeconds=jt.timeout_seconds(),
+        progress={"done": 0, "total": None},
+    )
+    job.save()
+    return job
+
+def get_job(job_id: str) -> Job:
+    if not ObjectId.is_valid(job_id):
+        raise ValueError("Invalid job id")
+    job = Job.objects(id=job_id).first()
+    if not job:
+        raise ValueError("Job not found")
+    return job
+
+def list_jobs(status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 50) -> List[Job]:
+    if status and status not in JOB_STATUSES:
+        raise ValueError("Invalid status")
+    qs = Job.objects()
+    if status:
+        qs = qs.filter(status=status)
+    if job_type:
+        qs = qs.filter(type=job_type)
+    return list(qs.order_by("-created_at").limit(limit))
+
+def cancel_job(job_id: str) -> Job:
+    """Queued jobs are cancelled at once; running ones are flagged and killed by their worker."""
+    job = get_job(job_id)
+    coll = Job._get_collection()
+    now = datetime.utcnow()
+    if not coll.find_one_and_update(
+        {"_id": job.id, "status": "queued"},
+        {"$set": {"status": "cancelled", "finished_at": now}},
+    ):
+        coll.update_one({"_id": job.id, "status": "running"}, {"$set": {"cancelRequested": True}})
+    job.reload()
+    return job
+
+def result_file(job: Job):
+    """(path, content type, download name) of a succeeded job's result."""
+    if job.status != "succeeded" or not job.resultPath or not os.path.exists(job.resultPath):
+        raise ValueError("Result not available")
+    ext, content_type = JOB_TYPES[job.type].result_format(job.params or {})
+    return job.resultPath, content_type, f"{job.type}-{job.id}.{ext}"
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    return dt.isoformat() + "Z" if dt else None
+
+def serialize_job(job: Job) -> Dict[str, Any]:
+    return {
+        "id": str(job.id),
+        "type": job.type,
+        "params": job.params,
+        "status": job.status,
+        "progress": job.progress or {"done": 0, "total": None},
+        "error": job.error,
+        "cancelRequested": bool(job.cancelRequested),
+        "resultSize": job.resultSize,
+        "resultUrl": f"/api/jobs/{job.id}/result" if job.status == "succeeded" else None,
+        "createdAt": _iso(job.created_at),
+        "startedAt": _iso(job.started_at),
+        "finishedAt": _iso(job.finished_at),
+    }
+
+# ---------- worker side ----------
+
+def claim_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Atomically move the oldest queued job whose type is under its concurrency
+    limit to running. Two workers can race past the count; the later claim
+    then sees the earlier one ahead of it and puts its job back.
+    """
+    coll = Job._get_collection()
+    running = {r["_id"]: r["n"] for r in coll.aggregate([
+        {"$match": {"status": "running"}},
+        {"$group": {"_id": "$type", "n": {"$sum": 1}}},
+    ])}
+    open_types = [
+        name for name, jt in JOB_TYPES.items()
+        if running.get(name, 0) < jt.max_running()
+    ]
+    if not open_types:
+        return None
+    now = datetime.utcnow()
+    job = coll.find_one_and_update(
+        {"status": "queued", "type": {"$in": open_types}},
+        {"$set": {"status": "running", "workerId": worker_id, "started_at": now, "heartbeat_at": now}},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+    if not job:
+        return None
+    ahead = coll.count_documents({
+        "status": "running",
+        "type": job["type"],
+        "$or": [{"started_at": {"$lt": now}}, {"started_at": now, "_id": {"$lt": job["_id"]}}],
+    })
+    if ahead >= JOB_TYPES[job["type"]].max_running():
+        coll.update_one(
+            {"_id": job["_id"], "status": "running", "workerId": worker_id},
+            {"$set": {"status": "queued"}, "$unset": {"workerId": "", "started_at": "", "heartbeat_at": ""}},
+        )
+        return None
+    return job
+
+def finish_job(job_id: ObjectId, status: str, error: Optional[str] = None, **fields: Any) -> bool:
+    """Record the outcome of a running job; False when it already finished (e.g. cancelled)."""
+    update = {"status": status, "finished_at": datetime.utcnow(), **fields}
+    if error:
+        update["error"] = error
+    res = Job._get_collection().update_one({"_id": job_id, "status": "running"}, {"$set": update})
+    return res.modified_count == 1
+
+def result_path(job: Dict[str, Any]) -> str:
+    ext, _ = JOB_TYPES[job["type"]].result_format(job.get("params") or {})
+    return str(results_dir() / f"{job['_id']}.{ext}")
+
+def execute_job(job_id: str) -> None:
+    """
+    Run one claimed job to completion. Entry point of the worker's child
+    process: everything it needs is re-read from Mongo, and the result is
+    written to a temporary file that is renamed into place on success.
+    """
+    connect_mongo()
+    coll = Job._get_collection()
+    job = coll.find_one({"_id": ObjectId(job_id)})
+    if not job or job["status"] != "running":
+        return
+    path = result_path(job)
+    tmp = path + ".part"
+    last = [0.0]
+
+    def progress(done: int, total: Optional[int]) -> None:
+        now = time.monotonic()
+        if now - last[0] < PROGRESS_INTERVAL and done != total:
+            return
+        last[0] = now
+        coll.update_one({"_id": job["_id"]}, {"$set": {"progress": {"done": done, "total": total}}})
+
+    try:
+        JOB_TYPES[job["type"]].run(job.get("params") or {}, tmp, progress)
+        os.replace(tmp, path)
+    except Exception as ex:
+        print(f"Job {job_id} ({job['type']}) failed:", ex)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        finish_job(job["_id"], "failed", str(ex) or ex.__class__.__name__)
+        return
+    if not finish_job(job["_id"], "succeeded", resultPath=path, resultSize=os.path.getsize(path)):
+        # Cancelled or timed out while we were finishing up
+        os.remove(path)
+
+def purge_finished_jobs(older_than_days: int) -> int:
+    """Delete finished jobs (and their result files) older than the retention window."""
+    if older_than_days <= 0:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    coll = Job._get_collection()
+    query = {"status": {"$in": list(FINISHED)}, "finished_at": {"$lt": cutoff}}
+    for job in coll.find(query, {"resultPath": 1}):
+        if job.get("resultPath") and os.path.exists(job["resultPath"]):
+            os.remove(job["resultPath"])
+    return coll.delete_many(query).deleted_count
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from database.models.leaveRequeast_model import LeaveRequeast
+from utils.leaveCalendar import TRACKED, LeaveCalendar
+
+MAX_COVERAGE_DAYS = 366
+
+def _as_date(v) -> date:
+    return v.date() if isinstance(v, datetime) else v
+
+def find_overlapping_leaves(employee_id, start: date, end: date, exclude: Optional[Any] = None) -> List[str]:
+    """
+    Ids of the employee's Approved/Pending leaves intersecting [start, end],
+    from one (employee, startDate, endDate) indexed range query.
+    """
+    qs = LeaveRequeast.objects(
+        employee=employee_id, status__in=list(TRACKED), startDate__lte=end, endDate__gte=start
+    )
+    if exclude is not None:
+        qs = qs.filter(id__ne=exclude)
+    return sorted(str(r["_id"]) for r in qs.only("id").as_pymongo())
+
+def _load(start: date, end: date) -> LeaveCalendar:
+    """Interval index over the Approved/Pending leaves intersecting [start, end]."""
+    rows = LeaveRequeast.objects(
+        status__in=list(TRACKED), startDate__lte=end, endDate__gte=start
+    ).only("employee", "startDate", "endDate", "status").as_pymongo()
+    return LeaveCalendar(
+        (r["_id"], r["employee"], _as_date(r["startDate"]), _as_date(r["endDate"]), r["status"])
+        for r in rows
+    )
+
+def leave_coverage(start: date, end: date) -> Dict[str, Any]:
+    """Per-day count of employees on Approved (and on Pending) leave in [start, end]."""
+    if end < start:
+        raise ValueError("to before from")
+    if (end - start).days + 1 > MAX_COVERAGE_DAYS:
+        raise ValueError(f"Range must be at most {MAX_COVERAGE_DAYS} days")
+    days = _load(start, end).coverage(start, end)
+    peak = max(days, key=lambda d: d["approved"])
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "days": days,
+        # Busiest day by approved absences (earliest on ties); None when nobody is out
+        "peak": peak if peak["approved"] else None,
+    }
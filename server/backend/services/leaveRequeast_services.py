@@ -1,9 +1,17 @@
-from typing import Dict, Any, List
+from collections import Counter
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta, date
+from bson import ObjectId
 from database.models.leaveRequeast_model import LeaveRequeast
 from database.models.employee_model import Employee
+from utils.batchDereference import ref_id, employee_names_for
+from services.attendanceRollup_services import record_leave, record_leave_many
+from services.analyticsCache_services import bump_analytics_version
+from services.employeeReport_services import invalidate_report_snapshots
+from services.leaveCalendar_services import find_overlapping_leaves
 
 ALLOWED_TYPES = {"sick", "vacation", "maternity", "emergency"}
+MAX_BULK_IDS = 1000
 
 def _parse_date(value: Any) -> date:
     if isinstance(value, date):
@@ -35,6 +43,9 @@ def create_leave_request(emp: Employee, payload: Dict[str, Any]) -> LeaveRequeas
         raise ValueError(f"Start date must be at least 3 days from today ({earliest.isoformat()}).")
     if end_date < start_date:
         raise ValueError("End date cannot be before start date.")
+    overlap_error = "You already have a pending or approved leave request overlapping these dates."
+    if find_overlapping_leaves(emp.id, start_date, end_date):
+        raise ValueError(overlap_error)
 
     lr = LeaveRequeast(
         employee=emp,
@@ -45,6 +56,13 @@ def create_leave_request(emp: Employee, payload: Dict[str, Any]) -> LeaveRequeas
         status="Pending",
     )
     lr.save()
+    # Two overlapping requests can both pass the check above; whichever sees
+    # the other after inserting backs out (both may, never neither)
+    if find_overlapping_leaves(emp.id, start_date, end_date, exclude=lr.id):
+        lr.delete()
+        raise ValueError(overlap_error)
+    bump_analytics_version()
+    invalidate_report_snapshots([(emp.id, start_date, end_date)])
     return lr
 
 def list_my_leave_requests(emp: Employee) -> List[LeaveRequeast]:
@@ -59,16 +77,99 @@ def set_leave_status(leave_id: str, status: str) -> LeaveRequeast:
         raise ValueError("Leave request not found")
     if status not in {"Approved", "Rejected"}:
         raise ValueError("Invalid status")
+    was_approved = lr.status == "Approved"
     lr.status = status
     lr.updated_at = datetime.now()
     lr.save()
+    if was_approved != (status == "Approved"):
+        try:
+            record_leave(ref_id(lr), lr.startDate, lr.endDate, approved=not was_approved)
+        except Exception as ex:
+            print("Leave rollup update failed:", ex)
+    bump_analytics_version()
+    invalidate_report_snapshots([(ref_id(lr), lr.startDate, lr.endDate)])
     return lr
 
-def serialize_leave(lr: LeaveRequeast) -> Dict[str, Any]:
+def set_leave_status_many(leave_ids: List[Any], status: str) -> List[Dict[str, Any]]:
+    """
+    Approve or reject many Pending leave requests at once: one read, one
+    update_many guarded on status="Pending", one read-back to see which rows
+    this call actually moved (another admin may have acted in between), then
+    a single rollup write and cache/snapshot invalidation for the whole
+    batch. Returns one result per id, in request order.
+    """
+    if status not in {"Approved", "Rejected"}:
+        raise ValueError("Invalid status")
+    if not isinstance(leave_ids, list) or not leave_ids:
+        raise ValueError("ids must be a non-empty list")
+    if len(leave_ids) > MAX_BULK_IDS:
+        raise ValueError(f"At most {MAX_BULK_IDS} ids per request")
+
+    wanted = {str(i) for i in leave_ids if isinstance(i, str) and ObjectId.is_valid(i)}
+    coll = LeaveRequeast._get_collection()
+    current = {
+        str(r["_id"]): r
+        for r in coll.find({"_id": {"$in": [ObjectId(i) for i in wanted]}}, {"employee": 1, "startDate": 1, "endDate": 1, "status": 1})
+    }
+    pending = [ObjectId(i) for i, r in current.items() if r.get("status") == "Pending"]
+
+    moved = set()
+    if pending:
+        now = datetime.utcnow()
+        # Mongo keeps milliseconds; truncate so the read-back matches exactly
+        stamp = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        coll.update_many({"_id": {"$in": pending}, "status": "Pending"}, {"$set": {"status": status, "updated_at": stamp}})
+        moved = {
+            str(r["_id"])
+            for r in coll.find({"_id": {"$in": pending}, "status": status, "updated_at": stamp}, {"_id": 1})
+        }
+
+    results: List[Dict[str, Any]] = []
+    seen = set()
+    for raw in leave_ids:
+        key = str(raw)
+        if key in seen:
+            results.append({"id": key, "result": "duplicate"})
+            continue
+        seen.add(key)
+        if key not in wanted:
+            results.append({"id": key, "result": "invalid", "detail": "Invalid id"})
+        elif key not in current:
+            results.append({"id": key, "result": "not_found", "detail": "Leave request not found"})
+        elif key in moved:
+            results.append({"id": key, "result": "updated", "status": status})
+        else:
+            # Already decided, before this call or concurrently with it
+            prior = current[key].get("status")
+            results.append({"id": key, "result": "skipped", "detail": "Not pending", "status": prior if prior != "Pending" else None})
+
+    if moved:
+        rows = [current[i] for i in moved]
+        if status == "Approved":
+            try:
+                record_leave_many([(r["employee"], r["startDate"].date(), r["endDate"].date()) for r in rows], approved=True)
+            except Exception as ex:
+                print("Leave rollup update failed:", ex)
+        bump_analytics_version()
+        invalidate_report_snapshots((r["employee"], r["startDate"].date(), r["endDate"].date()) for r in rows)
+    return results
+
+def summarize_bulk(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    return dict(Counter(r["result"] for r in results))
+
+def serialize_leave(lr: LeaveRequeast, names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """`names` (from employee_names_for) avoids dereferencing lr.employee per row."""
+    if names is not None:
+        emp_id = ref_id(lr)
+        employee_id = str(emp_id) if emp_id else None
+        employee_name = names.get(employee_id) if employee_id else None
+    else:
+        employee_id = str(lr.employee.id) if lr.employee else None
+        employee_name = f"{lr.employee.firstName} {lr.employee.lastName}".strip() if lr.employee else None
     return {
         "id": str(lr.id),
-        "employeeId": str(lr.employee.id) if lr.employee else None,
-        "employeeName": f"{lr.employee.firstName} {lr.employee.lastName}".strip() if lr.employee else None,
+        "employeeId": employee_id,
+        "employeeName": employee_name,
         "leave_type": lr.leaveType,
         "start_date": lr.startDate.isoformat() if lr.startDate else None,
         "end_date": lr.endDate.isoformat() if lr.endDate else None,
@@ -76,4 +177,12 @@ def serialize_leave(lr: LeaveRequeast) -> Dict[str, Any]:
         "status": lr.status,
         "created_at": lr.created_at.isoformat() if lr.created_at else None,
         "updated_at": lr.updated_at.isoformat() if lr.updated_at else None,
-    }
\ No newline at end of file
+    }
+
+def serialize_leaves(docs) -> List[Dict[str, Any]]:
+    """Serialize a list of leave requests with one batched employee lookup."""
+    if hasattr(docs, "no_dereference"):
+        docs = docs.no_dereference()
+    docs = list(docs)
+    names = employee_names_for(docs)
+    return [serialize_leave(lr, names) for lr in docs]
\ No newline at end of file
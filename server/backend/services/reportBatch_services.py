@@ -0,0 +1,155 @@
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from bson import ObjectId
+from database.models.employee_model import Employee
+from services.employeeReport_services import _report_window, build_employee_report, fetch_report_data_many
+
+FORMATS = ("jsonl", "csv")
+CSV_FIELDS = (
+    "employeeId", "employeeName", "month", "present", "late", "absent",
+    "totalLeaveRequests", "averageTimeIn", "hoursWorked", "averageHoursWorked",
+)
+
+def _build_chunk(task: Tuple[str, date, date, date, List[Tuple[str, str]], Dict, Dict, Dict]) -> List[Dict[str, Any]]:
+    """Worker: build every report of one pre-fetched chunk. Runs in a child process; no DB access."""
+    month, month_start, month_end, today_local, employees, rows, worked, leaves = task
+    out = []
+    for emp_id, name in employees:
+        report = build_employee_report(emp_id, month_start, month_end, rows[emp_id], worked[emp_id], leaves[emp_id], today_local)
+        out.append({"employeeId": emp_id, "employeeName": name, "month": month, "report": report})
+    return out
+
+def _csv_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    report = record["report"]
+    summary = report["monthSummary"]
+    return {
+        "employeeId": record["employeeId"],
+        "employeeName": record["employeeName"],
+        "month": record["month"],
+        "present": summary["present"],
+        "late": summary["late"],
+        "absent": summary["absent"],
+        "totalLeaveRequests": report["kpis"]["totalLeaveRequests"],
+        "averageTimeIn": summary["averageTimeIn"] or "",
+        "hoursWorked": summary["hoursWorked"],
+        "averageHoursWorked": summary["averageHoursWorked"] or "",
+    }
+
+def completed_employee_ids(path: str, fmt: str) -> Set[str]:
+    """
+    Employee ids already written to `path` by an interrupted run. A trailing
+    partial line (crash mid-write) is truncated so appending stays valid.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        cut = data.rfind(b"\n") + 1
+        if cut != len(data):
+            f.truncate(cut)
+            data = data[:cut]
+    lines = data.decode("utf-8").splitlines()
+    if fmt == "csv":
+        return {row["employeeId"] for row in csv.DictReader(lines) if row.get("employeeId")}
+    return {json.loads(line)["employeeId"] for line in lines if line.strip()}
+
+def _roster(employee_ids: Optional[List[str]]) -> List[Tuple[str, str]]:
+    qs = Employee.objects(id__in=employee_ids) if employee_ids else Employee.objects()
+    rows = qs.only("firstName", "lastName").order_by("id").as_pymongo()
+    return [
+        (str(r["_id"]), f"{r.get('firstName') or ''} {r.get('lastName') or ''}".strip())
+        for r in rows
+    ]
+
+def _tasks(month: str, employees: List[Tuple[str, str]], chunk_size: int) -> Iterator[Tuple]:
+    """Pre-fetch attendance and leaves per chunk (two queries each) in the parent process."""
+    today_local = datetime.today().date()
+    prev_month_start, month_start, month_end = _report_window(month, today_local)
+    label = month_start.strftime("%Y-%m")
+    for i in range(0, len(employees), chunk_size):
+        chunk = employees[i:i + chunk_size]
+        rows, worked, leaves = fetch_report_data_many(
+            [ObjectId(emp_id) for emp_id, _ in chunk], prev_month_start, month_start, month_end
+        )
+        yield (label, month_start, month_end, today_local, chunk, rows, worked, leaves)
+
+def _bounded_map(pool: ProcessPoolExecutor, tasks: Iterator[Tuple], window: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    pool.map over `tasks` in order, with at most `window` chunks submitted and
+    not yet consumed. pool.map would drain the generator up front, holding
+    every pre-fetched chunk in memory; here a new chunk is fetched only as
+    the oldest one is handed back.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(_build_chunk, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def run_report_batch(
+    month: str,
+    output_path: str,
+    fmt: str = "jsonl",
+    employee_ids: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 50,
+    resume: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    compute_employee_report for every (or the listed) employee, streamed to one
+    JSONL or CSV file as chunks finish. Chunks are built across a process pool;
+    with resume, employees already in the file are skipped and new rows appended.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    try:
+        datetime.strptime(month, "%Y-%m")
+    except (TypeError, ValueError):
+        raise ValueError("month must be YYYY-MM")
+
+    done = completed_employee_ids(output_path, fmt) if resume else set()
+    employees = [e for e in _roster(employee_ids) if e[0] not in done]
+    total = len(employees)
+    workers = max(1, workers or os.cpu_count() or 1)
+    chunk_size = max(1, chunk_size)
+
+    append = resume and os.path.exists(output_path) and os.path.getsize(output_path) > 0
+    written = 0
+    with open(output_path, "a" if append else "w", encoding="utf-8", newline="") as out:
+        writer = None
+        if fmt == "csv":
+            writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+            if not append:
+                writer.writeheader()
+        tasks = _tasks(month, employees, chunk_size)
+        if workers == 1:
+            results = map(_build_chunk, tasks)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            # ~2 chunks per worker: enough to keep them busy while the next fetch runs
+            results = _bounded_map(pool, tasks, 2 * workers)
+        try:
+            for records in results:
+                for record in records:
+                    if writer:
+                        writer.writerow(_csv_row(record))
+                    else:
+                        out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+                written += len(records)
+                if progress:
+                    progress(written, total)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    return {"month": month, "output": output_path, "written": written, "skipped": len(done), "total": total + len(done)}
@@ -0,0 +1,76 @@
+"""
+Pytest setup for the backend services.
+
+Tests run against an in-memory mongomock database by default. Set
+MONGO_TEST_URI to run them against a real (disposable) MongoDB instead; the
+database named in the URI is dropped after every test.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from mongoengine import connect, disconnect
+from database.models.attendance_model import Attendance
+from database.models.attendanceRollup_model import AttendanceDailyRollup
+from database.models.clockEvent_model import ClockEvent
+from database.models.employee_model import Employee
+from database.models.employeeReportSnapshot_model import EmployeeReportSnapshot
+from database.models.leaveRequeast_model import LeaveRequeast
+
+def _patch_mongomock(mongomock) -> None:
+    # pymongo 4.x passes `sort` to the bulk builder, which mongomock doesn't accept yet
+    import mongomock.collection as mc
+
+    def drop_sort(method):
+        def wrapper(self, *args, **kwargs):
+            kwargs.pop("sort", None)
+            return method(self, *args, **kwargs)
+        return wrapper
+
+    for name in ("add_replace", "add_update", "add_delete"):
+        setattr(mc.BulkOperationBuilder, name, drop_sort(getattr(mc.BulkOperationBuilder, name)))
+
+@pytest.fixture
+def mongo():
+    """A clean default connection with the model indexes in place."""
+    uri = os.getenv("MONGO_TEST_URI")
+    disconnect(alias="default")
+    if uri:
+        conn = connect(host=uri, alias="default")
+    else:
+        mongomock = pytest.importorskip("mongomock")
+        if not getattr(mongomock, "_backend_tests_patched", False):
+            _patch_mongomock(mongomock)
+            mongomock._backend_tests_patched = True
+        conn = connect("backend_tests", host="mongodb://localhost", mongo_client_class=mongomock.MongoClient, alias="default")
+    for model in (Employee, Attendance, AttendanceDailyRollup, ClockEvent, EmployeeReportSnapshot, LeaveRequeast):
+        model.ensure_indexes()
+    db = Employee._get_db()
+    yield db
+    conn.drop_database(db.name)
+    disconnect(alias="default")
+
+@pytest.fixture
+def make_employee(mongo):
+    counter = iter(range(10_000))
+
+    def make(**fields) -> Employee:
+        n = next(counter)
+        defaults = {
+            "firstName": f"First{n}",
+            "lastName": f"Last{n}",
+            "email": f"employee{n}@example.com",
+            "firebaseUid": f"uid-{n}",
+            "password": "firebase-manage",
+        }
+        return Employee(**{**defaults, **fields}).save()
+
+    return make
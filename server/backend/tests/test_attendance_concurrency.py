@@ -0,0 +1,65 @@
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from database.models.attendance_model import Attendance
+from services import attendance_services
+
+CALLS_PER_EMPLOYEE = 8
+
+def _race(fn, employees):
+    """Run fn(employee) for every entry at once; (employee id, "ok" | error message) per call."""
+    barrier = threading.Barrier(len(employees))
+
+    def attempt(employee):
+        barrier.wait()
+        try:
+            return str(employee.id), fn(employee)
+        except ValueError as ex:
+            return str(employee.id), str(ex)
+
+    with ThreadPoolExecutor(max_workers=len(employees)) as pool:
+        return list(pool.map(attempt, employees))
+
+def _outcomes(results):
+    wins = Counter(emp for emp, r in results if isinstance(r, Attendance))
+    errors = {emp: [r for e, r in results if e == emp and not isinstance(r, Attendance)] for emp, _ in results}
+    return wins, errors
+
+def test_parallel_time_in_same_employee(make_employee):
+    employee = make_employee()
+    results = _race(attendance_services.time_in, [employee] * CALLS_PER_EMPLOYEE)
+
+    wins, errors = _outcomes(results)
+    assert wins == {str(employee.id): 1}
+    assert errors[str(employee.id)] == ["Already timed in for today."] * (CALLS_PER_EMPLOYEE - 1)
+    assert Attendance.objects(employee=employee).count() == 1
+
+def test_parallel_time_in_different_employees(make_employee):
+    employees = [make_employee() for _ in range(4)]
+    results = _race(attendance_services.time_in, employees * CALLS_PER_EMPLOYEE)
+
+    wins, errors = _outcomes(results)
+    assert wins == {str(e.id): 1 for e in employees}
+    for e in employees:
+        assert errors[str(e.id)] == ["Already timed in for today."] * (CALLS_PER_EMPLOYEE - 1)
+        assert Attendance.objects(employee=e).count() == 1
+
+def test_racing_time_out_writes_once(make_employee):
+    employee = make_employee()
+    clocked_in = attendance_services.time_in(employee)
+    # Backdate the clock-in so the worked time is non-zero and depends on when timeOut lands
+    Attendance.objects(id=clocked_in.id).update_one(set__timeIn=clocked_in.timeIn - timedelta(hours=3))
+
+    results = _race(attendance_services.time_out, [employee] * CALLS_PER_EMPLOYEE)
+
+    winners = [r for _, r in results if isinstance(r, Attendance)]
+    losers = [r for _, r in results if not isinstance(r, Attendance)]
+    assert len(winners) == 1
+    assert losers == ["Already timed out for today."] * (CALLS_PER_EMPLOYEE - 1)
+
+    stored = Attendance.objects.get(id=clocked_in.id)
+    assert stored.workedSeconds == winners[0].workedSeconds >= 3 * 3600
+    assert stored.timeOut == winners[0].timeOut
+    assert stored.hoursWorked == winners[0].hoursWorked
@@ -0,0 +1,86 @@
+import csv
+import io
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models.attendance_model import Attendance
+from services import attendanceExport_services as export
+from services.admin_attendance_services import iter_attendance_rows
+
+MONDAY = date(2025, 3, 3)
+EIGHT_HOURS = 8 * 3600
+
+def _attend(employee, day, hours):
+    time_in = datetime.combine(day, datetime.min.time()).replace(hour=8)
+    return Attendance(employee=employee, date=day, timeIn=time_in, timeOut=time_in + timedelta(hours=hours),
+                      status="Present", hoursWorked=f"{hours:02d}:00:00", workedSeconds=hours * 3600).save()
+
+def _csv(rows, overtime_after=EIGHT_HOURS):
+    text = b"".join(export.stream_csv(rows, overtime_after)).decode("utf-8")
+    assert text.startswith("\ufeff")
+    return list(csv.reader(io.StringIO(text[1:])))
+
+def test_rows_carry_worked_seconds_into_hours_and_overtime(make_employee):
+    employee = make_employee(firstName="Ada", lastName="Lovelace")
+    _attend(employee, MONDAY, 10)
+    _attend(employee, MONDAY + timedelta(days=1), 6)
+
+    lines = _csv(iter_attendance_rows(MONDAY, MONDAY + timedelta(days=1)))
+
+    assert lines[0] == export.HEADER
+    assert lines[1:] == [
+        ["Ada Lovelace", str(employee.id), "2025-03-03", "08:00:00", "18:00:00", "Present", "10:00:00", "02:00:00"],
+        ["Ada Lovelace", str(employee.id), "2025-03-04", "08:00:00", "14:00:00", "Present", "06:00:00", "00:00:00"],
+    ]
+
+def test_worked_seconds_wins_over_the_display_string(make_employee):
+    row = _attend(make_employee(), MONDAY, 9)
+    Attendance.objects(id=row.id).update_one(set__hoursWorked="not a duration")
+
+    (r,) = iter_attendance_rows(MONDAY, MONDAY)
+
+    assert export.export_row(r, EIGHT_HOURS)[6:] == ["09:00:00", "01:00:00"]
+
+def test_unmigrated_rows_fall_back_to_hours_worked(make_employee):
+    row = _attend(make_employee(), MONDAY, 9)
+    Attendance._get_collection().update_one({"_id": row.id}, {"$unset": {"workedSeconds": ""}})
+
+    (r,) = iter_attendance_rows(MONDAY, MONDAY)
+
+    assert r["workedSeconds"] is None
+    assert export.export_row(r, EIGHT_HOURS)[6:] == ["09:00:00", "01:00:00"]
+
+def test_absent_rows_export_with_zero_hours(make_employee):
+    employee = make_employee()
+
+    lines = _csv(iter_attendance_rows(MONDAY, MONDAY, include_absent=True))
+
+    assert lines[1][1:] == [str(employee.id), "2025-03-03", "", "", "Absent", "00:00:00", "00:00:00"]
+
+def test_csv_is_streamed_in_chunks(make_employee, monkeypatch):
+    monkeypatch.setattr(export, "CSV_CHUNK_ROWS", 2)
+    employee = make_employee()
+    for offset in range(5):
+        _attend(employee, MONDAY + timedelta(days=offset), 8)
+
+    chunks = list(export.stream_csv(iter_attendance_rows(MONDAY, MONDAY + timedelta(days=4)), EIGHT_HOURS))
+
+    # header, then 2 + 2 + 1 rows
+    assert [c.count(b"\n") for c in chunks] == [1, 2, 2, 1]
+
+def test_xlsx_continues_on_a_new_sheet(make_employee, monkeypatch):
+    openpyxl = pytest.importorskip("openpyxl")
+    monkeypatch.setattr(export, "XLSX_MAX_ROWS", 3)
+    employee = make_employee()
+    for offset in range(5):
+        _attend(employee, MONDAY + timedelta(days=offset), 9)
+    out = io.BytesIO()
+
+    written = export.write_xlsx(iter_attendance_rows(MONDAY, MONDAY + timedelta(days=4)), out, EIGHT_HOURS)
+
+    wb = openpyxl.load_workbook(io.BytesIO(out.getvalue()))
+    assert written == 5
+    assert wb.sheetnames == ["Attendance", "Attendance (2)", "Attendance (3)"]
+    assert [ws.max_row for ws in wb.worksheets] == [3, 3, 2]
+    assert [c.value for c in wb["Attendance"][2]][6:] == ["09:00:00", "01:00:00"]
@@ -0,0 +1,53 @@
+from datetime import date, timedelta
+
+from database.models.attendanceRollup_model import AttendanceDailyRollup
+from database.models.leaveRequeast_model import LeaveRequeast
+from services import attendanceRollup_services as rollup
+from services.leaveRequeast_services import set_leave_status
+
+def _approved(employee, start, end):
+    lr = LeaveRequeast(employee=employee, leaveType="vacation", startDate=start, endDate=end, status="Approved").save()
+    rollup.record_leave(employee.id, start, end, approved=True)
+    return lr
+
+def _rows(start, end):
+    return rollup.load_rollup(start, end, "leaveIds", "absentIds")
+
+def test_revoking_one_of_two_overlapping_leaves_keeps_shared_days(make_employee):
+    employee = make_employee()
+    start = date.today() + timedelta(days=10)
+    first = _approved(employee, start, start + timedelta(days=4))
+    _approved(employee, start + timedelta(days=3), start + timedelta(days=6))
+
+    set_leave_status(str(first.id), "Rejected")
+
+    rows = _rows(start, start + timedelta(days=6))
+    on_leave = {d for d, row in rows.items() if employee.id in row["leaveIds"]}
+    assert on_leave == {start + timedelta(days=k) for k in range(3, 7)}
+    assert all(row["onLeave"] == len(row["leaveIds"]) for row in rows.values())
+
+def test_revoke_matches_rebuild_on_closed_days(make_employee):
+    employee = make_employee()
+    monday = date.today() - timedelta(days=date.today().weekday() + 14)
+    first = _approved(employee, monday, monday + timedelta(days=2))
+    _approved(employee, monday + timedelta(days=1), monday + timedelta(days=4))
+    rollup.rebuild_rollup(monday, monday + timedelta(days=4))
+
+    set_leave_status(str(first.id), "Rejected")
+    incremental = _rows(monday, monday + timedelta(days=4))
+    rollup.rebuild_rollup(monday, monday + timedelta(days=4))
+    rebuilt = _rows(monday, monday + timedelta(days=4))
+
+    for d, row in rebuilt.items():
+        for field in ("onLeave", "absent", "leaveIds", "absentIds"):
+            assert incremental[d][field] == row[field], (d, field)
+    assert employee.id in rebuilt[monday]["absentIds"]
+    assert employee.id in rebuilt[monday + timedelta(days=1)]["leaveIds"]
+
+def test_adding_a_member_twice_counts_once(make_employee):
+    employee = make_employee()
+    day = date.today() + timedelta(days=5)
+    for _ in range(3):
+        rollup.record_attendance(employee.id, day, "Present")
+    row = AttendanceDailyRollup.objects.get(date=day)
+    assert row.present == 1 and row.presentIds == [employee.id]
@@ -0,0 +1,44 @@
+from database.models.employee_model import Employee
+from services import auth_services
+
+def _claims(employee, **extra):
+    return {"uid": employee.firebaseUid, "email": employee.email, **extra}
+
+def test_cached_employee_is_a_fresh_document_per_request(make_employee):
+    employee = make_employee()
+    auth_services.invalidate_cached_employee(employee.firebaseUid)
+
+    first = auth_services.get_or_create_employee_from_firebase(_claims(employee))
+    first.firstName = "Mutated"
+    first.isAdmin = True
+    second = auth_services.get_or_create_employee_from_firebase(_claims(employee))
+
+    assert second is not first
+    assert second.id == employee.id
+    assert second.firstName == employee.firstName
+    assert not second.isAdmin
+
+def test_profile_change_is_written_and_cached(make_employee):
+    employee = make_employee()
+    auth_services.invalidate_cached_employee(employee.firebaseUid)
+    auth_services.get_or_create_employee_from_firebase(_claims(employee))
+
+    changed = auth_services.get_or_create_employee_from_firebase(_claims(employee, name="Ada Lovelace"))
+    again = auth_services.get_or_create_employee_from_firebase(_claims(employee, name="Ada Lovelace"))
+
+    assert (changed.firstName, changed.lastName) == ("Ada", "Lovelace")
+    assert (again.firstName, again.lastName) == ("Ada", "Lovelace")
+    stored = Employee.objects.get(id=employee.id)
+    assert (stored.firstName, stored.lastName) == ("Ada", "Lovelace")
+
+def test_cached_document_saves_as_an_update(make_employee):
+    employee = make_employee()
+    auth_services.invalidate_cached_employee(employee.firebaseUid)
+    auth_services.get_or_create_employee_from_firebase(_claims(employee))
+
+    cached = auth_services.get_or_create_employee_from_firebase(_claims(employee))
+    cached.contactNumber = "555-0100"
+    cached.save()
+
+    assert Employee.objects.count() == 1
+    assert Employee.objects.get(id=employee.id).contactNumber == "555-0100"
@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models.attendance_model import Attendance
+from database.models.clockEvent_model import ClockEvent
+from services import clockEvent_services
+
+DAY = date.today() - timedelta(days=3)
+
+def _event(key, employee, hour, direction, day=DAY):
+    ts = datetime.combine(day, datetime.min.time()).replace(hour=hour)
+    return {"idempotencyKey": key, "employeeId": str(employee.id), "timestamp": ts.isoformat(), "direction": direction}
+
+def _statuses(results):
+    return [(r["idempotencyKey"], r["status"]) for r in results]
+
+def test_batch_applies_punches_and_logs_results(make_employee):
+    employee = make_employee()
+    results = clockEvent_services.ingest_clock_events([
+        _event("a", employee, 8, "in"),
+        _event("b", employee, 17, "out"),
+        _event("c", employee, 18, "out"),
+        _event("a", employee, 9, "in"),
+    ])
+
+    assert _statuses(results) == [("a", "applied"), ("b", "applied"), ("c", "rejected"), ("a", "duplicate")]
+    row = Attendance.objects.get(employee=employee)
+    assert row.workedSeconds == 9 * 3600 and row.hoursWorked == "09:00:00"
+    logged = {e.idempotencyKey: e.result for e in ClockEvent.objects}
+    assert logged == {"a": "applied", "b": "applied", "c": "rejected"}
+
+def test_redelivered_batch_is_reported_as_duplicate(make_employee):
+    employee = make_employee()
+    batch = [_event("a", employee, 8, "in"), _event("b", employee, 17, "out")]
+    clockEvent_services.ingest_clock_events(batch)
+
+    assert _statuses(clockEvent_services.ingest_clock_events(batch)) == [("a", "duplicate"), ("b", "duplicate")]
+
+def test_concurrent_retries_apply_each_event_once(make_employee, monkeypatch):
+    employees = [make_employee() for _ in range(3)]
+    batch = [_event(f"{e.id}-{d}", e, h, d) for e in employees for h, d in ((8, "in"), (17, "out"))]
+    barrier = threading.Barrier(4)
+    read_days = clockEvent_services._existing_days
+
+    def slow_read(events):
+        # Hold every delivery past its dedupe step so they overlap
+        time.sleep(0.05)
+        return read_days(events)
+
+    monkeypatch.setattr(clockEvent_services, "_existing_days", slow_read)
+
+    def deliver(_):
+        barrier.wait()
+        return clockEvent_services.ingest_clock_events(batch)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        deliveries = list(pool.map(deliver, range(4)))
+
+    for i, raw in enumerate(batch):
+        outcomes = sorted(results[i]["status"] for results in deliveries)
+        assert outcomes == ["applied", "duplicate", "duplicate", "duplicate"], raw["idempotencyKey"]
+    assert all(a.workedSeconds == 9 * 3600 for a in Attendance.objects)
+
+def test_future_and_unknown_events_are_refused(make_employee):
+    employee = make_employee()
+    future = datetime.now() + timedelta(hours=1)
+    ghost = make_employee()
+    ghost.delete()
+    results = clockEvent_services.ingest_clock_events([
+        {"idempotencyKey": "f", "employeeId": str(employee.id), "timestamp": future.isoformat(), "direction": "in"},
+        _event("g", ghost, 8, "in"),
+    ])
+
+    assert [(r["status"], r.get("detail")) for r in results] == [
+        ("invalid", "Timestamp is in the future"),
+        ("rejected", "Unknown employee"),
+    ]
+    assert ClockEvent.objects.count() == 0
+
+def test_failed_write_releases_the_keys(make_employee, monkeypatch):
+    employee = make_employee()
+    batch = [_event("a", employee, 8, "in")]
+
+    def down(*args):
+        raise RuntimeError("primary stepped down")
+
+    with monkeypatch.context() as m:
+        m.setattr(clockEvent_services, "_write_attendance", down)
+        with pytest.raises(RuntimeError):
+            clockEvent_services.ingest_clock_events(batch)
+
+    assert _statuses(clockEvent_services.ingest_clock_events(batch)) == [("a", "applied")]
+
+def test_events_that_lose_a_live_race_are_rejected(make_employee, monkeypatch):
+    late_in, late_out = make_employee(), make_employee()
+    clockEvent_services.ingest_clock_events([_event("seed", late_out, 8, "in")])
+    read_days = clockEvent_services._existing_days
+    rollup_calls = []
+    monkeypatch.setattr(clockEvent_services, "record_attendance_many", rollup_calls.append)
+
+    def read_then_race(events):
+        rows = read_days(events)
+        # Live time_in / time_out land between our read and our write
+        start = datetime.combine(DAY, datetime.min.time())
+        Attendance(employee=late_in, date=DAY, timeIn=start.replace(hour=7)).save()
+        Attendance.objects(employee=late_out).update_one(set__timeOut=start.replace(hour=16))
+        return rows
+
+    monkeypatch.setattr(clockEvent_services, "_existing_days", read_then_race)
+    results = clockEvent_services.ingest_clock_events([_event("i", late_in, 9, "in"), _event("o", late_out, 17, "out")])
+
+    assert [(r["status"], r["detail"]) for r in results] == [
+        ("rejected", "Already timed in for that day."),
+        ("rejected", "Already timed out for that day."),
+    ]
+    assert rollup_calls == []
@@ -0,0 +1,72 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models.attendance_model import Attendance
+from database.models.employee_model import Employee
+from database.models.leaveRequeast_model import LeaveRequeast
+from services import employeeReport_services
+
+COMMANDS = ("find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct")
+
+class _CountingCollection:
+    """Collection proxy that counts the commands a service sends through it."""
+
+    def __init__(self, collection, log):
+        self._collection = collection
+        self._log = log
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name in COMMANDS:
+            def counted(*args, **kwargs):
+                self._log.append((self._collection.name, name))
+                return attr(*args, **kwargs)
+            return counted
+        return attr
+
+@pytest.fixture
+def commands(mongo, monkeypatch):
+    log = []
+    for model in (Attendance, LeaveRequeast, Employee):
+        collection = model._get_collection()
+        monkeypatch.setattr(model, "_get_collection", classmethod(lambda cls, c=collection: _CountingCollection(c, log)))
+    return log
+
+def _seed(make_employee, count, month_start):
+    employees = [make_employee() for _ in range(count)]
+    for e in employees:
+        for offset in (-10, 0, 3, 7):
+            day = month_start + timedelta(days=offset)
+            time_in = datetime.combine(day, datetime.min.time()).replace(hour=8)
+            Attendance(employee=e, date=day, timeIn=time_in, timeOut=time_in + timedelta(hours=8),
+                       status="Present", hoursWorked="08:00:00", workedSeconds=8 * 3600).save()
+        LeaveRequeast(employee=e, leaveType="sick", startDate=month_start + timedelta(days=10),
+                      endDate=month_start + timedelta(days=12), status="Approved").save()
+    return employees
+
+def test_single_month_report_issues_two_commands(make_employee, commands):
+    (employee,) = _seed(make_employee, 1, date(2025, 3, 1))
+    commands.clear()
+
+    report = employeeReport_services.compute_employee_report(employee, "2025-03")
+
+    assert sorted(commands) == [("attendances", "aggregate"), ("leave_requests", "find")]
+    assert report["kpis"]["totalPresent"] == 3
+    assert report["kpis"]["totalHoursWorked"] == "24:00:00"
+    assert report["comparisons"]["present"]["previous"] == 1
+
+@pytest.mark.parametrize("count", [1, 5, 25])
+def test_batch_fetch_commands_do_not_grow_with_employees(make_employee, commands, count):
+    month_start = date(2025, 3, 1)
+    employees = _seed(make_employee, count, month_start)
+    commands.clear()
+
+    rows, worked, leaves = employeeReport_services.fetch_report_data_many(
+        [e.id for e in employees], date(2025, 2, 1), month_start, date(2025, 3, 31)
+    )
+
+    assert sorted(commands) == [("attendances", "find"), ("leave_requests", "find")]
+    assert all(len(rows[str(e.id)]) == 4 for e in employees)
+    assert all(worked[str(e.id)] == {"2025-03": {"seconds": 3 * 8 * 3600, "days": 3}} for e in employees)
+    assert all(len(leaves[str(e.id)]) == 1 for e in employees)
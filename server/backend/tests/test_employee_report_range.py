@@ -0,0 +1,79 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models.attendance_model import Attendance
+from database.models.leaveRequeast_model import LeaveRequeast
+from services.employeeReport_services import MAX_RANGE_MONTHS, compute_employee_report_range
+
+def _attend(employee, day, status="Present"):
+    time_in = datetime.combine(day, datetime.min.time()).replace(hour=8)
+    Attendance(employee=employee, date=day, timeIn=time_in, timeOut=time_in + timedelta(hours=8),
+               status=status, hoursWorked="08:00:00", workedSeconds=8 * 3600).save()
+
+def _leave(employee, start, end):
+    LeaveRequeast(employee=employee, leaveType="vacation", startDate=start, endDate=end, status="Approved").save()
+
+@pytest.fixture
+def year_end(make_employee):
+    """Attendance on both edges of December 2024 and January 2025, plus leaves across the edges."""
+    employee = make_employee()
+    _attend(employee, date(2024, 12, 1))
+    _attend(employee, date(2024, 12, 31), status="Late")
+    _attend(employee, date(2025, 1, 1))
+    _attend(employee, date(2025, 1, 31))
+    _leave(employee, date(2024, 11, 28), date(2024, 12, 2))
+    _leave(employee, date(2024, 12, 30), date(2025, 1, 2))
+    _leave(employee, date(2024, 11, 4), date(2024, 11, 8))
+    return employee
+
+def test_range_buckets_days_into_their_own_month(year_end):
+    report = compute_employee_report_range(year_end, "2024-12", "2025-01")
+
+    by_month = {m["month"]: m for m in report["months"]}
+    assert list(by_month) == ["2024-12", "2025-01"]
+    # December: 22 weekdays, less the 31st (late), the 2nd and the 30th (leave)
+    assert {k: by_month["2024-12"][k] for k in ("present", "late", "absent")} == {"present": 1, "late": 1, "absent": 19}
+    # January: 23 weekdays, less the 1st and 31st (present) and the 2nd (leave)
+    assert {k: by_month["2025-01"][k] for k in ("present", "late", "absent")} == {"present": 2, "late": 0, "absent": 20}
+    assert by_month["2024-12"]["hoursWorked"] == by_month["2025-01"]["hoursWorked"] == "16:00:00"
+    assert report["totals"]["hoursWorked"] == "32:00:00"
+
+def test_leave_spanning_months_counts_in_each_but_once_in_totals(year_end):
+    report = compute_employee_report_range(year_end, "2024-12", "2025-01")
+
+    assert [m["leaveRequests"] for m in report["months"]] == [2, 1]
+    assert report["totals"]["leaveRequests"] == 2
+
+def test_heatmap_covers_the_range_exactly(year_end):
+    heatmap = compute_employee_report_range(year_end, "2024-12", "2025-01")["heatmap"]
+
+    assert len(heatmap) == 31 + 31
+    assert (heatmap[0]["date"], heatmap[-1]["date"]) == ("2024-12-01", "2025-01-31")
+    statuses = {h["date"]: h["status"] for h in heatmap}
+    assert statuses["2024-12-31"] == "Late"
+    assert statuses["2024-12-30"] == statuses["2025-01-02"] == "—"
+    assert statuses["2025-01-03"] == "Absent"
+
+def test_single_month_range_ignores_neighbouring_months(year_end):
+    report = compute_employee_report_range(year_end, "2025-01", "2025-01")
+
+    (january,) = report["months"]
+    assert (report["from"], report["to"]) == ("2025-01", "2025-01")
+    assert (january["present"], january["leaveRequests"]) == (2, 1)
+    assert report["totals"]["hoursWorked"] == "16:00:00"
+
+@pytest.mark.parametrize("from_month, to_month, detail", [
+    ("2025-13", "2025-12", "from/to must be YYYY-MM"),
+    (None, "2025-01", "from/to must be YYYY-MM"),
+    ("2025-02", "2025-01", "to is before from"),
+    ("2023-01", "2025-01", f"At most {MAX_RANGE_MONTHS} months per request"),
+])
+def test_invalid_ranges_are_refused(make_employee, from_month, to_month, detail):
+    with pytest.raises(ValueError, match=detail):
+        compute_employee_report_range(make_employee(), from_month, to_month)
+
+def test_longest_allowed_range_is_accepted(make_employee):
+    report = compute_employee_report_range(make_employee(), "2023-02", "2025-01")
+
+    assert len(report["months"]) == MAX_RANGE_MONTHS
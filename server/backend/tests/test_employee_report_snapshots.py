@@ -0,0 +1,86 @@
+from datetime import date, datetime
+
+import pytest
+
+from database.models.employeeReportSnapshot_model import EmployeeReportSnapshot
+from services import employeeReport_services
+from services.clockEvent_services import ingest_clock_events
+
+MONTH = "2025-03"
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Months actually computed (not served from a snapshot)."""
+    calls = []
+    compute = employeeReport_services.compute_employee_report
+
+    def counting(employee, month):
+        calls.append(month)
+        return compute(employee, month)
+
+    monkeypatch.setattr(employeeReport_services, "compute_employee_report", counting)
+    return calls
+
+def _punch(employee, day, key):
+    start = datetime.combine(day, datetime.min.time())
+    ingest_clock_events([
+        {"idempotencyKey": f"{key}-in", "employeeId": str(employee.id), "timestamp": start.replace(hour=8).isoformat(), "direction": "in"},
+        {"idempotencyKey": f"{key}-out", "employeeId": str(employee.id), "timestamp": start.replace(hour=16).isoformat(), "direction": "out"},
+    ])
+
+def test_closed_month_is_computed_once(make_employee, computed):
+    employee = make_employee()
+    first = employeeReport_services.get_employee_report(employee, MONTH)
+    second = employeeReport_services.get_employee_report(employee, MONTH)
+
+    assert computed == [MONTH]
+    assert second == first
+
+def test_live_month_is_never_stored(make_employee, computed):
+    employee = make_employee()
+    month = date.today().strftime("%Y-%m")
+    employeeReport_services.get_employee_report(employee, month)
+    employeeReport_services.get_employee_report(employee, month)
+
+    assert computed == [month, month]
+    assert EmployeeReportSnapshot.objects.count() == 0
+
+def test_backfilled_punch_retires_the_month_and_the_next(make_employee, computed):
+    employee = make_employee()
+    employeeReport_services.get_employee_report(employee, MONTH)
+    employeeReport_services.get_employee_report(employee, "2025-04")
+
+    _punch(employee, date(2025, 3, 4), "backfill")
+    march = employeeReport_services.get_employee_report(employee, MONTH)
+    april = employeeReport_services.get_employee_report(employee, "2025-04")
+
+    assert computed == [MONTH, "2025-04", MONTH, "2025-04"]
+    assert march["kpis"]["totalPresent"] == 1
+    assert april["comparisons"]["present"]["previous"] == 1
+
+def test_invalidation_during_compute_is_not_overwritten(make_employee, monkeypatch):
+    employee = make_employee()
+    compute = employeeReport_services.compute_employee_report
+
+    def racing(employee_, month):
+        payload = compute(employee_, month)
+        # A late punch lands after the report read its data
+        _punch(employee, date(2025, 3, 5), "late")
+        return payload
+
+    monkeypatch.setattr(employeeReport_services, "compute_employee_report", racing)
+    stale = employeeReport_services.get_employee_report(employee, MONTH)
+    monkeypatch.setattr(employeeReport_services, "compute_employee_report", compute)
+    fresh = employeeReport_services.get_employee_report(employee, MONTH)
+
+    assert stale["kpis"]["totalPresent"] == 0
+    assert fresh["kpis"]["totalPresent"] == 1
+    assert employeeReport_services.get_employee_report(employee, MONTH) == fresh
+
+def test_invalidating_an_unviewed_month_then_viewing_it(make_employee, computed):
+    employee = make_employee()
+    employeeReport_services.invalidate_report_snapshots([(employee.id, date(2025, 3, 1), date(2025, 3, 1))])
+    employeeReport_services.get_employee_report(employee, MONTH)
+    employeeReport_services.get_employee_report(employee, MONTH)
+
+    assert computed == [MONTH]
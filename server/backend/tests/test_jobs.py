@@ -0,0 +1,132 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from controllers.job_controller import jobs
+from database.models.job_model import Job
+from services import job_services
+from services.jobWorker_services import JobWorker
+from services.job_services import cancel_job, claim_job, execute_job, result_path, submit_job
+
+@pytest.fixture(autouse=True)
+def results(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_RESULTS_DIR", str(tmp_path))
+    monkeypatch.delenv("JOB_CONCURRENCY", raising=False)
+    return tmp_path
+
+def _submit(job_type="employee_reports", **params):
+    job = submit_job(None, job_type, params)
+    # Distinct, increasing created_at so the claim order is deterministic
+    Job.objects(id=job.id).update_one(set__created_at=datetime(2025, 1, 1) + timedelta(seconds=Job.objects.count()))
+    return job
+
+class _FakeProcess:
+    def __init__(self):
+        self.terminated = False
+
+    def is_alive(self):
+        return not self.terminated
+
+    def terminate(self):
+        self.terminated = True
+
+    def join(self, timeout=None):
+        pass
+
+def test_claim_takes_the_oldest_job_within_its_type_limit(mongo):
+    first = _submit(month="2025-01")
+    _submit(month="2025-02")
+    analytics = _submit("admin_analytics")
+
+    claimed = [claim_job("w1") for _ in range(3)]
+
+    # employee_reports runs one at a time; the next claim skips to another type
+    assert [c["_id"] if c else None for c in claimed] == [first.id, analytics.id, None]
+    assert Job.objects.get(id=first.id).workerId == "w1"
+    assert Job.objects(status="queued").count() == 1
+
+def test_cancel_is_immediate_when_queued_and_flagged_when_running(mongo):
+    running = _submit("admin_analytics")
+    claim_job("w1")
+    queued = _submit("admin_analytics")
+
+    assert cancel_job(str(queued.id)).status == "cancelled"
+    flagged = cancel_job(str(running.id))
+    assert (flagged.status, flagged.cancelRequested) == ("running", True)
+    assert claim_job("w1") is None
+
+def test_worker_kills_cancelled_jobs_and_removes_their_files(mongo):
+    _submit("admin_analytics")
+    job = claim_job("w1")
+    partial = result_path(job) + ".part"
+    open(partial, "w").close()
+    worker = JobWorker(slots=1, worker_id="w1")
+    process = _FakeProcess()
+    worker._running[job["_id"]] = type("Entry", (), {"job": job, "process": process, "deadline": float("inf")})()
+
+    cancel_job(str(job["_id"]))
+    worker._enforce_limits()
+
+    assert process.terminated and not worker._running
+    assert Job.objects.get(id=job["_id"]).status == "cancelled"
+    assert not os.path.exists(partial)
+
+def test_stale_jobs_fail_and_lose_their_partial_results(mongo):
+    _submit("admin_analytics")
+    _submit("admin_attendance", startDate="2025-01-01", endDate="2025-01-31")
+    stale, alive = claim_job("dead"), claim_job("w2")
+    Job.objects(id=stale["_id"]).update_one(set__heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+    leftovers = [result_path(j) + ".part" for j in (stale, alive)]
+    for path in leftovers:
+        open(path, "w").close()
+
+    JobWorker(worker_id="w3")._fail_stale()
+
+    failed = Job.objects.get(id=stale["_id"])
+    assert (failed.status, failed.error) == ("failed", "Worker lost")
+    assert Job.objects.get(id=alive["_id"]).status == "running"
+    assert [os.path.exists(p) for p in leftovers] == [False, True]
+
+def test_execute_renames_the_result_into_place(mongo, monkeypatch):
+    monkeypatch.setattr(job_services, "connect_mongo", lambda: None)
+    monkeypatch.setattr("controllers.admin_analytics_controller._compute_analytics", lambda months: {"months": months})
+    _submit("admin_analytics", monthsBack=3)
+    job = claim_job("w1")
+
+    execute_job(str(job["_id"]))
+
+    done = Job.objects.get(id=job["_id"])
+    assert done.status == "succeeded" and done.resultPath == result_path(job)
+    with open(done.resultPath, encoding="utf-8") as f:
+        assert json.load(f) == {"months": 3}
+    assert not os.path.exists(done.resultPath + ".part")
+
+def test_execute_failure_leaves_no_files(mongo, monkeypatch):
+    monkeypatch.setattr(job_services, "connect_mongo", lambda: None)
+
+    def boom(months):
+        raise RuntimeError("analytics exploded")
+
+    monkeypatch.setattr("controllers.admin_analytics_controller._compute_analytics", boom)
+    _submit("admin_analytics")
+    job = claim_job("w1")
+
+    execute_job(str(job["_id"]))
+
+    failed = Job.objects.get(id=job["_id"])
+    assert (failed.status, failed.error) == ("failed", "analytics exploded")
+    assert not os.listdir(os.path.dirname(result_path(job)))
+
+@pytest.mark.parametrize("body", [[{"type": "admin_analytics"}], "admin_analytics", 7])
+def test_submit_rejects_a_body_that_is_not_an_object(make_employee, body):
+    request = APIRequestFactory().post("/api/jobs", json.dumps(body), content_type="application/json")
+    request.employee = make_employee(isAdmin=True)
+
+    response = jobs(request)
+
+    assert response.status_code == 400
+    assert response.data == {"detail": "Body must be a JSON object"}
+    assert Job.objects.count() == 0
@@ -0,0 +1,126 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+from bson import ObjectId
+from rest_framework.test import APIRequestFactory
+
+from controllers.leaveRequeast_controller import admin_bulk_leave_status
+from database.models.leaveRequeast_model import LeaveRequeast
+from services import attendanceRollup_services as rollup
+from services.leaveRequeast_services import MAX_BULK_IDS, set_leave_status_many, summarize_bulk
+
+START = date.today() + timedelta(days=10)
+
+def _leave(employee, status="Pending", offset=0):
+    start = START + timedelta(days=offset)
+    return LeaveRequeast(employee=employee, leaveType="sick", startDate=start, endDate=start + timedelta(days=1), status=status).save()
+
+def _statuses():
+    return {str(lr.id): lr.status for lr in LeaveRequeast.objects}
+
+def test_each_id_gets_its_own_result_in_request_order(make_employee):
+    employee = make_employee()
+    pending, other = _leave(employee), _leave(employee, offset=5)
+    decided = _leave(employee, status="Rejected", offset=10)
+    missing = str(ObjectId())
+
+    results = set_leave_status_many(
+        [str(pending.id), "junk", str(decided.id), missing, str(pending.id), str(other.id), 42], "Approved"
+    )
+
+    assert results == [
+        {"id": str(pending.id), "result": "updated", "status": "Approved"},
+        {"id": "junk", "result": "invalid", "detail": "Invalid id"},
+        {"id": str(decided.id), "result": "skipped", "detail": "Not pending", "status": "Rejected"},
+        {"id": missing, "result": "not_found", "detail": "Leave request not found"},
+        {"id": str(pending.id), "result": "duplicate"},
+        {"id": str(other.id), "result": "updated", "status": "Approved"},
+        {"id": "42", "result": "invalid", "detail": "Invalid id"},
+    ]
+    assert summarize_bulk(results) == {"updated": 2, "invalid": 2, "skipped": 1, "not_found": 1, "duplicate": 1}
+    assert _statuses() == {str(pending.id): "Approved", str(other.id): "Approved", str(decided.id): "Rejected"}
+
+def test_approval_lands_in_the_rollup_and_rejection_does_not(make_employee):
+    approved, rejected = make_employee(), make_employee()
+    set_leave_status_many([str(_leave(approved).id)], "Approved")
+    set_leave_status_many([str(_leave(rejected).id)], "Rejected")
+
+    rows = rollup.load_rollup(START, START + timedelta(days=1), "leaveIds")
+
+    assert [rows[d]["leaveIds"] for d in sorted(rows)] == [[approved.id], [approved.id]]
+
+def test_a_second_pass_skips_what_the_first_decided(make_employee):
+    employee = make_employee()
+    ids = [str(_leave(employee, offset=k * 3).id) for k in range(3)]
+    set_leave_status_many(ids[:2], "Rejected")
+
+    results = set_leave_status_many(ids, "Approved")
+
+    assert [(r["result"], r["status"]) for r in results] == [("skipped", "Rejected"), ("skipped", "Rejected"), ("updated", "Approved")]
+
+def test_a_concurrent_decision_is_reported_as_skipped(make_employee, monkeypatch):
+    employee = make_employee()
+    first, second = _leave(employee), _leave(employee, offset=5)
+    collection = LeaveRequeast._get_collection()
+
+    class RacingCollection:
+        # Another admin rejects `second` after our read, before our update
+        def __getattr__(self, name):
+            return getattr(collection, name)
+
+        def update_many(self, *args, **kwargs):
+            collection.update_one({"_id": second.id}, {"$set": {"status": "Rejected"}})
+            return collection.update_many(*args, **kwargs)
+
+    monkeypatch.setattr(LeaveRequeast, "_get_collection", classmethod(lambda cls: RacingCollection()))
+    results = set_leave_status_many([str(first.id), str(second.id)], "Approved")
+    monkeypatch.undo()
+
+    assert [r["result"] for r in results] == ["updated", "skipped"]
+    assert results[1]["status"] is None
+    assert _statuses() == {str(first.id): "Approved", str(second.id): "Rejected"}
+
+@pytest.mark.parametrize("ids, status, detail", [
+    ([str(ObjectId())], "Pending", "Invalid status"),
+    ([], "Approved", "ids must be a non-empty list"),
+    ("abc", "Approved", "ids must be a non-empty list"),
+    ([str(ObjectId())] * (MAX_BULK_IDS + 1), "Approved", f"At most {MAX_BULK_IDS} ids per request"),
+])
+def test_service_refuses_bad_batches(mongo, ids, status, detail):
+    with pytest.raises(ValueError, match=detail):
+        set_leave_status_many(ids, status)
+
+def _patch(employee, body):
+    request = APIRequestFactory().patch("/api/admin/leaves/bulk-status", json.dumps(body), content_type="application/json")
+    request.employee = employee
+    return admin_bulk_leave_status(request)
+
+def test_endpoint_returns_results_and_summary(make_employee):
+    admin = make_employee(isAdmin=True)
+    lr = _leave(make_employee())
+
+    response = _patch(admin, {"ids": [str(lr.id), "junk"], "status": "Rejected"})
+
+    assert response.status_code == 200
+    assert response.data["summary"] == {"updated": 1, "invalid": 1}
+    assert _statuses() == {str(lr.id): "Rejected"}
+
+@pytest.mark.parametrize("body, detail", [
+    ([{"ids": []}], "Body must be a JSON object"),
+    ({"ids": "abc", "status": "Approved"}, "ids must be a non-empty list"),
+    ({"ids": [str(ObjectId())] * (MAX_BULK_IDS + 1), "status": "Approved"}, f"At most {MAX_BULK_IDS} ids per request"),
+    ({"ids": [str(ObjectId())], "status": "Cancelled"}, "Invalid status"),
+])
+def test_endpoint_rejects_malformed_bodies(make_employee, body, detail):
+    response = _patch(make_employee(isAdmin=True), body)
+
+    assert (response.status_code, response.data) == (400, {"detail": detail})
+
+def test_endpoint_is_admin_only(make_employee):
+    lr = _leave(make_employee())
+
+    response = _patch(make_employee(), {"ids": [str(lr.id)], "status": "Approved"})
+
+    assert response.status_code == 403
+    assert _statuses() == {str(lr.id): "Pending"}
@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+from database.models.leaveRequeast_model import LeaveRequeast
+from services import leaveCalendar_services, leaveRequeast_services
+from services.leaveRequeast_services import create_leave_request
+
+START = date.today() + timedelta(days=10)
+
+def _payload(start, end, leave_type="vacation"):
+    return {"leave_type": leave_type, "start_date": start.isoformat(), "end_date": end.isoformat()}
+
+def _leave(employee, start, end, status):
+    return LeaveRequeast(employee=employee, leaveType="vacation", startDate=start, endDate=end, status=status).save()
+
+@pytest.mark.parametrize("status, rejected", [("Pending", True), ("Approved", True), ("Rejected", False)])
+def test_overlap_with_pending_or_approved_leave_is_rejected(make_employee, status, rejected):
+    employee = make_employee()
+    _leave(employee, START, START + timedelta(days=4), status)
+
+    if rejected:
+        with pytest.raises(ValueError, match="overlapping"):
+            create_leave_request(employee, _payload(START + timedelta(days=4), START + timedelta(days=6)))
+        assert LeaveRequeast.objects(employee=employee).count() == 1
+    else:
+        create_leave_request(employee, _payload(START + timedelta(days=4), START + timedelta(days=6)))
+        assert LeaveRequeast.objects(employee=employee, status="Pending").count() == 1
+
+def test_adjacent_and_other_employees_leaves_do_not_conflict(make_employee):
+    employee, colleague = make_employee(), make_employee()
+    _leave(employee, START, START + timedelta(days=4), "Approved")
+    _leave(colleague, START + timedelta(days=5), START + timedelta(days=9), "Approved")
+
+    create_leave_request(employee, _payload(START + timedelta(days=5), START + timedelta(days=9)))
+
+    assert LeaveRequeast.objects(employee=employee).count() == 2
+
+def test_request_that_loses_a_race_is_backed_out(make_employee, monkeypatch):
+    employee = make_employee()
+    check = leaveCalendar_services.find_overlapping_leaves
+    rival = []
+
+    def check_then_race(*args, **kwargs):
+        found = check(*args, **kwargs)
+        if not rival:
+            # Another request for the same days is stored between our check and our insert
+            rival.append(_leave(employee, START + timedelta(days=2), START + timedelta(days=3), "Pending"))
+        return found
+
+    monkeypatch.setattr(leaveRequeast_services, "find_overlapping_leaves", check_then_race)
+
+    with pytest.raises(ValueError, match="overlapping"):
+        create_leave_request(employee, _payload(START, START + timedelta(days=4)))
+
+    assert [lr.id for lr in LeaveRequeast.objects(employee=employee)] == [rival[0].id]
+
+def test_concurrent_overlapping_requests_store_at_most_one(make_employee, monkeypatch):
+    employee = make_employee()
+    check = leaveCalendar_services.find_overlapping_leaves
+    barrier = threading.Barrier(4)
+
+    def slow_check(*args, **kwargs):
+        found = check(*args, **kwargs)
+        # Hold every request between its check and its insert so they overlap
+        time.sleep(0.05)
+        return found
+
+    monkeypatch.setattr(leaveRequeast_services, "find_overlapping_leaves", slow_check)
+
+    def submit(offset):
+        barrier.wait()
+        try:
+            return create_leave_request(employee, _payload(START + timedelta(days=offset), START + timedelta(days=offset + 3)))
+        except ValueError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(submit, range(4)))
+
+    assert LeaveRequeast.objects(employee=employee).count() <= 1
+
+def test_coverage_counts_distinct_people_per_day(make_employee):
+    a, b, c, d = (make_employee() for _ in range(4))
+    # a's two approved leaves overlap; a is still one person out
+    _leave(a, START, START + timedelta(days=2), "Approved")
+    _leave(a, START + timedelta(days=1), START + timedelta(days=4), "Approved")
+    _leave(b, START + timedelta(days=1), START + timedelta(days=1), "Approved")
+    _leave(b, START + timedelta(days=3), START + timedelta(days=3), "Pending")
+    _leave(c, START, START + timedelta(days=6), "Rejected")
+    _leave(d, START + timedelta(days=6), START + timedelta(days=20), "Pending")
+
+    report = leaveCalendar_services.leave_coverage(START, START + timedelta(days=6))
+
+    assert [(day["approved"], day["pending"]) for day in report["days"]] == [
+        (1, 0), (2, 0), (1, 0), (1, 1), (1, 0), (0, 0), (0, 1),
+    ]
+    assert report["peak"] == {"date": (START + timedelta(days=1)).isoformat(), "approved": 2, "pending": 0}
+
+def test_coverage_reads_only_leaves_in_the_window(make_employee):
+    employee = make_employee()
+    for week in range(10):
+        _leave(employee, START + timedelta(weeks=week), START + timedelta(weeks=week, days=1), "Approved")
+
+    window = leaveCalendar_services._load(START + timedelta(weeks=2, days=1), START + timedelta(weeks=4))
+
+    assert len(window) == 3
+    assert leaveCalendar_services.leave_coverage(START - timedelta(days=5), START - timedelta(days=1))["peak"] is None
+
+@pytest.mark.parametrize("days, detail", [(-1, "to before from"), (366, "at most 366 days")])
+def test_coverage_range_is_validated(mongo, days, detail):
+    with pytest.raises(ValueError, match=detail):
+        leaveCalendar_services.leave_coverage(START, START + timedelta(days=days))
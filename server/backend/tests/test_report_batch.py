@@ -0,0 +1,80 @@
+import csv
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models.attendance_model import Attendance
+from services import employeeReport_services
+from services.reportBatch_services import completed_employee_ids, run_report_batch
+
+MONTH = "2025-03"
+
+@pytest.fixture
+def staff(make_employee):
+    employees = [make_employee() for _ in range(5)]
+    for n, e in enumerate(employees):
+        for offset in range(n + 1):
+            day = date(2025, 3, 3) + timedelta(days=offset)
+            time_in = datetime.combine(day, datetime.min.time()).replace(hour=8)
+            Attendance(employee=e, date=day, timeIn=time_in, timeOut=time_in + timedelta(hours=8),
+                       status="Present", hoursWorked="08:00:00", workedSeconds=8 * 3600).save()
+    return employees
+
+def _jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def _interrupt(path, keep):
+    # Keep the first `keep` records and half of the next one, as a crash mid-write would
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines[:keep])
+        f.write(lines[keep][: len(lines[keep]) // 2])
+
+def test_batch_matches_single_reports(staff, tmp_path):
+    path = tmp_path / "reports.jsonl"
+    summary = run_report_batch(MONTH, str(path), workers=1, chunk_size=2)
+
+    records = _jsonl(path)
+    assert summary["written"] == summary["total"] == len(staff)
+    assert [r["employeeId"] for r in records] == sorted(str(e.id) for e in staff)
+    by_id = {str(e.id): e for e in staff}
+    for record in records:
+        expected = employeeReport_services.compute_employee_report(by_id[record["employeeId"]], MONTH)
+        assert record["report"] == json.loads(json.dumps(expected, default=str))
+
+def test_resume_skips_written_employees_and_drops_the_partial_line(staff, tmp_path):
+    path = tmp_path / "reports.jsonl"
+    run_report_batch(MONTH, str(path), workers=1, chunk_size=2)
+    _interrupt(path, keep=2)
+    progress = []
+
+    summary = run_report_batch(MONTH, str(path), workers=1, chunk_size=2, resume=True,
+                               progress=lambda done, total: progress.append((done, total)))
+
+    ids = [r["employeeId"] for r in _jsonl(path)]
+    assert sorted(ids) == sorted(str(e.id) for e in staff) and len(set(ids)) == len(ids)
+    assert (summary["written"], summary["skipped"], summary["total"]) == (3, 2, 5)
+    assert progress == [(2, 3), (3, 3)]
+
+def test_resume_appends_csv_without_a_second_header(staff, tmp_path):
+    path = tmp_path / "reports.csv"
+    run_report_batch(MONTH, str(path), fmt="csv", workers=1, chunk_size=2)
+    _interrupt(path, keep=3)
+
+    run_report_batch(MONTH, str(path), fmt="csv", workers=1, chunk_size=2, resume=True)
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(r["employeeId"] for r in rows) == sorted(str(e.id) for e in staff)
+    assert {r["employeeId"]: r["present"] for r in rows} == {str(e.id): str(n + 1) for n, e in enumerate(staff)}
+    assert completed_employee_ids(str(path), "csv") == {str(e.id) for e in staff}
+
+def test_missing_file_resumes_from_scratch(staff, tmp_path):
+    path = tmp_path / "reports.jsonl"
+
+    summary = run_report_batch(MONTH, str(path), workers=1, resume=True)
+
+    assert (summary["written"], summary["skipped"]) == (len(staff), 0)
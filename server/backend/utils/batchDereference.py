@@ -0,0 +1,37 @@
+from typing import Any, Dict, Iterable, Optional
+from bson import DBRef, ObjectId
+from mongoengine import Document
+
+def ref_id(doc: Any, field: str = "employee") -> Optional[ObjectId]:
+    """
+    ObjectId behind a ReferenceField without triggering MongoEngine's lazy
+    dereference (one query per access). Works for Documents and raw dicts.
+    """
+    if isinstance(doc, dict):
+        value = doc.get(field)
+    else:
+        value = doc._data.get(field)
+    if value is None:
+        return None
+    if isinstance(value, DBRef):
+        return value.id
+    if isinstance(value, Document):
+        return value.pk
+    return value
+
+def employee_names(ids: Iterable[Any]) -> Dict[str, str]:
+    """Map of str(employee_id) -> "First Last" fetched with one $in query."""
+    from database.models.employee_model import Employee
+
+    unique = {ObjectId(str(i)) for i in ids if i}
+    if not unique:
+        return {}
+    rows = Employee.objects(id__in=list(unique)).only("firstName", "lastName").as_pymongo()
+    return {
+        str(r["_id"]): f"{r.get('firstName') or ''} {r.get('lastName') or ''}".strip()
+        for r in rows
+    }
+
+def employee_names_for(docs: Iterable[Any], field: str = "employee") -> Dict[str, str]:
+    """Resolve the employee names referenced by `docs` in a single query."""
+    return employee_names(ref_id(d, field) for d in docs)
@@ -0,0 +1,44 @@
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List
+
+class EmployeeDayBitmap:
+    """
+    One byte per (day, employee) cell for [start, end], laid out day-major so
+    each day's roster is a contiguous slice. Cells are 0 until marked; unmarked
+    cells are the employee-days with no attendance and no covering leave.
+    """
+
+    def __init__(self, employee_ids: Iterable[Any], start: date, end: date):
+        self.employee_ids: List[str] = [str(e) for e in employee_ids]
+        self._ordinal: Dict[str, int] = {eid: i for i, eid in enumerate(self.employee_ids)}
+        self.start = start
+        self.days = max((end - start).days + 1, 0)
+        self._width = len(self.employee_ids)
+        self._cells = bytearray(self.days * self._width)
+
+    def mark(self, employee_id: Any, day: date) -> None:
+        idx = self._ordinal.get(str(employee_id))
+        offset = (day - self.start).days
+        if idx is not None and 0 <= offset < self.days:
+            self._cells[offset * self._width + idx] = 1
+
+    def mark_range(self, employee_id: Any, first: date, last: date) -> None:
+        idx = self._ordinal.get(str(employee_id))
+        if idx is None:
+            return
+        lo = max((first - self.start).days, 0)
+        hi = min((last - self.start).days, self.days - 1)
+        for offset in range(lo, hi + 1):
+            self._cells[offset * self._width + idx] = 1
+
+    def unmarked_on(self, day: date) -> Iterator[str]:
+        """Employee ids (in roster order) with no mark on `day`."""
+        offset = (day - self.start).days
+        if not 0 <= offset < self.days:
+            return
+        base = offset * self._width
+        row_end = base + self._width
+        pos = self._cells.find(0, base, row_end)
+        while pos != -1:
+            yield self.employee_ids[pos - base]
+            pos = self._cells.find(0, pos + 1, row_end)
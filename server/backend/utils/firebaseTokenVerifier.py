@@ -0,0 +1,192 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import jwt
+import requests
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+from cryptography.x509 import load_pem_x509_certificate
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+DEFAULT_MAX_AGE = 3600
+
+def parse_max_age(cache_control: str, default: int = DEFAULT_MAX_AGE) -> int:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else default
+
+def load_public_key(pem: str):
+    """Public key from either an X.509 certificate (what Google serves) or a bare PEM key."""
+    data = pem.encode("utf-8")
+    if b"BEGIN CERTIFICATE" in data:
+        return load_pem_x509_certificate(data).public_key()
+    return load_pem_public_key(data)
+
+class GoogleCertSource:
+    """Firebase's rotating ID-token signing certificates, as {kid: pem}."""
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self) -> Tuple[Dict[str, str], int]:
+        resp = requests.get(self.url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json(), parse_max_age(resp.headers.get("Cache-Control", ""))
+
+class FileCertSource:
+    """{kid: pem} read from a JSON file; stands in for Google in air-gapped or test setups."""
+
+    def __init__(self, path: str, max_age: int = 300):
+        self.path = str(path)
+        self.max_age = max_age
+
+    def fetch(self) -> Tuple[Dict[str, str], int]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f), self.max_age
+
+class KeySet:
+    """
+    Parsed public keys by kid. The last good fetch is persisted so a restart
+    starts warm without the network; keys are refreshed when Cache-Control
+    says they expire, or early when a token names a kid we have not seen
+    (throttled to one fetch per `min_refresh` seconds). A failed refresh
+    keeps serving the previous keys.
+    """
+
+    def __init__(self, source, cache_path: Optional[str] = None, min_refresh: int = 60, margin: int = 300):
+        self.source = source
+        self.cache_path = str(cache_path) if cache_path else None
+        self.min_refresh = min_refresh
+        self.margin = margin
+        self._keys: Dict[str, Any] = {}
+        self.expires = 0.0
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"refreshes": 0, "refreshErrors": 0}
+        self._load_persisted()
+
+    def get(self, kid: Optional[str]):
+        if self.expires <= time.time():
+            self.refresh(when=lambda: self.expires <= time.time())
+        key = self._keys.get(kid)
+        if key is None:
+            # Unknown kid usually means Google rotated keys since our last fetch
+            self.refresh(when=lambda: kid not in self._keys and time.time() - self._last_attempt >= self.min_refresh)
+            key = self._keys.get(kid)
+        return key
+
+    def kids(self):
+        return list(self._keys)
+
+    def refresh(self, when=None) -> bool:
+        with self._lock:
+            # Re-checked under the lock so concurrent callers trigger one fetch
+            if when is not None and not when():
+                return False
+            self._last_attempt = time.time()
+            try:
+                pems, max_age = self.source.fetch()
+                keys = {kid: load_public_key(pem) for kid, pem in pems.items()}
+            except Exception as ex:
+                self.stats["refreshErrors"] += 1
+                print("Token key set refresh failed:", ex)
+                # Back off instead of hammering the source on every request
+                if self.expires <= time.time():
+                    self.expires = time.time() + self.min_refresh
+                return False
+            self._keys = keys
+            self.expires = time.time() + max_age
+            self.stats["refreshes"] += 1
+            self._persist(pems)
+            return True
+
+    def start_background_refresh(self) -> None:
+        """Refresh shortly before expiry on a daemon thread so requests never wait on a fetch."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="token-keyset-refresh", daemon=True)
+        self._thread.start()
+
+    def stop_background_refresh(self) -> None:
+        self._stop.set()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.is_set():
+            wait = self.expires - self.margin - time.time()
+            if wait <= 0:
+                self.refresh()
+                wait = max(self.expires - self.margin - time.time(), self.min_refresh)
+            self._stop.wait(wait)
+
+    def _load_persisted(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._keys = {kid: load_public_key(pem) for kid, pem in data["keys"].items()}
+            self.expires = float(data.get("expires") or 0)
+        except Exception as ex:
+            print("Ignoring unreadable token key set cache:", ex)
+
+    def _persist(self, pems: Dict[str, str]) -> None:
+        if not self.cache_path:
+            return
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"expires": self.expires, "keys": pems}, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as ex:
+            print("Could not persist token key set:", ex)
+
+class FirebaseTokenVerifier:
+    """
+    Verifies Firebase ID tokens locally against a KeySet, applying the same
+    checks as firebase_admin.auth.verify_id_token (RS256, kid, aud, iss,
+    exp/iat, non-empty sub). Returns claims with `uid` set like the SDK does.
+    """
+
+    def __init__(self, project_id: str, keyset: KeySet, leeway: int = 0):
+        if not project_id:
+            raise ValueError("Firebase project id is required for local token verification")
+        self.project_id = project_id
+        self.issuer = f"https://securetoken.google.com/{project_id}"
+        self.keyset = keyset
+        self.leeway = leeway
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") != "RS256":
+            raise ValueError("ID token has incorrect algorithm")
+        key = self.keyset.get(header.get("kid"))
+        if key is None:
+            raise ValueError("ID token signed with an unknown key")
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={"require": ["exp", "iat", "aud", "iss", "sub"]},
+        )
+        sub = claims.get("sub")
+        if not isinstance(sub, str) or not sub or len(sub) > 128:
+            raise ValueError("ID token has invalid subject")
+        if claims.get("auth_time", 0) > time.time() + self.leeway:
+            raise ValueError("ID token auth_time is in the future")
+        claims["uid"] = sub
+        return claims
+
+class FirebaseAdminVerifier:
+    """Default backend: firebase_admin's own verification (fetches Google certs over the network)."""
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        from firebase_admin import auth as fb_auth
+        return fb_auth.verify_id_token(token)
@@ -0,0 +1,48 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+from utils.leaveIntervals import daterange, merge_intervals
+
+TRACKED = ("Approved", "Pending")
+
+class LeaveCalendar:
+    """
+    In-memory interval index over Approved and Pending leave requests.
+
+    Per employee and status the requests are merged into disjoint
+    intervals; globally it keeps the sorted starts and ends of all merged
+    intervals. Since one employee's merged intervals never overlap, the
+    number of people out on a day is starts <= day minus ends < day: two
+    bisections, and overlapping requests are not double counted.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, date, date, str]] = ()):
+        # employee -> leave id -> (start, end, status)
+        self._leaves: Dict[str, Dict[str, Tuple[date, date, str]]] = {}
+        self._starts: Dict[str, List[date]] = {s: [] for s in TRACKED}
+        self._ends: Dict[str, List[date]] = {s: [] for s in TRACKED}
+        for leave_id, employee_id, start, end, status in rows:
+            if status in TRACKED and start and end and start <= end:
+                self._leaves.setdefault(str(employee_id), {})[str(leave_id)] = (start, end, status)
+        for employee_id, leaves in self._leaves.items():
+            for status in TRACKED:
+                merged = merge_intervals((s, e) for s, e, st in leaves.values() if st == status)
+                if merged:
+                    self._starts[status].extend(s for s, _ in merged)
+                    self._ends[status].extend(e for _, e in merged)
+        for status in TRACKED:
+            self._starts[status].sort()
+            self._ends[status].sort()
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._leaves.values())
+
+    def out_on(self, day: date, status: str = "Approved") -> int:
+        """Distinct employees with a leave of `status` covering `day`."""
+        return bisect_right(self._starts[status], day) - bisect_left(self._ends[status], day)
+
+    def coverage(self, start: date, end: date) -> List[Dict[str, object]]:
+        return [
+            {"date": d.isoformat(), "approved": self.out_on(d, "Approved"), "pending": self.out_on(d, "Pending")}
+            for d in daterange(start, end)
+        ]
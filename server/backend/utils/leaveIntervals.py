@@ -0,0 +1,99 @@
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+Interval = Tuple[date, date]
+
+def daterange(start: date, end: date) -> Iterator[date]:
+    cur = start
+    while cur <= end:
+        yield cur
+        cur += timedelta(days=1)
+
+def weekday_count(start: date, end: date) -> int:
+    """Number of Mon-Fri days in [start, end], computed without iterating the range."""
+    if end < start:
+        return 0
+    full_weeks, rem = divmod((end - start).days + 1, 7)
+    count = full_weeks * 5
+    first = start.weekday()
+    for i in range(rem):
+        if (first + i) % 7 < 5:
+            count += 1
+    return count
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and merge overlapping or touching [start, end] date intervals."""
+    merged: List[Interval] = []
+    for s, e in sorted(intervals):
+        if merged and s <= merged[-1][1] + timedelta(days=1):
+            if e > merged[-1][1]:
+                merged[-1] = (merged[-1][0], e)
+        else:
+            merged.append((s, e))
+    return merged
+
+def _as_date(v) -> date:
+    return v.date() if isinstance(v, datetime) else v
+
+class LeaveIntervals:
+    """
+    Per-employee merged leave intervals. Answers "is this employee on leave"
+    and "how many weekday leave slots fall in [start, end]" without expanding
+    leaves day by day.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[Any, date, date]] = ()):
+        raw: Dict[str, List[Interval]] = {}
+        for employee_id, s, e in rows:
+            if s and e and s <= e:
+                raw.setdefault(str(employee_id), []).append((s, e))
+        self._by_emp: Dict[str, List[Interval]] = {k: merge_intervals(v) for k, v in raw.items()}
+        self._starts: Dict[str, List[date]] = {k: [s for s, _ in v] for k, v in self._by_emp.items()}
+
+    @classmethod
+    def from_queryset(cls, qs) -> "LeaveIntervals":
+        """Build from a LeaveRequeast queryset using a raw projection (no dereferencing)."""
+        rows = qs.only("employee", "startDate", "endDate").as_pymongo()
+        return cls((r["employee"], _as_date(r["startDate"]), _as_date(r["endDate"])) for r in rows)
+
+    def employee_ids(self) -> List[str]:
+        return list(self._by_emp)
+
+    def intervals(self, employee_id) -> List[Interval]:
+        return list(self._by_emp.get(str(employee_id), []))
+
+    def covers(self, employee_id, day: date) -> bool:
+        key = str(employee_id)
+        starts = self._starts.get(key)
+        if not starts:
+            return False
+        idx = bisect_right(starts, day) - 1
+        return idx >= 0 and self._by_emp[key][idx][1] >= day
+
+    def employees_on(self, day: date) -> Set[str]:
+        return {eid for eid in self._by_emp if self.covers(eid, day)}
+
+    def weekday_slots(self, start: date, end: date, employee_id: Optional[Any] = None) -> int:
+        """Weekday leave days in [start, end] for one employee, or summed over all employees."""
+        if employee_id is not None:
+            return self._weekday_slots_for(str(employee_id), start, end)
+        return sum(self._weekday_slots_for(eid, start, end) for eid in self._by_emp)
+
+    def weekday_slots_by_employee(self, start: date, end: date) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for eid in self._by_emp:
+            n = self._weekday_slots_for(eid, start, end)
+            if n:
+                out[eid] = n
+        return out
+
+    def _weekday_slots_for(self, key: str, start: date, end: date) -> int:
+        total = 0
+        for s, e in self._by_emp.get(key, []):
+            if s > end:
+                break
+            if e < start:
+                continue
+            total += weekday_count(max(s, start), min(e, end))
+        return total
@@ -0,0 +1,62 @@
+import json
+import time
+import uuid
+from typing import Any, Dict
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+class LocalKeySet:
+    """
+    An RSA signing key standing in for Google's: mints tokens shaped like
+    Firebase ID tokens and exports the matching {kid: pem} public set that
+    FileCertSource reads. For air-gapped test environments only.
+    """
+
+    def __init__(self, private_key, kid: str):
+        self.private_key = private_key
+        self.kid = kid
+
+    @classmethod
+    def generate(cls, kid: str = None) -> "LocalKeySet":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return cls(key, kid or uuid.uuid4().hex)
+
+    @classmethod
+    def load(cls, private_path: str) -> "LocalKeySet":
+        with open(private_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        key = serialization.load_pem_private_key(data["privateKey"].encode("utf-8"), password=None)
+        return cls(key, data["kid"])
+
+    def save(self, private_path: str, public_path: str) -> None:
+        pem = self.private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode("utf-8")
+        with open(private_path, "w", encoding="utf-8") as f:
+            json.dump({"kid": self.kid, "privateKey": pem}, f)
+        with open(public_path, "w", encoding="utf-8") as f:
+            json.dump(self.public_pems(), f)
+
+    def public_pems(self) -> Dict[str, str]:
+        pem = self.private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode("utf-8")
+        return {self.kid: pem}
+
+    def mint(self, project_id: str, uid: str, ttl: int = 3600, **claims: Any) -> str:
+        now = int(time.time())
+        body = {
+            "iss": f"https://securetoken.google.com/{project_id}",
+            "aud": project_id,
+            "auth_time": now,
+            "user_id": uid,
+            "sub": uid,
+            "iat": now,
+            "exp": now + ttl,
+            **claims,
+        }
+        return jwt.encode(body, self.private_key, algorithm="RS256", headers={"kid": self.kid})
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: thread-level coalescing only
+    fcntl = None
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+class SingleFlight:
+    """
+    Concurrent callers asking for the same key share one in-flight call:
+    the first caller runs `fn`, the rest block and receive its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                self.stats["executed"] += 1
+            call.event.set()
+
+@contextmanager
+def file_lock(lock_dir: str, key: str, timeout: float = 60.0, poll: float = 0.05):
+    """
+    Exclusive lock shared by every process on the host. Yields True when the
+    lock was taken, False if it could not be taken within `timeout` (or the
+    platform lacks flock); callers proceed either way.
+    """
+    if fcntl is None:
+        yield False
+        return
+    os.makedirs(lock_dir, exist_ok=True)
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".lock"
+    with open(os.path.join(lock_dir, name), "a+") as fh:
+        deadline = time.monotonic() + timeout
+        acquired = False
+        while True:
+            try:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(poll)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
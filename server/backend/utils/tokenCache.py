@@ -0,0 +1,81 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+def token_key(token: str) -> str:
+    # Raw tokens are bearer credentials; never keep them as dict keys
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already-verified token claims. Each entry lives until the
+    token's own `exp`, so a hit never outlives what the verifier would accept.
+    Entries are indexed by uid so an account's tokens can be dropped at once.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_uid: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revoked": 0}
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = token_key(token)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] <= time.time():
+                self._drop(key)
+                item = None
+            if item is None:
+                self.stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats["hits"] += 1
+            return dict(item[0])
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        try:
+            exp = float(claims.get("exp"))
+        except (TypeError, ValueError):
+            return
+        if exp <= time.time():
+            return
+        key = token_key(token)
+        uid = str(claims.get("uid") or claims.get("user_id") or claims.get("sub") or "")
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (dict(claims), exp, uid)
+            self._by_uid.setdefault(uid, set()).add(key)
+            while len(self._data) > self.max_entries:
+                self._drop(next(iter(self._data)))
+
+    def revoke_uid(self, uid: str) -> int:
+        """Forget every cached token of `uid`; returns how many were dropped."""
+        with self._lock:
+            keys = self._by_uid.pop(str(uid), set())
+            for key in keys:
+                self._data.pop(key, None)
+            self.stats["revoked"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._by_uid.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "size": len(self._data), "maxEntries": self.max_entries}
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is None:
+            return
+        keys = self._by_uid.get(item[2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_uid[item[2]]
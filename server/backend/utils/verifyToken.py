@@ -1,5 +1,4 @@
 from typing import Optional, Tuple, Dict, Any
-from firebase_admin import auth as fb_auth
 from .tokenMaker import verify_token as verify_local_token
 
 def parse_auth_header(header: str) -> Optional[str]:
@@ -11,8 +10,10 @@ def parse_auth_header(header: str) -> Optional[str]:
     return None
 
 def verify_any(token: str) -> Tuple[str, Dict[str, Any]]:
+    # Same verifier backend and verified-token cache as require_firebase_auth
+    from services.auth_services import verify_firebase_id_token
     try:
-        claims = fb_auth.verify_id_token(token)
+        claims = verify_firebase_id_token(token)
         return ("firebase", claims)
     except Exception:
         claims = verify_local_token(token)